@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from skopt import gp_minimize
 from skopt.utils import use_named_args
+from core.response_surfaces import SURFACES
 
 st.title("🎓 Bayesian Optimization Classroom")
 
@@ -43,25 +44,26 @@ with st.expander("Step-by-step Explanation"):
 # --- Section 3: Interactive Demo ---
 st.header("⚗️ Reaction Yield Optimization (Simulated)")
 
-st.markdown("""
+surface_name = st.selectbox("🧬 Simulated Reaction", options=list(SURFACES), index=list(SURFACES).index("classroom"))
+surface = SURFACES[surface_name]
+(T_low, T_high), (t_low, t_high) = surface.bounds["temperature"], surface.bounds["residence_time"]
+
+st.markdown(f"""
 We will optimize a simulated reaction yield depending on:
-- **Temperature** (30°C to 110°C)
-- **Time** (10 to 60 minutes)
+- **Temperature** ({T_low:.0f}°C to {T_high:.0f}°C)
+- **Time** ({t_low:.0f} to {t_high:.0f} minutes)
 
-The underlying (hidden) function has an optimum around 70°C and 30 minutes.
+{surface.description} Pressure and phase ratio stay fixed.
 """)
 
-# Define simulated chemical yield function
+# Simulated chemical yield from the selected response surface
 def chemical_yield(params):
     T, t = params
-    return -(
-        np.exp(-((T - 70)**2) / 100) *
-        np.exp(-((t - 30)**2) / 200)
-    )  # Negative for minimization
+    return -np.clip(surface(temperature=T, residence_time=t), 0, 1)  # Negative for minimization
 
 with st.expander("🔬 Show True Yield Surface (for illustration)"):
-    T_grid = np.linspace(30, 110, 80)
-    t_grid = np.linspace(10, 60, 80)
+    T_grid = np.linspace(T_low, T_high, 80)
+    t_grid = np.linspace(t_low, t_high, 80)
     TT, tt = np.meshgrid(T_grid, t_grid)
     Z = -chemical_yield([TT, tt]) * 100  # convert to %
 
@@ -80,8 +82,8 @@ acq_func = st.selectbox("Acquisition Function", options=["EI", "PI", "LCB"], ind
 
 if st.button("🚀 Run Optimization"):
     result = gp_minimize(
-        chemical_yield,
-        dimensions=[(30.0, 110.0), (10.0, 60.0)],
+        lambda x: float(chemical_yield(x)),
+        dimensions=[(T_low, T_high), (t_low, t_high)],
         n_calls=n_calls,
         n_initial_points=n_initial_points,
         acq_func=acq_func,
@@ -121,8 +123,8 @@ if st.button("🚀 Run Optimization"):
     gp = result.models[-1]  # Last GP model used
 
     # Create grid for prediction
-    T_pred = np.linspace(30, 110, 60)
-    t_pred = np.linspace(10, 60, 60)
+    T_pred = np.linspace(T_low, T_high, 60)
+    t_pred = np.linspace(t_low, t_high, 60)
     TT_pred, tt_pred = np.meshgrid(T_pred, t_pred)
     X_pred = np.vstack([TT_pred.ravel(), tt_pred.ravel()]).T
 
@@ -21,7 +21,7 @@ VOL integrates automation, machine learning, and interactive design to help you
 - 🔁 **Stop/Resume** any campaign — and even recover from hardware failures
 - 💾 **Save and Reload** optimization runs (pick up where you left off!)
 - 🗂️ Store experiment results in a **structured database** following the **FAIR principles**
-- 🧠 Soon: Use **Previous Campaigns as Starting Points** (Active Learning)
+- 🔁 Use **Previous Campaigns as Starting Points** (warm start from the experiment database)
 """)
 
 # Info box
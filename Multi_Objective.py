@@ -1,19 +1,20 @@
 import streamlit as st
 from datetime import datetime
-import numpy as np
 import pandas as pd
 import altair as alt
-import time
-from ProcessOptimizer import Optimizer
+from core.optimization.warm_start import load_warm_start_data, warm_start
 from core.utils.export_tools import export_to_csv, export_to_excel
 from core.utils import db_handler
 from core.hardware.opc_communication import OPCClient
 from core.hardware.experimental_run import ExperimentRunner
+from core.hardware.clock import CLOCK_MODES, CLOCK_LABELS, make_clock
 from core.utils.logger import StreamlitLogger
 import sys
 import os
-import json
-import dill as pickle
+from core.campaign.engine import MultiObjectiveCampaign, NSGA2Campaign, load_campaign, multi_objective_optimizer
+from core.gui.streamlit_sink import StreamlitSink
+from core.gui.ui_helpers import response_surface_sidebar, warm_start_candidates
+from core.optimization.model_retention import RETENTION_OPTIONS, RETENTION_LABELS
 
 # --- Save/Resume Section ---
 SAVE_DIR = "resumable_multiobjective_runs"
@@ -30,6 +31,16 @@ sim_mode_label = {
 }
 simulation_mode = st.sidebar.selectbox("Experiment Mode", options=["off", "hybrid", "full"], format_func=lambda x: sim_mode_label[x])
 opc_url = st.sidebar.text_input("🔌 OPC Server URL", value="http://em-nun:57080")
+clock_mode = st.sidebar.selectbox(
+    "⏩ Lab Clock",
+    options=CLOCK_MODES,
+    format_func=lambda x: CLOCK_LABELS[x],
+    disabled=simulation_mode != "full",
+    help="Fully simulated campaigns can run faster than real time. The elapsed time still shows lab time. Real hardware (also in hybrid mode) always runs in real time."
+)
+response_surface, noise_model = response_surface_sidebar(disabled=simulation_mode == "off")
+model_retention = st.sidebar.selectbox("🧠 Surrogate History", options=RETENTION_OPTIONS, format_func=lambda x: RETENTION_LABELS[x])
+memory_placeholder = st.sidebar.empty()
 
 # --- Always initialize session state keys ---
 if "simulation_mode" not in st.session_state:
@@ -48,33 +59,19 @@ resume_file = st.sidebar.selectbox(
     options=["None"] + os.listdir(SAVE_DIR)
 )
 if resume_file != "None" and st.sidebar.button("Load Previous Run"):
-    run_path = os.path.join(SAVE_DIR, resume_file)
-    with open(os.path.join(run_path, "optimizer.pkl"), "rb") as f:
-        st.session_state.optimizer = pickle.load(f)
-    df = pd.read_csv(os.path.join(run_path, "experiment_data.csv"))
-    with open(os.path.join(run_path, "metadata.json"), "r") as f:
-        metadata = json.load(f)
+    engine = load_campaign(os.path.join(SAVE_DIR, resume_file), model_retention=model_retention)
+    if engine.runner.simulation_mode == "full":
+        engine.runner.clock = make_clock(clock_mode)
 
     # Restore session state
-    st.session_state.experiment_data = df.to_dict("records")
-    st.session_state.iteration = len(df)
-    st.session_state.variables = metadata["variables"]
-    st.session_state.objectives = metadata["objectives"]
-    st.session_state.total_iterations = metadata["total_iterations"]
+    st.session_state.engine = engine
+    st.session_state.variables = engine.variables
+    st.session_state.objectives = engine.objectives
+    st.session_state.total_iterations = engine.total_iterations
     st.session_state.optimization_running = True
     st.session_state.run_name = resume_file
-
-    # --- Restore simulation_mode and opc_url from metadata ---
-    st.session_state.simulation_mode = metadata.get("simulation_mode", "off")
-    st.session_state.opc_url = metadata.get("opc_url", "http://em-nun:57080")
-
-    # --- Re-initialize OPC client and runner ---
-    st.session_state.opc_client = OPCClient(st.session_state.opc_url)
-    st.session_state.runner = ExperimentRunner(
-        st.session_state.opc_client,
-        "multi_objective_log.csv",
-        simulation_mode=st.session_state.simulation_mode
-    )
+    st.session_state.simulation_mode = engine.runner.simulation_mode
+    st.session_state.opc_url = engine.runner.opc.server_url
 
     st.success(f"Loaded run: {resume_file}")
 
@@ -147,98 +144,94 @@ for obj in objectives:
     )
     objective_directions[obj] = direction
 
+MO_BACKENDS = {
+    "processoptimizer": "ProcessOptimizer (built-in strategy)",
+    "ehvi": "Expected Hypervolume Improvement (EHVI)"
+}
+if simulation_mode == "full":
+    MO_BACKENDS["nsga2"] = "NSGA-II (evolutionary, full simulation only)"
+mo_backend = st.selectbox(
+    "🧠 Multi-Objective Strategy",
+    list(MO_BACKENDS),
+    format_func=lambda x: MO_BACKENDS[x],
+    help="EHVI fits one Gaussian process per objective and picks the point expected to grow the Pareto front the most. "
+         "NSGA-II fits no model and evaluates whole generations at once: a fast reference front for simulated objectives."
+)
+population_size = 40
+if mo_backend == "nsga2":
+    col_pop, col_gen = st.columns(2)
+    population_size = col_pop.number_input("Population Size", min_value=8, max_value=500, value=40)
+    generations = col_gen.number_input("Generations", min_value=1, max_value=1000, value=50)
+    total_iterations = population_size * generations
+    st.caption(f"🧬 {total_iterations} simulated evaluations; Total Iterations is ignored.")
+
+# --- Warm Start ---
+warm_start_options = warm_start_candidates(st.user.email, st.session_state.variables, objectives) if st.session_state.variables and len(objectives) >= 2 else []
+warm_start_runs = st.multiselect(
+    "🔁 Warm Start from Previous Campaigns",
+    warm_start_options,
+    format_func=lambda x: f"{x[1]} ({x[2]})",
+    help="Results of the selected campaigns that fall inside the current bounds are loaded before the first experiment. Results are re-signed when an objective's direction differs from the original campaign."
+)
+
 if st.button("Start Optimization"):
     if len(objectives) < 2:
         st.error("Please select at least two objectives to perform multi-objective optimization.")
     else:
         st.session_state.optimization_running = True
-        st.session_state.iteration = 0
-        st.session_state.experiment_data = []
         st.session_state.simulation_mode = simulation_mode
         st.session_state.opc_url = opc_url
-        st.session_state.opc_client = OPCClient(st.session_state.opc_url)
-        st.session_state.runner = ExperimentRunner(st.session_state.opc_client, "multi_objective_log.csv", simulation_mode=st.session_state.simulation_mode)
-        search_space = [(low, high) for _, low, high, _ in st.session_state.variables]
-        n_objectives = len(objectives)
         st.session_state.objectives = objectives  # <-- Always update objectives in session state
-        st.session_state.optimizer = Optimizer(
-            dimensions=search_space,
-            n_initial_points=initial_experiments,
-            n_objectives=n_objectives
+        optimizer = multi_objective_optimizer(st.session_state.variables, len(objectives), initial_experiments, backend=mo_backend,
+                                              population_size=population_size)
+        if warm_start_runs:
+            X_prior, Y_prior = load_warm_start_data([run[0] for run in warm_start_runs], st.session_state.variables, objectives,
+                                                     objective_directions)
+            n_loaded = warm_start(optimizer, X_prior, Y_prior)
+            st.info(f"🔁 Warm start: loaded {n_loaded} previous experiments.")
+        run_name = experiment_name.strip() if experiment_name.strip() else "multiobjective_experiment"
+        campaign_class = NSGA2Campaign if mo_backend == "nsga2" else MultiObjectiveCampaign
+        st.session_state.engine = campaign_class(
+            optimizer,
+            ExperimentRunner(
+            OPCClient(opc_url), "multi_objective_log.csv", simulation_mode=simulation_mode, clock=make_clock(clock_mode if simulation_mode == "full" else "real"),
+            response_surface=response_surface, noise_model=noise_model
+        ),
+            st.session_state.variables,
+            objectives,
+            total_iterations,
+            name=experiment_name,
+            run_path=os.path.join(SAVE_DIR, run_name),
+            directions=objective_directions,
+            model_retention=model_retention,
+            metadata={
+                "initial_experiments": initial_experiments,
+                "experiment_notes": experiment_notes,
+                "experiment_date": str(experiment_date),
+            },
         )
-        st.session_state.stop_requested = False  # Reset stop flag
-
-# --- Optimization Loop ---
-if st.session_state.get("optimization_running", False):
-    # --- Stop Button ---
-    if st.button("🛑 Stop Experiment"):
-        st.session_state.stop_requested = True
-
-    optimizer = st.session_state.optimizer
-    experiment_data = st.session_state.experiment_data
-    runner = st.session_state.runner
-    iteration = st.session_state.iteration
-    objectives = st.session_state.objectives
-
-    st.markdown("### 📋 Optimization Log")
-    # --- Live Logger Setup ---
-    log_placeholder = st.empty()
-    logger = StreamlitLogger(placeholder=log_placeholder)
-    sys.stdout = logger 
-
-    progress_bar = st.progress(iteration / total_iterations)
-    st.markdown("### Pareto Chart")   
-    pareto_chart_placeholder = st.empty()
 
-    while iteration < total_iterations:
-        if st.session_state.get("stop_requested", False):
-            st.warning("Experiment stopped by user.")
-            st.session_state.optimization_running = False
-            st.session_state.stop_requested = False
-            break
 
-        x = optimizer.ask()
-        params = {name: val for (name, *_), val in zip(st.session_state.variables, x)}
-        result = runner.run_experiment(params, experiment_number=iteration + 1, total_iterations=total_iterations, objectives=objectives, directions=objective_directions)
-        y_multi = [-result[obj] for obj in objectives]
+class MultiObjectiveView(StreamlitSink):
+    """Live Pareto and hypervolume charts of a multi-objective campaign."""
 
-        if not isinstance(y_multi, list) or len(y_multi) != len(objectives):
-            st.error(f"Mismatch: expected {len(objectives)} objectives but got {len(y_multi)} in result.")
-            st.stop()
+    def __init__(self, memory_placeholder, progress_bar, pareto_chart_placeholder, hypervolume_placeholder):
+        super().__init__(memory_placeholder)
+        self.progress_bar = progress_bar
+        self.pareto_chart_placeholder = pareto_chart_placeholder
+        self.hypervolume_placeholder = hypervolume_placeholder
 
-        optimizer.tell(x, y_multi)
-
-        row = {
-            "Experiment #": iteration + 1,
-            "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            **params,
-            **{f"{obj}": result[obj] for obj in objectives}
-        }
-        experiment_data.append(row)
-        df_results = pd.DataFrame(experiment_data)
-        raw_csv_path = runner.save_full_measurements_to_csv(experiment_name)
-
-        # --- Update charts inside the loop ---
+    def on_result(self, engine, row):
+        df_results = engine.results()
+        objectives = engine.objectives
 
         if len(objectives) == 2 and not df_results.empty:
             obj_x, obj_y = objectives[0], objectives[1]
             df_results_plot = df_results.copy()
             for obj in objectives:
-                if st.session_state.get(f"{obj}_direction", "maximize") == "minimize":
+                if engine.directions.get(obj, "maximize") == "minimize":
                     df_results_plot[obj] = -df_results_plot[obj]
-            df_pareto_calc = df_results.copy()
-            for obj in objectives:
-                if st.session_state.get(f"{obj}_direction", "maximize") == "minimize":
-                    df_pareto_calc[obj] = -df_pareto_calc[obj]
-
-            pareto_df = df_pareto_calc[[obj_x, obj_y]].copy().sort_values(by=obj_x, ascending=False)
-            pareto_front_indices = []
-            best_so_far = -np.inf
-            for idx, row_ in pareto_df.iterrows():
-                if row_[obj_y] > best_so_far:
-                    pareto_front_indices.append(idx)
-                    best_so_far = row_[obj_y]
-            pareto_front_df = df_results_plot.loc[pareto_front_indices]
+            pareto_front_df = df_results_plot.loc[engine.pareto_archive.indices]
 
             x_vals = df_results_plot[obj_x]
             y_vals = df_results_plot[obj_y]
@@ -258,75 +251,60 @@ if st.session_state.get("optimization_running", False):
             pareto_line = alt.Chart(pareto_front_df).mark_line(color="red").encode(
                 x=alt.X(f"{obj_x}:Q"), y=alt.Y(f"{obj_y}:Q"))
 
-            pareto_chart_placeholder.altair_chart(chart + pareto_line, use_container_width=True)
+            self.pareto_chart_placeholder.altair_chart(chart + pareto_line, use_container_width=True)
         elif len(objectives) > 2:
-            pareto_chart_placeholder.info("ℹ️ Pareto plot available only for 2 objectives at a time.")
+            self.pareto_chart_placeholder.info("ℹ️ Pareto plot available only for 2 objectives at a time.")
+
+        if engine.hv_tracker is not None:
+            history = engine.hv_tracker.history
+            df_hv = pd.DataFrame({"Experiment #": range(1, len(history) + 1), "Hypervolume": history})
+            self.hypervolume_placeholder.altair_chart(
+                alt.Chart(df_hv).mark_line(point=True).encode(x="Experiment #:Q", y="Hypervolume:Q", tooltip=["Experiment #", "Hypervolume"]),
+                use_container_width=True
+            )
+        else:
+            self.hypervolume_placeholder.info(f"ℹ️ Hypervolume is tracked after the {engine.n_reference} initialization experiments.")
 
-        iteration += 1
-        st.session_state.iteration = iteration
-        st.session_state.experiment_data = experiment_data
-        progress_bar.progress(iteration / total_iterations)
-        time.sleep(0.5)
+        self.progress_bar.progress(engine.iteration / engine.total_iterations)
 
-        # --- Save after each iteration ---
-        run_name = experiment_name.strip() if experiment_name.strip() else "multiobjective_experiment"
-        run_path = os.path.join(SAVE_DIR, run_name)
-        os.makedirs(run_path, exist_ok=True)
-        df_results.to_csv(os.path.join(run_path, "experiment_data.csv"), index=False)
-        with open(os.path.join(run_path, "optimizer.pkl"), "wb") as f:
-            pickle.dump(optimizer, f)
-        metadata = {
-            "variables": st.session_state.variables,
-            "objectives": objectives,
-            "total_iterations": total_iterations,
-            "experiment_name": experiment_name,
-            "experiment_notes": experiment_notes,
-            "experiment_date": str(experiment_date),
-            "simulation_mode": st.session_state.simulation_mode,
-            "opc_url": st.session_state.opc_url
-        }
-        with open(os.path.join(run_path, "metadata.json"), "w") as f:
-            json.dump(metadata, f, indent=4)
-
-    if iteration == total_iterations:
-        st.success("✅ Multi-objective Optimization Complete!")
+
+# --- Optimization Loop ---
+if st.session_state.get("optimization_running", False):
+    engine = st.session_state.engine
+
+    # --- Stop Button ---
+    if st.button("🛑 Stop Experiment"):
+        engine.stop()
         st.session_state.optimization_running = False
+        st.warning("Experiment stopped by user.")
 
-        # Save results to CSV and metadata as before...
+if st.session_state.get("optimization_running", False):
+    st.markdown("### 📋 Optimization Log")
+    # --- Live Logger Setup ---
+    log_placeholder = st.empty()
+    logger = StreamlitLogger(placeholder=log_placeholder)
+    sys.stdout = logger 
+
+    progress_bar = st.progress(engine.iteration / engine.total_iterations)
+    st.markdown("### Pareto Chart")   
+    pareto_chart_placeholder = st.empty()
+    st.markdown("### 📈 Hypervolume")
+    hypervolume_placeholder = st.empty()
+
+    engine.set_sinks([MultiObjectiveView(memory_placeholder, progress_bar, pareto_chart_placeholder, hypervolume_placeholder)])
+    df_results = engine.run()
+
+    if engine.finished:
+        st.success("✅ Multi-objective Optimization Complete!")
+        st.session_state.optimization_running = False
 
-        # --- Compute Pareto front for saving ---
-        if len(objectives) == 2 and not df_results.empty:
-            obj_x, obj_y = objectives[0], objectives[1]
-            df_pareto_calc = df_results.copy()
-            for obj in objectives:
-                if st.session_state.get(f"{obj}_direction", "maximize") == "minimize":
-                    df_pareto_calc[obj] = -df_pareto_calc[obj]
-            pareto_df = df_pareto_calc[[obj_x, obj_y]].copy().sort_values(by=obj_x, ascending=False)
-            pareto_front_indices = []
-            best_so_far = -np.inf
-            for idx, row_ in pareto_df.iterrows():
-                if row_[obj_y] > best_so_far:
-                    pareto_front_indices.append(idx)
-                    best_so_far = row_[obj_y]
-            pareto_front_df = df_results.loc[pareto_front_indices]
-            best_result = pareto_front_df.to_dict("records")
-        else:
-            best_result = None
-
-        optimization_settings = {
-            "initial_experiments": initial_experiments,
-            "total_iterations": total_iterations,
-            "objectives": objectives,
-            "method": "Bayesian Multi-Objective",
-            "simulation_mode": st.session_state.simulation_mode,
-            "opc_url": st.session_state.opc_url
-        }
         db_handler.save_experiment(
-            name=experiment_name,
+            user_email=st.user.email,
+            name=engine.name,
             notes=experiment_notes,
-            variables=st.session_state.variables,
+            variables=engine.variables,
             df_results=df_results,
-            best_result=best_result,
-            settings=optimization_settings
+            best_result=engine.best_result(),
+            settings=engine.settings()
         )
         st.info("All results and Pareto front saved to the database.")
@@ -1,18 +1,18 @@
 import streamlit as st
 from datetime import datetime
 import numpy as np
-import pandas as pd
 import altair as alt
-import time
-import dill as pickle
+from core.optimization.model_retention import RETENTION_OPTIONS, RETENTION_LABELS
 import os
-import json
-from skopt.space import Real, Categorical  # <-- Add this import
-from core.optimization.bayesian_optimization import StepBayesianOptimizer
+from core.campaign.engine import SingleObjectiveCampaign, load_campaign, single_objective_optimizer
+from core.gui.streamlit_sink import StreamlitSink
+from core.gui.ui_helpers import response_surface_sidebar, warm_start_candidates
+from core.optimization.warm_start import load_warm_start_data, warm_start
 from core.utils.export_tools import export_to_csv, export_to_excel
 from core.utils import db_handler
 from core.hardware.opc_communication import OPCClient
 from core.hardware.experimental_run import ExperimentRunner
+from core.hardware.clock import CLOCK_MODES, CLOCK_LABELS, make_clock
 from core.utils.logger import StreamlitLogger
 import sys
 
@@ -32,7 +32,17 @@ simulation_mode = st.sidebar.selectbox("Experiment Mode", options=["off", "hybri
 st.session_state.simulation_mode = simulation_mode
 
 opc_url = st.sidebar.text_input("🔌 OPC Server URL", value="http://em-nun:57080")
+clock_mode = st.sidebar.selectbox(
+    "⏩ Lab Clock",
+    options=CLOCK_MODES,
+    format_func=lambda x: CLOCK_LABELS[x],
+    disabled=simulation_mode != "full",
+    help="Fully simulated campaigns can run faster than real time. The elapsed time still shows lab time. Real hardware (also in hybrid mode) always runs in real time."
+)
 st.session_state.opc_url = opc_url
+response_surface, noise_model = response_surface_sidebar(disabled=simulation_mode == "off")
+model_retention = st.sidebar.selectbox("🧠 Surrogate History", options=RETENTION_OPTIONS, format_func=lambda x: RETENTION_LABELS[x])
+memory_placeholder = st.sidebar.empty()
 
 if simulation_mode != "off":
     st.warning("⚠️ Simulation Mode is ON — OPC hardware interaction is partially or fully disabled.")
@@ -41,19 +51,13 @@ if simulation_mode != "off":
 st.sidebar.markdown("---")
 resume_file = st.sidebar.selectbox("🔄 Resume from Previous Run", options=["None"] + os.listdir(SAVE_DIR))
 if resume_file != "None" and st.sidebar.button("Load Previous Run"):
-    run_path = os.path.join(SAVE_DIR, resume_file)
-    with open(os.path.join(run_path, "optimizer.pkl"), "rb") as f:
-        st.session_state.optimizer = pickle.load(f)
-    df = pd.read_csv(os.path.join(run_path, "experiment_data.csv"))
-    with open(os.path.join(run_path, "metadata.json"), "r") as f:
-        metadata = json.load(f)
-
-    st.session_state.experiment_data = df.to_dict("records")
-    st.session_state.iteration = len(df)
-    st.session_state.variables = metadata["variables"]
-    st.session_state.response_to_optimize = metadata["response"]
-    st.session_state.total_iterations = metadata["total_iterations"]
-    st.session_state.runner = ExperimentRunner(OPCClient(metadata["opc_url"]), "experiment_log.csv", simulation_mode=metadata["simulation_mode"])
+    engine = load_campaign(os.path.join(SAVE_DIR, resume_file))
+    if engine.runner.simulation_mode == "full":
+        engine.runner.clock = make_clock(clock_mode)
+    st.session_state.engine = engine
+    st.session_state.variables = engine.variables
+    st.session_state.response_to_optimize = engine.objective
+    st.session_state.total_iterations = engine.total_iterations
     st.session_state.optimization_running = True
     st.session_state.run_name = resume_file
 
@@ -100,7 +104,7 @@ else:
 st.subheader("⚙️ Optimization Settings")
 col5, col6, col7 = st.columns(3)
 initial_experiments = col5.number_input("Initialization Experiments", min_value=1, max_value=100, value=5)
-total_iterations = col6.number_input("Total Iterations", min_value=1, max_value=100, value=20)
+total_iterations = col6.number_input("Total Iterations", min_value=1, max_value=2000 if simulation_mode == "full" else 100, value=20)
 OBJECTIVE_OPTIONS = [
     "Yield",
     "Normalized Area",
@@ -115,77 +119,84 @@ response_to_optimize = col7.selectbox("Response to Optimize",OBJECTIVE_OPTIONS)
 st.session_state.total_iterations = total_iterations
 st.session_state.response_to_optimize = response_to_optimize
 
+col8, col9 = st.columns(2)
+batch_size = col8.number_input("Experiments per Batch", min_value=1, max_value=20, value=1)
+batch_strategy = col9.selectbox("Batch Strategy", ["cl_min", "cl_mean", "cl_max", "kriging_believer"], disabled=batch_size == 1)
+SURROGATE_LABELS = {"GP": "Gaussian Process (exact)", "SGP": "Sparse Gaussian Process (long simulations)"}
+surrogate = st.selectbox(
+    "🧮 Surrogate Model",
+    list(SURROGATE_LABELS),
+    format_func=lambda x: SURROGATE_LABELS[x],
+    disabled=simulation_mode != "full",
+    help="The sparse GP keeps fitting fast over hundreds of iterations. Only available in full simulation mode."
+)
+trust_region = st.checkbox(
+    "🎯 Trust Region (TuRBO)",
+    value=len(st.session_state.variables) >= 5,
+    help="Fits the surrogate only on experiments near the current best and searches a box around it that grows "
+         "after improvements and shrinks after failures. Recommended for five or more variables."
+)
+
+# --- Warm Start ---
+warm_start_options = warm_start_candidates(st.user.email, st.session_state.variables, [response_to_optimize]) if st.session_state.variables else []
+warm_start_runs = st.multiselect(
+    "🔁 Warm Start from Previous Campaigns",
+    warm_start_options,
+    format_func=lambda x: f"{x[1]} ({x[2]})",
+    help="Results of the selected campaigns that fall inside the current bounds are loaded before the first experiment."
+)
+
 # --- Run & Stop Buttons ---
 col_start, col_stop = st.columns(2)
 if col_start.button("▶ Start Optimization"):
-    run_path = os.path.join(SAVE_DIR, experiment_name)
-    os.makedirs(run_path, exist_ok=True)
-    # --- FIX: Use Real for continuous variables ---
-    opt_vars = [Real(low, high, name=name) for name, low, high, _ in st.session_state.variables]
-    st.session_state.optimizer = StepBayesianOptimizer(opt_vars)
-    st.session_state.experiment_data = []
-    st.session_state.iteration = 0
-    st.session_state.runner = ExperimentRunner(OPCClient(opc_url), "experiment_log.csv", simulation_mode=simulation_mode)
+    optimizer = single_objective_optimizer(
+        st.session_state.variables,
+        base_estimator=surrogate if simulation_mode == "full" else "GP",
+        model_retention=model_retention,
+        n_initial_points=initial_experiments,
+        trust_region=trust_region,
+    )
+    if warm_start_runs:
+        X_prior, Y_prior = load_warm_start_data([run[0] for run in warm_start_runs], st.session_state.variables, [response_to_optimize])
+        n_loaded = warm_start(optimizer, X_prior, Y_prior)
+        st.info(f"🔁 Warm start: loaded {n_loaded} previous experiments.")
+    st.session_state.engine = SingleObjectiveCampaign(
+        optimizer,
+        ExperimentRunner(
+            OPCClient(opc_url), "experiment_log.csv", simulation_mode=simulation_mode, clock=make_clock(clock_mode if simulation_mode == "full" else "real"),
+            response_surface=response_surface, noise_model=noise_model
+        ),
+        st.session_state.variables,
+        [response_to_optimize],
+        total_iterations,
+        name=experiment_name,
+        run_path=os.path.join(SAVE_DIR, experiment_name),
+        batch_size=batch_size,
+        batch_strategy=batch_strategy,
+        metadata={"initial_experiments": initial_experiments},
+    )
     st.session_state.optimization_running = True
 
 if col_stop.button("🛑 Stop Optimization"):
     st.session_state.optimization_running = False
+    if "engine" in st.session_state:
+        st.session_state.engine.stop()
     st.warning("🛑 Optimization manually stopped.")
 
-# --- Optimization Loop ---
-if st.session_state.get("optimization_running", False):
-    log_placeholder = st.empty()
-    logger = StreamlitLogger(placeholder=log_placeholder)
-    sys.stdout = logger
-
-    optimizer = st.session_state.optimizer
-    experiment_data = st.session_state.experiment_data
-    iteration = st.session_state.iteration
-    runner = st.session_state.runner
-    total_iterations = st.session_state.total_iterations
-    response_to_optimize = st.session_state.response_to_optimize
-    run_name = st.session_state.run_name
-    run_path = os.path.join(SAVE_DIR, run_name)
-
-    results_chart = st.empty()
-    scatter_rows = [st.columns(2) for _ in range((len(st.session_state.variables) + 1) // 2)]
-    scatter_placeholders = [col.empty() for row in scatter_rows for col in row][:len(st.session_state.variables)]
-
-    while iteration < total_iterations and st.session_state.optimization_running:
-        x = optimizer.suggest()
-        params = {name: val for (name, *_), val in zip(st.session_state.variables, x)}
-        result = runner.run_experiment(params, experiment_number=iteration + 1, total_iterations=total_iterations, objectives=[response_to_optimize])
-        y = -result[response_to_optimize]
-        optimizer.observe(x, y)
 
-        row = {
-            "Experiment #": iteration + 1,
-            "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            **params,
-            "Measurement": -y,
-            response_to_optimize: result[response_to_optimize]
-        }
-        experiment_data.append(row)
-        df_results = pd.DataFrame(experiment_data)
-        raw_csv_path = runner.save_full_measurements_to_csv(experiment_name)
+class SingleObjectiveView(StreamlitSink):
+    """Live charts of a single-objective campaign."""
 
-        os.makedirs(run_path, exist_ok=True)
-        df_results.to_csv(os.path.join(run_path, "experiment_data.csv"), index=False)
-        with open(os.path.join(run_path, "optimizer.pkl"), "wb") as f:
-            pickle.dump(optimizer, f)
-        metadata = {
-            "variables": st.session_state.variables,
-            "response": response_to_optimize,
-            "total_iterations": total_iterations,
-            "opc_url": opc_url,
-            "simulation_mode": simulation_mode
-        }
-        with open(os.path.join(run_path, "metadata.json"), "w") as f:
-            json.dump(metadata, f, indent=4)
+    def __init__(self, memory_placeholder, results_chart, scatter_placeholders):
+        super().__init__(memory_placeholder)
+        self.results_chart = results_chart
+        self.scatter_placeholders = scatter_placeholders
 
-        results_chart.line_chart(df_results[["Experiment #", response_to_optimize]].set_index("Experiment #"))
+    def on_result(self, engine, row):
+        df_results = engine.results()
+        self.results_chart.line_chart(df_results[["Experiment #", engine.objective]].set_index("Experiment #"))
 
-        for idx, (name, low, high, _) in enumerate(st.session_state.variables):
+        for idx, (name, low, high, _) in enumerate(engine.variables):
             df = df_results[[name, "Measurement"]]
             y_min = df["Measurement"].min()
             y_max = df["Measurement"].max()
@@ -197,60 +208,41 @@ if st.session_state.get("optimization_running", False):
                 height=350,
                 title=alt.TitleParams(text=f"{name} vs Measurement", anchor="middle")
             )
-            scatter_placeholders[idx].altair_chart(chart, use_container_width=True)
+            self.scatter_placeholders[idx].altair_chart(chart, use_container_width=True)
 
-        iteration += 1
-        st.session_state.iteration = iteration
-        st.session_state.experiment_data = experiment_data
-        time.sleep(1)
 
-    if experiment_data and iteration == total_iterations:
-        df_results = pd.DataFrame(experiment_data)
+# --- Optimization Loop ---
+if st.session_state.get("optimization_running", False):
+    log_placeholder = st.empty()
+    logger = StreamlitLogger(placeholder=log_placeholder)
+    sys.stdout = logger
+
+    engine = st.session_state.engine
+    run_name = engine.name
+
+    results_chart = st.empty()
+    scatter_rows = [st.columns(2) for _ in range((len(engine.variables) + 1) // 2)]
+    scatter_placeholders = [col.empty() for row in scatter_rows for col in row][:len(engine.variables)]
+    engine.set_sinks([SingleObjectiveView(memory_placeholder, results_chart, scatter_placeholders)])
+    df_results = engine.run()
+
+    if engine.experiment_data and engine.finished:
         st.success("✅ Optimization Complete!")
-        best_row = df_results.loc[df_results["Measurement"].idxmax()]
+        best_row = engine.best_result()
         st.markdown("### 🥇 Best Result")
         st.write(best_row)
 
         export_to_csv(df_results, f"{run_name}_final_results.csv")
         export_to_excel(df_results, f"{run_name}_final_results.xlsx")
 
-        optimization_settings = {
-            "initial_experiments": initial_experiments,
-            "total_iterations": total_iterations,
-            "objective": response_to_optimize,
-            "method": "Bayesian Single Objective",
-            "simulation_mode": simulation_mode,
-            "opc_url": opc_url
-        }
-
         db_handler.save_experiment(
+            user_email=st.user.email,
             name=experiment_name,
             notes=experiment_notes,
-            variables=st.session_state.variables,
+            variables=engine.variables,
             df_results=df_results,
-            best_result=best_row,
-            settings=optimization_settings
+            best_result=best_row.to_dict(),
+            settings=engine.settings()
         )
 
         st.session_state.optimization_running = False
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,69 @@
+import streamlit as st
+import altair as alt
+from io import BytesIO
+from core.campaign.comparison import (
+    ACQ_FUNCS, BACKENDS, BACKEND_LABELS, ESTIMATORS, compare_strategies, strategy_grid, summarize
+)
+from core.objectives import OBJECTIVES
+from core.response_surfaces import SURFACES, NoiseModel
+
+# --- Page Title ---
+st.title("🏁 Strategy Comparison")
+st.markdown(
+    "Run many **full-simulation** campaigns in parallel, one per strategy and seed, "
+    "and compare how fast each strategy approaches the true optimum of the simulated reactor."
+)
+
+# --- Strategies ---
+st.subheader("⚙️ Strategies")
+col1, col2 = st.columns(2)
+backends = col1.multiselect("Optimizer", BACKENDS, default=["step"], format_func=lambda x: BACKEND_LABELS[x])
+acq_funcs = col2.multiselect("Acquisition Functions", ACQ_FUNCS, default=["EI", "LCB"])
+col3, col4 = st.columns(2)
+estimators = col3.multiselect("Surrogate Models", sorted({e for ests in ESTIMATORS.values() for e in ests}), default=["GP"])
+initial_points = col4.multiselect("Initialization Experiments", [1, 3, 5, 8, 10, 15], default=[5])
+
+# --- Campaign ---
+st.subheader("🧪 Simulated Campaign")
+col5, col6, col7 = st.columns(3)
+objective = col5.selectbox("Response to Optimize", list(OBJECTIVES))
+iterations = col6.number_input("Iterations per Campaign", min_value=5, max_value=200, value=20)
+n_seeds = col7.number_input("Seeds per Strategy", min_value=1, max_value=20, value=3)
+col8, col9 = st.columns(2)
+rt_low = col8.number_input("Residence Time Lower Bound (min)", value=5.0)
+rt_high = col9.number_input("Residence Time Upper Bound (min)", value=30.0)
+
+col10, col11 = st.columns(2)
+response_surface = col10.selectbox("🧬 Response Surface", list(SURFACES))
+noise_std = col11.number_input("Noise Std", min_value=0.0, max_value=0.5, value=0.05, step=0.01)
+st.caption(SURFACES[response_surface].description)
+
+strategies = strategy_grid(backends, acq_funcs, estimators, initial_points)
+st.caption(f"{len(strategies)} strategies × {n_seeds} seeds = {len(strategies) * n_seeds} campaigns")
+
+if st.button("▶ Run Comparison", disabled=not strategies or rt_low >= rt_high):
+    with st.spinner("Running simulated campaigns..."):
+        st.session_state.comparison = compare_strategies(
+            strategies, [("residence_time", rt_low, rt_high, "min")], objective, iterations, range(n_seeds),
+            response_surface=response_surface, noise_model=NoiseModel(noise_std)
+        )
+
+# --- Results ---
+if "comparison" in st.session_state:
+    df = st.session_state.comparison
+    st.subheader("📊 Results")
+    st.dataframe(summarize(df), use_container_width=True)
+
+    curves = df.groupby(["strategy", "iteration"], as_index=False)["regret"].mean()
+    st.markdown("### 📉 Regret Curves (mean over seeds)")
+    st.altair_chart(
+        alt.Chart(curves).mark_line(point=True).encode(
+            x="iteration:Q", y=alt.Y("regret:Q", title="Regret"), color="strategy:N", tooltip=["strategy", "iteration", "regret"]
+        ),
+        use_container_width=True
+    )
+
+    buffer = BytesIO()
+    df.to_parquet(buffer, index=False)
+    st.download_button("📥 Download Parquet", data=buffer.getvalue(), file_name="strategy_comparison.parquet",
+                       mime="application/octet-stream")
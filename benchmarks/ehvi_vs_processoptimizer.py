@@ -0,0 +1,76 @@
+# ehvi_vs_processoptimizer.py
+# Run from the repository root:  python -m benchmarks.ehvi_vs_processoptimizer --iterations 25 --seeds 3
+import argparse
+import time
+import warnings
+import numpy as np
+from core.objectives import normalized_area, used_organic, space_time_yield
+from core.optimization.ehvi import EHVIOptimizer
+from core.optimization.hypervolume import hypervolume, reference_point
+
+REACTOR_VOLUME = 1.4  # mL
+DIMENSIONS = [(5.0, 30.0), (0.5, 2.0)]  # residence time [min], organic/aqueous flow ratio
+
+
+def simulated_objectives(x, rng, n_objectives):
+    """
+    Simulated flow-reactor campaign in the minimize convention used by the
+    optimizers: -Normalized Area, Used Organic and -Space-Time Yield. The raw
+    area follows the "linear" response surface in core/response_surfaces.py.
+    """
+    res_time, ratio = x
+    raw_area = float(np.clip(4.0 - 0.015 * res_time + 0.3 * (1.5 - ratio) + rng.normal(0, 0.05), 3.0, 4.0))
+    total_flow = REACTOR_VOLUME / (res_time / 60)
+    flow_aq = total_flow / (1 + ratio)
+    flow_org = total_flow - flow_aq
+    values = [
+        -normalized_area(raw_area, flow_aq, flow_org),
+        used_organic(flow_org, res_time),
+        -space_time_yield(raw_area, flow_org, flow_aq, res_time, REACTOR_VOLUME),
+    ]
+    return values[:n_objectives]
+
+
+def run(backend, seed, iterations, n_initial, n_objectives):
+    from ProcessOptimizer import Optimizer
+
+    cls = EHVIOptimizer if backend == "ehvi" else Optimizer
+    optimizer = cls(DIMENSIONS, n_initial_points=n_initial, n_objectives=n_objectives, random_state=seed)
+    rng = np.random.default_rng(seed)
+    step_times = []
+    x = optimizer.ask()
+    for _ in range(iterations):
+        y = simulated_objectives(x, rng, n_objectives)
+        # ProcessOptimizer picks its next point inside tell, so time both
+        start = time.perf_counter()
+        optimizer.tell(x, y)
+        x = optimizer.ask()
+        step_times.append(time.perf_counter() - start)
+    return np.array(optimizer.yi), np.mean(step_times[n_initial:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EHVI vs. ProcessOptimizer on the simulated reactor objectives")
+    parser.add_argument("--iterations", type=int, default=25)
+    parser.add_argument("--initial", type=int, default=5)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--objectives", type=int, default=2, choices=[2, 3])
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    results = {}
+    for backend in ["processoptimizer", "ehvi"]:
+        results[backend] = [run(backend, seed, args.iterations, args.initial, args.objectives) for seed in range(args.seeds)]
+
+    # One reference point for every run, so the hypervolumes are comparable
+    ref = reference_point(np.vstack([Y for runs in results.values() for Y, _ in runs]))
+    print(f"{'backend':>16} | {'hypervolume':>18} | {'tell+ask [ms]':>13}")
+    print("-" * 54)
+    for backend, runs in results.items():
+        hv = [hypervolume(Y, ref) for Y, _ in runs]
+        step = np.mean([t for _, t in runs]) * 1000
+        print(f"{backend:>16} | {np.mean(hv):>10.4f} ± {np.std(hv):<6.4f} | {step:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# opc_hardware_path.py
+# The ExperimentRunner hardware path ("off" mode) against the local OPC
+# stand-in, with injected latency and faults. Run from the repository root:
+#
+#   python -m benchmarks.opc_hardware_path --latency 0.02 --jitter 0.01 --error-rate 0.05
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+import numpy as np
+from core.hardware.experimental_run import SIGNALS, ExperimentRunner
+from core.hardware.opc_communication import OPCClient
+from core.hardware.opc_stand_in import ReactorModel, serve
+
+
+def timed(func, rounds):
+    """Milliseconds per call of ``func()`` over ``rounds`` calls."""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):  # The runner and client print every write
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            times.append(1000 * (time.perf_counter() - start))
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OPC hardware path against the local stand-in")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--single-item", action="store_true", help="stand-in without multi-item requests")
+    parser.add_argument("--bulk-writes", action="store_true", help="let the client send multi-item writes (off by default)")
+    parser.add_argument("--speedup", type=float, default=600.0, help="lab time speed-up for the chiller wait")
+    args = parser.parse_args()
+
+    server = serve(
+        model=ReactorModel(speedup=args.speedup, seed=0), latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, drop_rate=args.drop_rate, multi_item=not args.single_item, seed=0,
+    )
+    client = OPCClient(server.url, backoff=0.05, bulk=True if args.bulk_writes else None)
+    runner = ExperimentRunner(client, "experiment_log.csv", simulation_mode="off")
+    items = list(SIGNALS.values())
+
+    cases = {
+        "3 signals, read_value each": lambda: [client.read_value(item) for item in items],
+        "3 signals, read_many": lambda: client.read_many(items),
+        "3 signals, AsyncOPCClient": lambda: asyncio.run(runner.aopc.read_many(items)),
+        "set_pump_flows": lambda: runner.set_pump_flows(20),
+        "stop_pumps": runner.stop_pumps,
+    }
+    print(f"{'operation':<30}{'mean ms':>10}{'p95 ms':>10}")
+    for label, func in cases.items():
+        ms = timed(func, args.rounds)
+        print(f"{label:<30}{ms.mean():>10.1f}{np.percentile(ms, 95):>10.1f}")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.set_pump_flows(20)
+        asyncio.run(runner.monitor_temperature_async(10, interval=0.1))
+    lab_minutes = server.model.state()["lab_seconds"] / 60
+    print(f"\nChiller 22→10 °C: {time.perf_counter() - start:.1f} s ({lab_minutes:.0f} lab min so far), "
+          f"{len(runner.signal_log)} signal samples")
+    print(f"Multi-item requests: read {client.bulk}, write {client.bulk_write}")
+    print(f"Stand-in: {server.counts}")
+    for operation, stats in client.latency.summary().items():
+        print(f"  {operation:<12}{stats}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# sparse_gp.py
+# Run from the repository root:  python -m benchmarks.sparse_gp --sizes 100 250 500 1000
+import argparse
+import time
+import warnings
+import numpy as np
+from skopt.space import Real, Space
+from skopt.utils import cook_estimator, normalize_dimensions
+from core.optimization.sparse_gp import sparse_gp_for_space
+
+
+def response(X):
+    """Smooth 3-D test surface with a narrow optimum."""
+    return np.sum((X - 0.3) ** 2, axis=1) + 0.2 * np.sin(6 * X[:, 0]) * X[:, 1]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def measure(model, X, y, X_test, y_test):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        _, fit_time = timed(lambda: model.fit(X, y))
+    (mean, std), predict_time = timed(lambda: model.predict(X_test, return_std=True))
+    rmse = np.sqrt(np.mean((mean - y_test) ** 2))
+    # Fraction of test points inside the 95% predictive interval
+    coverage = np.mean(np.abs(mean - y_test) <= 1.96 * np.sqrt(std ** 2 + 0.01 ** 2))
+    return fit_time, predict_time, rmse, coverage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact vs. sparse GP: fit time, predict time and accuracy")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000], help="numbers of observations")
+    parser.add_argument("--inducing", type=int, default=100, help="inducing points of the sparse GP")
+    parser.add_argument("--test", type=int, default=2000, help="number of test points")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    space = Space(normalize_dimensions([Real(0.0, 1.0, name=f"x{i}") for i in range(3)]))
+    X_test = rng.random((args.test, 3))
+    y_test = response(X_test)
+
+    header = f"{'n_obs':>6} | {'model':>6} | {'fit [s]':>8} | {'predict [ms]':>12} | {'RMSE':>7} | {'95% cov.':>8}"
+    print(header)
+    print("-" * len(header))
+    for n in args.sizes:
+        X = rng.random((n, 3))
+        y = response(X) + 0.01 * rng.normal(size=n)
+        models = {
+            "exact": cook_estimator("GP", space=space, random_state=0),
+            "sparse": sparse_gp_for_space(space, n_inducing=args.inducing, random_state=0),
+        }
+        for name, model in models.items():
+            fit_time, predict_time, rmse, coverage = measure(model, X, y, X_test, y_test)
+            print(f"{n:>6} | {name:>6} | {fit_time:>8.2f} | {predict_time * 1000:>12.1f} | {rmse:>7.4f} | {coverage:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
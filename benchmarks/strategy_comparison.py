@@ -0,0 +1,44 @@
+# strategy_comparison.py
+# Compare acquisition functions, surrogates and initial-design sizes on
+# simulated campaigns, in parallel over all cores.
+#
+#   python -m benchmarks.strategy_comparison --acq EI LCB --estimators GP RF \
+#       --initial 3 8 --seeds 5 --output comparison.parquet
+import argparse
+import warnings
+from core.campaign.comparison import ACQ_FUNCS, BACKENDS, compare_strategies, strategy_grid, summarize
+from core.objectives import OBJECTIVES
+from core.response_surfaces import SURFACES, NoiseModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare optimization strategies on simulated campaigns")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--acq", nargs="+", choices=ACQ_FUNCS, default=["EI"])
+    parser.add_argument("--estimators", nargs="+", default=["GP"])
+    parser.add_argument("--initial", nargs="+", type=int, default=[5])
+    parser.add_argument("--objective", choices=list(OBJECTIVES), default="Yield")
+    parser.add_argument("--residence-time", nargs=2, type=float, default=[5.0, 30.0], metavar=("LOW", "HIGH"))
+    parser.add_argument("--surface", choices=list(SURFACES), default="linear")
+    parser.add_argument("--noise", type=float, default=0.05, help="measurement noise standard deviation")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write every experiment of every run to this Parquet file")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    strategies = strategy_grid(args.backends, args.acq, args.estimators, args.initial)
+    variables = [("residence_time", *args.residence_time, "min")]
+    df = compare_strategies(
+        strategies, variables, args.objective, args.iterations, range(args.seeds), args.workers,
+        response_surface=args.surface, noise_model=NoiseModel(args.noise)
+    )
+    print(summarize(df).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if args.output:
+        df.to_parquet(args.output, index=False)
+        print(f"📁 {len(df)} rows written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
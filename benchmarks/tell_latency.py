@@ -0,0 +1,49 @@
+# tell_latency.py
+# Run from the repository root:  python -m benchmarks.tell_latency --n 120 --n-jobs -1
+import argparse
+import time
+import numpy as np
+from skopt.space import Real
+from core.optimization.bayesian_optimization import StepBayesianOptimizer
+
+
+def objective(x, rng):
+    """Smooth 3-D test function with a little measurement noise."""
+    x = np.asarray(x)
+    return float(np.sum((x - 0.3) ** 2) + 0.01 * rng.normal())
+
+
+def measure(update_mode, n_obs, seed=0, n_jobs=1):
+    rng = np.random.default_rng(seed)
+    variables = [Real(0.0, 1.0, name=f"x{i}") for i in range(3)]
+    optimizer = StepBayesianOptimizer(variables, update_mode=update_mode, random_state=seed, n_jobs=n_jobs)
+    latencies = []
+    for _ in range(n_obs):
+        x = optimizer.suggest()
+        y = objective(x, rng)
+        start = time.perf_counter()
+        optimizer.observe(x, y)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tell latency vs. number of observations")
+    parser.add_argument("--n", type=int, default=120, help="number of observations")
+    parser.add_argument("--n-jobs", type=int, default=1, help="processes for GP hyperparameter restarts (-1: all cores)")
+    parser.add_argument("--window", type=int, default=10, help="rows are averaged over this many tells")
+    args = parser.parse_args()
+
+    results = {mode: measure(mode, args.n, n_jobs=args.n_jobs) for mode in ["refit", "incremental"]}
+
+    print(f"{'n_obs':>6} | {'refit [ms]':>11} | {'incremental [ms]':>17}")
+    print("-" * 41)
+    for end in range(args.window, args.n + 1, args.window):
+        row = [results[mode][end - args.window:end].mean() * 1000 for mode in ["refit", "incremental"]]
+        print(f"{end:>6} | {row[0]:>11.1f} | {row[1]:>17.1f}")
+    print("-" * 41)
+    print(f"{'total':>6} | {results['refit'].sum():>10.2f}s | {results['incremental'].sum():>16.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# temperature_settling.py
+# Chiller wait with the SettlingDetector that ExperimentRunner.monitor_temperature
+# uses, against the old rule (read every 5 s until |ΔT| <= 0.5 °C), on the
+# OPC stand-in's first-order chiller and on an underdamped chiller that
+# overshoots. Readings are taken in virtual lab time (the runner itself only
+# runs hardware modes on the real clock), so this takes seconds. Run from the
+# repository root:
+#
+#   python -m benchmarks.temperature_settling --lead 60
+import argparse
+import math
+import numpy as np
+from core.hardware.opc_stand_in import ReactorModel
+from core.hardware.settling import SettlingDetector
+
+STEPS = [(22, 10), (10, 30), (30, 25), (25, 5)]
+MODELS = {
+    "First-order chiller (OPC stand-in)": lambda start, target: first_order(start, target, ReactorModel().chiller_tau),
+    "Underdamped chiller (overshoots)": lambda start, target: underdamped(start, target),
+}
+
+
+def first_order(start, target, tau):
+    """Chiller temperature at ``t`` seconds after the setpoint moved from ``start`` to ``target``."""
+    return lambda t: target + (start - target) * math.exp(-t / tau)
+
+
+def underdamped(start, target, tau=150.0, period=400.0):
+    """Chiller temperature at ``t`` seconds after the setpoint moved from ``start`` to ``target``."""
+    return lambda t: target + (start - target) * math.exp(-t / tau) * math.cos(2 * math.pi * t / period)
+
+
+def old_rule(temperature, target, rng, noise=0.05):
+    """Seconds and readings until a reading is within 0.5 °C, polling every 5 s."""
+    t = 0.0
+    while abs(temperature(t) + rng.normal(0.0, noise) - target) > 0.5:
+        t += 5
+    return t, int(t / 5) + 1
+
+
+def detector_rule(temperature, target, rng, lead, noise=0.05):
+    """Seconds and readings until the SettlingDetector has settled."""
+    detector, t, reads = SettlingDetector(target, lead=lead), 0.0, 0
+    while True:
+        detector.add(t, temperature(t) + rng.normal(0.0, noise))
+        reads += 1
+        if detector.settled():
+            return t, reads
+        t += detector.next_interval()
+
+
+def settled_range(temperature, t):
+    """Lowest and highest temperature from ``t`` until 30 lab minutes later."""
+    values = [temperature(t + s) for s in range(1800)]
+    return min(values), max(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark predictive chiller settling against fixed polling")
+    parser.add_argument("--lead", type=float, default=60.0, help="seconds of settling left to the pump start-up")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    for title, model in MODELS.items():
+        print(title)
+        print(f"{'step':<12}{'old s':>8}{'reads':>7}{'range after':>16}{'new s':>8}{'reads':>7}{'range after':>16}")
+        for start, target in STEPS:
+            temperature = model(start, target)
+            old_t, old_reads = old_rule(temperature, target, rng)
+            new_t, new_reads = detector_rule(temperature, target, rng, args.lead)
+            old_low, old_high = settled_range(temperature, old_t)
+            new_low, new_high = settled_range(temperature, new_t + args.lead)
+            print(f"{start:>3} → {target:<5}{old_t:>8.0f}{old_reads:>7}{old_low:>8.1f}–{old_high:<7.1f}"
+                  f"{new_t:>8.0f}{new_reads:>7}{new_low:>8.1f}–{new_high:<7.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# trust_region.py
+# Global vs. trust-region StepBayesianOptimizer on the 6-D Hartmann function.
+# Run from the repository root:  python -m benchmarks.trust_region --iterations 60 --seeds 3
+import argparse
+import time
+import warnings
+import numpy as np
+from skopt.space import Real
+from core.optimization.bayesian_optimization import StepBayesianOptimizer
+
+HARTMANN_MIN = -3.32237
+_ALPHA = np.array([1.0, 1.2, 3.0, 3.2])
+_A = np.array([
+    [10, 3, 17, 3.5, 1.7, 8],
+    [0.05, 10, 17, 0.1, 8, 14],
+    [3, 3.5, 1.7, 10, 17, 8],
+    [17, 8, 0.05, 10, 0.1, 14],
+])
+_P = 1e-4 * np.array([
+    [1312, 1696, 5569, 124, 8283, 5886],
+    [2329, 4135, 8307, 3736, 1004, 9991],
+    [2348, 1451, 3522, 2883, 3047, 6650],
+    [4047, 8828, 8732, 5743, 1091, 381],
+])
+
+
+def hartmann6(x):
+    x = np.asarray(x, dtype=float)
+    return float(-np.sum(_ALPHA * np.exp(-np.sum(_A * (x - _P) ** 2, axis=1))))
+
+
+def run(trust_region, seed, iterations, n_initial):
+    variables = [Real(0.0, 1.0, name=f"x{i}") for i in range(6)]
+    optimizer = StepBayesianOptimizer(variables, random_state=seed, n_initial_points=n_initial, trust_region=trust_region)
+    rng = np.random.default_rng(seed)
+    best, fit_times, fit_sizes = [], [], []
+    for _ in range(iterations):
+        x = optimizer.suggest()
+        y = hartmann6(x) + rng.normal(0, 0.01)
+        start = time.perf_counter()
+        optimizer.observe(x, y)
+        fit_times.append(time.perf_counter() - start)
+        models = optimizer.skopt_optimizer.models
+        fit_sizes.append(len(models[-1].y_train_) if models else 0)
+        best.append(min(hartmann6(p) for p in optimizer.x_iters))
+    return np.array(best), np.mean(fit_times[n_initial:]), np.mean(fit_sizes[n_initial:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Global vs. trust-region BO on the 6-D Hartmann function")
+    parser.add_argument("--iterations", type=int, default=60)
+    parser.add_argument("--initial", type=int, default=10)
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    checkpoints = [n for n in (20, 30, 40, 60, 80, 100) if n <= args.iterations]
+    print(f"{'mode':<14}" + "".join(f"{'regret@' + str(n):>12}" for n in checkpoints) + f"{'fit ms':>10}{'GP points':>11}")
+    for label, trust_region in [("global GP", False), ("trust region", True)]:
+        runs = [run(trust_region, seed, args.iterations, args.initial) for seed in range(args.seeds)]
+        regret = np.mean([best for best, _, _ in runs], axis=0) - HARTMANN_MIN
+        fit_ms = 1000 * np.mean([t for _, t, _ in runs])
+        points = np.mean([n for _, _, n in runs])
+        print(f"{label:<14}" + "".join(f"{regret[n - 1]:>12.3f}" for n in checkpoints) + f"{fit_ms:>10.1f}{points:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# __main__.py
+# Run or resume a campaign from the command line, e.g.
+#
+#   python -m core.campaign --name sty_scan --mode full --iterations 50 \
+#       --variable residence_time 5 30 min --variable temperature 10 40 C \
+#       --objective "Space-Time Yield"
+#   python -m core.campaign --resume resumable_runs/sty_scan
+import argparse
+import os
+from core.campaign.engine import (
+    DEFAULT_OPC_URL, MultiObjectiveCampaign, NSGA2Campaign, SingleObjectiveCampaign, load_campaign,
+    multi_objective_optimizer, single_objective_optimizer,
+)
+from core.campaign.sinks import ConsoleSink, JSONLinesSink
+from core.hardware.clock import CLOCK_MODES, make_clock
+from core.hardware.experimental_run import ExperimentRunner
+from core.hardware.opc_communication import OPCClient
+from core.objectives import OBJECTIVES
+from core.response_surfaces import SURFACES, NoiseModel
+
+SAVE_DIRS = {"single": "resumable_runs", "multi": "resumable_multiobjective_runs"}
+
+
+def _variable(values):
+    name, low, high, *unit = values
+    return name, float(low), float(high), unit[0] if unit else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a VOL optimization campaign without the web app")
+    parser.add_argument("--resume", metavar="RUN_PATH", help="continue the campaign saved in this directory")
+    parser.add_argument("--name", default="campaign")
+    parser.add_argument("--mode", choices=["off", "hybrid", "full"], default="full", help="simulation mode")
+    parser.add_argument("--opc-url", default=DEFAULT_OPC_URL)
+    parser.add_argument("--clock", choices=CLOCK_MODES, default="real",
+                        help="lab clock for fully simulated runs; real hardware (also in hybrid mode) always runs in real time")
+    parser.add_argument("--surface", choices=list(SURFACES), default="linear", help="simulated response surface")
+    parser.add_argument("--noise", type=float, default=0.05, help="measurement noise standard deviation")
+    parser.add_argument("--relative-noise", type=float, default=0.0, help="extra noise proportional to the response")
+    parser.add_argument("--drift", type=float, default=0.0, help="response loss per hour of lab time")
+    parser.add_argument("--variable", nargs="+", action="append", default=[], metavar="NAME LOW HIGH [UNIT]")
+    parser.add_argument("--objective", action="append", default=[], choices=list(OBJECTIVES),
+                        help="repeat for a multi-objective campaign")
+    parser.add_argument("--minimize", action="append", default=[], help="objectives to minimize instead of maximize")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--initial", type=int, default=5, help="initialization experiments")
+    parser.add_argument("--surrogate", choices=["GP", "SGP"], default="GP", help="single-objective surrogate")
+    parser.add_argument("--trust-region", action="store_true",
+                        help="single-objective: TuRBO-style local optimization, for five or more variables")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--batch-strategy", choices=["cl_min", "cl_mean", "cl_max", "kriging_believer"], default="cl_min")
+    parser.add_argument("--backend", choices=["processoptimizer", "ehvi", "nsga2"], default="processoptimizer",
+                        help="multi-objective strategy; nsga2 needs --mode full and counts --iterations as evaluations")
+    parser.add_argument("--population", type=int, default=40, help="NSGA-II population size")
+    parser.add_argument("--model-retention", default="all")
+    parser.add_argument("--checkpoint-every", type=int, default=1)
+    parser.add_argument("--log", metavar="PATH", help="also append every result to this JSON Lines file")
+    args = parser.parse_args()
+
+    sinks = [ConsoleSink()]
+    if args.log:
+        sinks.append(JSONLinesSink(args.log))
+
+    if args.resume:
+        try:
+            engine = load_campaign(args.resume, sinks=sinks, clock=make_clock(args.clock), checkpoint_every=args.checkpoint_every)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        if not args.variable or not args.objective:
+            parser.error("--variable and --objective are required unless --resume is given")
+        if args.clock != "real" and args.mode != "full":
+            parser.error("--clock other than real needs --mode full")
+        variables = [_variable(values) for values in args.variable]
+        directions = {obj: "minimize" if obj in args.minimize else "maximize" for obj in args.objective}
+        runner = ExperimentRunner(
+            OPCClient(args.opc_url), "experiment_log.csv", simulation_mode=args.mode, clock=make_clock(args.clock),
+            response_surface=args.surface, noise_model=NoiseModel(args.noise, args.relative_noise, args.drift)
+        )
+        common = dict(
+            name=args.name,
+            directions=directions,
+            sinks=sinks,
+            checkpoint_every=args.checkpoint_every,
+            metadata={"initial_experiments": args.initial},
+        )
+        if len(args.objective) == 1:
+            optimizer = single_objective_optimizer(variables, args.surrogate, args.model_retention,
+                                                   n_initial_points=args.initial, trust_region=args.trust_region)
+            engine = SingleObjectiveCampaign(
+                optimizer, runner, variables, args.objective, args.iterations,
+                run_path=os.path.join(SAVE_DIRS["single"], args.name),
+                batch_size=args.batch_size, batch_strategy=args.batch_strategy, **common
+            )
+        else:
+            optimizer = multi_objective_optimizer(variables, len(args.objective), args.initial, args.backend,
+                                                  population_size=args.population)
+            campaign_class = NSGA2Campaign if args.backend == "nsga2" else MultiObjectiveCampaign
+            engine = campaign_class(
+                optimizer, runner, variables, args.objective, args.iterations,
+                run_path=os.path.join(SAVE_DIRS["multi"], args.name),
+                model_retention=args.model_retention, **common
+            )
+
+    try:
+        engine.run()
+    except KeyboardInterrupt:
+        # The last checkpoint is on disk; --resume continues from it
+        engine.stop()
+        print(f"🛑 Interrupted after {engine.iteration} experiments.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# comparison.py
+# Compare optimization strategies on simulated campaigns.
+#
+# Every (strategy, seed) pair runs as its own full-simulation campaign on
+# the instant clock, spread over a process pool. Each experiment is also
+# scored on the noise-free response, so the regret curves show how close
+# each strategy gets to the true optimum and how fast.
+import contextlib
+import io
+import multiprocessing
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+from core.campaign.engine import DEFAULT_OPC_URL, SingleObjectiveCampaign, single_objective_optimizer
+from core.hardware.clock import make_clock
+from core.hardware.experimental_run import RAW_AREA_OFFSET, ExperimentRunner
+from core.hardware.opc_communication import OPCClient
+from core.objectives import simulate_objectives, simulate_objectives_batch
+
+BACKENDS = ["step", "processoptimizer"]
+BACKEND_LABELS = {"step": "StepBayesianOptimizer", "processoptimizer": "ProcessOptimizer"}
+ACQ_FUNCS = ["EI", "PI", "LCB", "gp_hedge"]
+ESTIMATORS = {"step": ["GP", "SGP", "RF", "ET"], "processoptimizer": ["GP", "RF", "ET"]}
+REACTOR_VOLUME = 1.4
+
+
+def strategy_grid(backends=("step",), acq_funcs=("EI",), base_estimators=("GP",), initial_points=(5,)):
+    """Every combination of the given settings that the backend supports."""
+    return [
+        {"backend": backend, "acq_func": acq, "base_estimator": est, "n_initial_points": n}
+        for backend, acq, est, n in product(backends, acq_funcs, base_estimators, initial_points)
+        if est in ESTIMATORS[backend]
+    ]
+
+
+def strategy_label(strategy):
+    return f"{BACKEND_LABELS[strategy['backend']]} · {strategy['base_estimator']} · {strategy['acq_func']} · {strategy['n_initial_points']} init"
+
+
+def _optimizer(strategy, variables, seed):
+    if strategy["backend"] == "step":
+        return single_objective_optimizer(
+            variables, base_estimator=strategy["base_estimator"], n_jobs=1, acq_func=strategy["acq_func"],
+            n_initial_points=strategy["n_initial_points"], random_state=seed,
+        )
+    from ProcessOptimizer import Optimizer
+
+    return Optimizer(
+        dimensions=[(low, high) for _, low, high, *_ in variables],
+        base_estimator=strategy["base_estimator"],
+        n_initial_points=strategy["n_initial_points"],
+        acq_func=strategy["acq_func"],
+        random_state=seed,
+    )
+
+
+def true_objective(runner, params, objective):
+    """The objective at ``params`` on the noise-free synthetic response."""
+    res_time = params.get("residence_time", 20)
+    raw_area = runner.synthetic_measurement(params, noisy=False)
+    total_flow = REACTOR_VOLUME / (res_time / 60)
+    return simulate_objectives(raw_area, total_flow / 2, total_flow / 2, res_time, [objective])[objective]
+
+
+def _runner(response_surface, noise_model, clock="real"):
+    return ExperimentRunner(
+        OPCClient(DEFAULT_OPC_URL), "experiment_log.csv", simulation_mode="full", clock=make_clock(clock),
+        response_surface=response_surface, noise_model=noise_model
+    )
+
+
+def run_strategy(strategy, seed, variables, objective, iterations, response_surface="linear", noise_model=None):
+    """One simulated campaign; returns one row per experiment."""
+    np.random.seed(seed)  # The synthetic measurement noise
+    runner = _runner(response_surface, noise_model, clock="instant")
+    engine = SingleObjectiveCampaign(_optimizer(strategy, variables, seed), runner, variables, [objective], iterations)
+    rows = []
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            row = engine.step()
+            rows.append({
+                "strategy": strategy_label(strategy),
+                **strategy,
+                "seed": seed,
+                "iteration": row["Experiment #"],
+                "measured": row[objective],
+                "true_value": true_objective(runner, row, objective),
+                "step_time": time.perf_counter() - t0,
+                "wall_time": time.perf_counter() - start,
+            })
+    return rows
+
+
+def true_optimum(variables, objective, response_surface="linear", n_points=4096):
+    """Best noise-free objective value found on a Sobol grid over the variables."""
+    runner = _runner(response_surface, None)
+    lows = [low for _, low, _, *_ in variables]
+    highs = [high for _, _, high, *_ in variables]
+    points = qmc.scale(qmc.Sobol(d=len(variables), seed=0).random(n_points), lows, highs)
+    params = {name: points[:, i] for i, (name, *_) in enumerate(variables)}
+    raw_area = RAW_AREA_OFFSET + np.clip(runner.response_surface.evaluate(params), 0.0, 1.0)
+    res_time = params.get("residence_time", np.full(n_points, 20.0))
+    total_flow = REACTOR_VOLUME / (res_time / 60)
+    return float(simulate_objectives_batch(raw_area, total_flow / 2, total_flow / 2, res_time, [objective])[objective].max())
+
+
+def compare_strategies(strategies, variables, objective, iterations=20, seeds=range(3), max_workers=None,
+                       response_surface="linear", noise_model=None):
+    """
+    Run every strategy with every seed in a process pool. Returns one row per
+    experiment with the simple regret (true optimum minus the best true value
+    found so far) and the wall time.
+    """
+    jobs = [(strategy, seed) for strategy in strategies for seed in seeds]
+    # Spawned workers do not inherit the web server's threads
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(run_strategy, strategy, seed, variables, objective, iterations, response_surface, noise_model)
+            for strategy, seed in jobs
+        ]
+        df = pd.DataFrame([row for future in futures for row in future.result()])
+
+    optimum = max(true_optimum(variables, objective, response_surface), df["true_value"].max())
+    df["best_true_value"] = df.groupby(["strategy", "seed"])["true_value"].cummax()
+    df["regret"] = optimum - df["best_true_value"]
+    return df
+
+
+def summarize(df):
+    """Per strategy: final regret, area under the regret curve and timings, best first."""
+    final = df.sort_values("iteration").groupby(["strategy", "seed"]).tail(1)
+    per_run = final.set_index(["strategy", "seed"])[["regret", "wall_time"]].join(
+        df.groupby(["strategy", "seed"])["regret"].mean().rename("mean_regret")
+    )
+    summary = per_run.groupby("strategy").agg(
+        final_regret=("regret", "mean"),
+        final_regret_std=("regret", "std"),
+        mean_regret=("mean_regret", "mean"),
+        wall_time=("wall_time", "mean"),
+    )
+    summary["step_time_ms"] = df.groupby("strategy")["step_time"].mean() * 1000
+    return summary.sort_values(["final_regret", "mean_regret"]).reset_index()
@@ -0,0 +1,453 @@
+# engine.py
+# Headless optimization campaigns.
+#
+# A campaign owns the optimizer, the experiment runner and the run directory
+# (experiment_data.csv, optimizer checkpoint, metadata.json). It runs from the
+# Streamlit pages, the command line (python -m core.campaign) or plain Python,
+# and reports progress to pluggable sinks (sinks.py) instead of drawing UI.
+import json
+import os
+import pandas as pd
+from ProcessOptimizer import Optimizer
+from skopt.space import Real
+from core.hardware.experimental_run import ExperimentRunner
+from core.hardware.opc_communication import OPCClient
+from core.optimization.acquisition_optimizer import MultiStartAcquisitionOptimizer
+from core.optimization.bayesian_optimization import StepBayesianOptimizer
+from core.optimization.checkpoint import load_optimizer, save_optimizer
+from core.optimization.ehvi import EHVIOptimizer
+from core.optimization.gp_fitting import use_parallel_restarts
+from core.optimization.hypervolume import HypervolumeTracker
+from core.optimization.model_retention import memory_report, retain_models
+from core.optimization.nsga2 import NSGA2Optimizer
+from core.optimization.pareto import ParetoArchive
+from core.response_surfaces import NoiseModel
+
+DATA_FILE = "experiment_data.csv"
+METADATA_FILE = "metadata.json"
+DEFAULT_OPC_URL = "http://em-nun:57080"
+
+# Metadata keys the engine writes itself; anything else is passed through
+_ENGINE_KEYS = {
+    "kind", "variables", "response", "objectives", "directions", "total_iterations",
+    "simulation_mode", "opc_url", "memory_report", "hypervolume", "model_retention",
+    "batch_size", "batch_strategy", "response_surface", "noise_model", "opc_latency",
+}
+
+
+def single_objective_optimizer(variables, base_estimator="GP", model_retention="all", n_jobs=-1,
+                               acq_func="EI", n_initial_points=10, random_state=42, trust_region=False):
+    """The StepBayesianOptimizer used by single-objective campaigns."""
+    return StepBayesianOptimizer(
+        [Real(low, high, name=name) for name, low, high, *_ in variables],
+        base_estimator=base_estimator,
+        acq_func=acq_func,
+        random_state=random_state,
+        acq_optimizer=MultiStartAcquisitionOptimizer(time_budget=0.2),
+        model_retention=model_retention,
+        n_jobs=n_jobs,
+        n_initial_points=n_initial_points,
+        trust_region=trust_region,
+    )
+
+
+def multi_objective_optimizer(variables, n_objectives, n_initial_points=5, backend="processoptimizer", random_state=None,
+                              population_size=40):
+    """
+    ProcessOptimizer's Optimizer, the EHVI optimizer with ``backend="ehvi"``,
+    or NSGA-II with ``backend="nsga2"`` (for NSGA2Campaign).
+    """
+    if backend == "nsga2":
+        return NSGA2Optimizer(
+            [(low, high) for _, low, high, *_ in variables],
+            population_size=population_size,
+            n_objectives=n_objectives,
+            random_state=random_state,
+        )
+    optimizer_class = EHVIOptimizer if backend == "ehvi" else Optimizer
+    return optimizer_class(
+        dimensions=[(low, high) for _, low, high, *_ in variables],
+        n_initial_points=n_initial_points,
+        n_objectives=n_objectives,
+        random_state=random_state,
+    )
+
+
+class CampaignEngine:
+    """
+    Runs one optimization campaign without any UI.
+
+    ``run`` asks the optimizer for a point, runs the experiment, records the
+    result and saves the run directory every ``checkpoint_every`` experiments
+    (never when ``run_path`` is None). ``stop`` ends ``run`` after the current
+    experiment; calling ``run`` again, or ``load_campaign`` on the run
+    directory, continues where it left off. Subclasses turn results into
+    optimizer observations.
+    """
+
+    kind = None
+
+    def __init__(self, optimizer, runner, variables, objectives, total_iterations, name="campaign",
+                 run_path=None, directions=None, sinks=(), checkpoint_every=1, metadata=None):
+        self.optimizer = optimizer
+        self.runner = runner
+        self.variables = [tuple(v) for v in variables]
+        self.objectives = list(objectives)
+        self.directions = dict(directions or {})
+        self.total_iterations = total_iterations
+        self.name = name
+        self.run_path = run_path
+        self.sinks = list(sinks)
+        # The runner reports the countdown and experiment status to the same sinks
+        self.runner.sinks = self.sinks
+        self.checkpoint_every = checkpoint_every
+        self.metadata = dict(metadata or {})
+        self.experiment_data = []
+        self.memory = None
+        self.stop_requested = False
+
+    @property
+    def iteration(self):
+        return len(self.experiment_data)
+
+    @property
+    def finished(self):
+        return self.iteration >= self.total_iterations
+
+    def set_sinks(self, sinks):
+        """Replace the progress sinks, e.g. with the placeholders of a new page run."""
+        self.sinks[:] = sinks
+
+    def stop(self):
+        """Stop after the experiment that is currently running."""
+        self.stop_requested = True
+
+    def run(self, max_experiments=None):
+        """
+        Run experiments until the campaign is finished or stopped, or until
+        ``max_experiments`` more have run. Returns the results table.
+        """
+        self.stop_requested = False
+        self._emit("on_start", self)
+        n_run = 0
+        while not self.finished and not self.stop_requested and (max_experiments is None or n_run < max_experiments):
+            self.step()
+            n_run += 1
+        if self.run_path and self.iteration % self.checkpoint_every:
+            self.save()
+        if self.finished:
+            self._emit("on_finish", self)
+        elif self.stop_requested:
+            self._emit("on_stop", self)
+        return self.results()
+
+    def step(self):
+        """Run one experiment and return its result row."""
+        x = self._next_point()
+        params = {name: val for (name, *_), val in zip(self.variables, x)}
+        number = self.iteration + 1
+        result = self.runner.run_experiment(
+            params, experiment_number=number, total_iterations=self.total_iterations,
+            objectives=self.objectives, directions=self.directions
+        )
+        row = {
+            "Experiment #": number,
+            "Timestamp": self.runner.clock.now().strftime("%Y-%m-%d %H:%M:%S"),
+            **params,
+            **self._record(x, result),
+        }
+        self.experiment_data.append(row)
+
+        if self.run_path:
+            self.runner.save_full_measurements_to_csv(self.name)
+            if self.iteration % self.checkpoint_every == 0:
+                self.save()
+        else:
+            self.runner.full_measurement_log.clear()
+        self._emit("on_result", self, row)
+        return row
+
+    def results(self):
+        return pd.DataFrame(self.experiment_data)
+
+    def best_result(self):
+        raise NotImplementedError
+
+    def settings(self):
+        """Optimization settings stored with the experiment in the database."""
+        return {
+            "initial_experiments": self.metadata.get("initial_experiments"),
+            "total_iterations": self.total_iterations,
+            "simulation_mode": self.runner.simulation_mode,
+            "opc_url": self.runner.opc.server_url,
+            "directions": self.directions,
+        }
+
+    def to_metadata(self):
+        return {
+            **self.metadata,
+            "kind": self.kind,
+            "variables": self.variables,
+            "objectives": self.objectives,
+            "directions": self.directions,
+            "total_iterations": self.total_iterations,
+            "simulation_mode": self.runner.simulation_mode,
+            "opc_url": self.runner.opc.server_url,
+            "response_surface": self.runner.response_surface.name,
+            "noise_model": self.runner.noise_model.to_dict(),
+            "opc_latency": self.runner.opc.latency.summary(),
+            "memory_report": self.memory,
+        }
+
+    def save(self):
+        """Write results, optimizer checkpoint and metadata to ``run_path``."""
+        os.makedirs(self.run_path, exist_ok=True)
+        self.results().to_csv(os.path.join(self.run_path, DATA_FILE), index=False)
+        checkpoint_path = save_optimizer(self.optimizer, self.run_path)
+        self.memory = memory_report(self.optimizer, checkpoint_path)
+        with open(os.path.join(self.run_path, METADATA_FILE), "w") as f:
+            json.dump(self.to_metadata(), f, indent=4)
+        self._emit("on_checkpoint", self, self.memory)
+
+    def _restore(self, experiment_data):
+        """Reload the results of a saved run."""
+        self.experiment_data = experiment_data
+
+    def _emit(self, hook, *args):
+        for sink in self.sinks:
+            getattr(sink, hook)(*args)
+
+    def _next_point(self):
+        raise NotImplementedError
+
+    def _record(self, x, result):
+        """Tell the optimizer about ``result`` and return the row's result columns."""
+        raise NotImplementedError
+
+
+class SingleObjectiveCampaign(CampaignEngine):
+    """
+    Campaign over one objective with a StepBayesianOptimizer, optionally in
+    batches. Plain ask/tell optimizers (e.g. ProcessOptimizer's) also work,
+    one point at a time.
+    """
+
+    kind = "single"
+
+    def __init__(self, optimizer, runner, variables, objectives, total_iterations, batch_size=1,
+                 batch_strategy="cl_min", **kwargs):
+        super().__init__(optimizer, runner, variables, objectives, total_iterations, **kwargs)
+        self.batch_size = batch_size
+        self.batch_strategy = batch_strategy
+
+    @property
+    def objective(self):
+        return self.objectives[0]
+
+    def _next_point(self):
+        if not hasattr(self.optimizer, "suggest"):
+            return self.optimizer.ask()
+        if self.batch_size > 1 and not self.optimizer.pending:
+            self.optimizer.suggest(min(self.batch_size, self.total_iterations - self.iteration), strategy=self.batch_strategy)
+        x = self.optimizer.pending[0] if self.optimizer.pending else self.optimizer.suggest()
+        # Compute the likely next suggestion while the reactor is busy
+        self.optimizer.prefetch(x)
+        return x
+
+    def _record(self, x, result):
+        value = result[self.objective]
+        region = getattr(self.optimizer, "trust_region", None)
+        restarts = region.n_restarts if region is not None else 0
+        if hasattr(self.optimizer, "observe"):
+            self.optimizer.observe(x, -value)
+        else:
+            self.optimizer.tell(x, -value)
+        if region is not None and region.n_restarts > restarts:
+            self._emit("on_trust_region_restart", self, region)
+        return {"Measurement": value, self.objective: value}
+
+    def best_result(self):
+        df = self.results()
+        return df.loc[df["Measurement"].idxmax()]
+
+    def settings(self):
+        return {**super().settings(), "objective": self.objective, "method": "Bayesian Single Objective"}
+
+    def to_metadata(self):
+        return {
+            **super().to_metadata(),
+            "response": self.objective,
+            "batch_size": self.batch_size,
+            "batch_strategy": self.batch_strategy,
+        }
+
+
+class MultiObjectiveCampaign(CampaignEngine):
+    """
+    Campaign over several objectives with ProcessOptimizer or EHVI. Keeps
+    the Pareto archive and, once the initial design is done, the hypervolume.
+    Results are stored "higher is better"; archive and tracker minimize.
+    """
+
+    kind = "multi"
+
+    def __init__(self, optimizer, runner, variables, objectives, total_iterations, model_retention="all",
+                 n_jobs=-1, **kwargs):
+        super().__init__(optimizer, runner, variables, objectives, total_iterations, **kwargs)
+        self.model_retention = model_retention
+        if hasattr(self.optimizer, "base_estimator_"):
+            use_parallel_restarts(self.optimizer.base_estimator_, n_jobs)
+        self.n_reference = max(1, self.optimizer.n_initial_points_)
+        self.pareto_archive = ParetoArchive(len(self.objectives))
+        self.hv_tracker = None
+
+    def _minimized(self, row):
+        return [-row[obj] for obj in self.objectives]
+
+    def _restore(self, experiment_data):
+        super()._restore(experiment_data)
+        self.pareto_archive = ParetoArchive(len(self.objectives))
+        for i, row in enumerate(experiment_data):
+            self.pareto_archive.add(self._minimized(row), index=i)
+        self.hv_tracker = None
+        if len(experiment_data) >= self.n_reference:
+            self.hv_tracker = HypervolumeTracker.from_initial_design([self._minimized(row) for row in experiment_data], self.n_reference)
+
+    def _next_point(self):
+        return self.optimizer.ask()
+
+    def _record(self, x, result):
+        y_multi = [-result[obj] for obj in self.objectives]
+        self.optimizer.tell(x, y_multi)
+        if self.optimizer.models:
+            retain_models(self.optimizer.models, self.model_retention, len(self.optimizer.yi) - self.optimizer.n_initial_points_ + 1)
+        self._track(y_multi)
+        return {obj: result[obj] for obj in self.objectives}
+
+    def _track(self, y_multi):
+        """Add a minimized result to the Pareto archive and the hypervolume."""
+        # The row is appended right after this, at position self.iteration
+        self.pareto_archive.add(y_multi, index=self.iteration)
+        if self.hv_tracker is not None:
+            self.hv_tracker.add(y_multi)
+        elif self.iteration + 1 >= self.n_reference:
+            Y = [self._minimized(row) for row in self.experiment_data] + [y_multi]
+            self.hv_tracker = HypervolumeTracker.from_initial_design(Y, self.n_reference)
+
+    def best_result(self):
+        """The Pareto front as a list of result rows."""
+        df = self.results()
+        return df.loc[sorted(self.pareto_archive.indices)].to_dict("records") if not df.empty else None
+
+    def _hypervolume(self):
+        if self.hv_tracker is None:
+            return None
+        return {"reference_point": self.hv_tracker.ref_point.tolist(), "history": self.hv_tracker.history}
+
+    def settings(self):
+        hv = self._hypervolume()
+        return {
+            **super().settings(),
+            "objectives": self.objectives,
+            "method": "Bayesian Multi-Objective (EHVI)" if isinstance(self.optimizer, EHVIOptimizer) else "Bayesian Multi-Objective",
+            "hypervolume_reference": None if hv is None else hv["reference_point"],
+            "hypervolume_history": None if hv is None else hv["history"],
+        }
+
+    def to_metadata(self):
+        return {
+            **super().to_metadata(),
+            "experiment_name": self.name,
+            "model_retention": self.model_retention,
+            "hypervolume": self._hypervolume(),
+        }
+
+
+class NSGA2Campaign(MultiObjectiveCampaign):
+    """
+    Multi-objective campaign with NSGA-II, for full simulation mode only.
+
+    Each ``step`` evaluates a whole generation through the runner's
+    vectorized ``simulate_batch`` instead of one experiment at a time, so no
+    surrogate is fitted and thousands of evaluations take seconds. Every
+    individual is still one row of the results, and ``best_result`` is the
+    Pareto front in the same format as for Bayesian campaigns, which makes
+    it a cheap reference front to compare those against.
+    """
+
+    kind = "nsga2"
+
+    def __init__(self, optimizer, runner, variables, objectives, total_iterations, **kwargs):
+        if runner.simulation_mode != "full":
+            raise ValueError("NSGA-II campaigns need full simulation mode")
+        super().__init__(optimizer, runner, variables, objectives, total_iterations, **kwargs)
+
+    def step(self):
+        """Evaluate one generation and return the result row of its last individual."""
+        X = self.optimizer.ask()[: self.total_iterations - self.iteration]
+        params = {name: X[:, i] for i, (name, *_) in enumerate(self.variables)}
+        values = self.runner.simulate_batch(params, self.objectives, self.directions)[self.objectives]
+        self.optimizer.tell(X, -values.to_numpy())
+
+        timestamp = self.runner.clock.now().strftime("%Y-%m-%d %H:%M:%S")
+        for x, y in zip(X, values.to_numpy()):
+            row = {
+                "Experiment #": self.iteration + 1,
+                "Timestamp": timestamp,
+                **{name: float(val) for (name, *_), val in zip(self.variables, x)},
+                **{obj: float(val) for obj, val in zip(self.objectives, y)},
+            }
+            self._track(-y)
+            self.experiment_data.append(row)
+
+        self._emit("on_generation", self, self.optimizer.generation, len(X), len(self.pareto_archive))
+        # checkpoint_every counts generations here
+        if self.run_path and self.optimizer.generation % self.checkpoint_every == 0:
+            self.save()
+        self._emit("on_result", self, row)
+        return row
+
+    def settings(self):
+        return {**super().settings(), "method": "NSGA-II Multi-Objective", "population_size": self.optimizer.population_size}
+
+
+CAMPAIGNS = {"single": SingleObjectiveCampaign, "multi": MultiObjectiveCampaign, "nsga2": NSGA2Campaign}
+
+
+def load_campaign(run_path, runner=None, sinks=(), clock=None, **kwargs):
+    """
+    Resume the campaign saved in ``run_path``. Without a ``runner``, one is
+    built from the saved OPC URL and simulation mode, running on ``clock``.
+    Also reads run directories written by the pages before the engine existed.
+    """
+    with open(os.path.join(run_path, METADATA_FILE), "r") as f:
+        metadata = json.load(f)
+    kind = metadata.get("kind") or ("multi" if "objectives" in metadata else "single")
+    objectives = metadata.get("objectives") or [metadata["response"]]
+    if runner is None:
+        runner = ExperimentRunner(
+            OPCClient(metadata.get("opc_url", DEFAULT_OPC_URL)),
+            "experiment_log.csv",
+            simulation_mode=metadata.get("simulation_mode", "off"),
+            clock=clock,
+            response_surface=metadata.get("response_surface", "linear"),
+            noise_model=NoiseModel(**metadata.get("noise_model", {})),
+        )
+    options = {key: metadata[key] for key in ("batch_size", "batch_strategy", "model_retention") if key in metadata}
+    options.update(kwargs)
+    engine = CAMPAIGNS[kind](
+        load_optimizer(run_path),
+        runner,
+        metadata["variables"],
+        objectives,
+        metadata["total_iterations"],
+        name=metadata.get("experiment_name") or os.path.basename(os.path.normpath(run_path)),
+        run_path=run_path,
+        directions=metadata.get("directions"),
+        sinks=sinks,
+        metadata={key: value for key, value in metadata.items() if key not in _ENGINE_KEYS},
+        **options,
+    )
+    engine.memory = metadata.get("memory_report")
+    engine._restore(pd.read_csv(os.path.join(run_path, DATA_FILE)).to_dict("records"))
+    return engine
@@ -0,0 +1,76 @@
+# sinks.py
+# Progress sinks for campaigns. The engine and the experiment runner report
+# progress through these hooks, so the same campaign can be shown in a
+# Streamlit page, printed to a terminal or logged to a file.
+import json
+
+
+class ProgressSink:
+    """Receives campaign progress. Every hook does nothing; sinks override the ones they need."""
+
+    def on_start(self, engine):
+        pass
+
+    def on_experiment(self, number, total, parameters, elapsed):
+        """An experiment is about to run; ``elapsed`` is the campaign time in seconds."""
+        pass
+
+    def on_countdown(self, seconds_left):
+        """Seconds left until the reactor reaches steady state."""
+        pass
+
+    def on_result(self, engine, row):
+        """One experiment finished; ``row`` is its entry in ``engine.experiment_data``."""
+        pass
+
+    def on_checkpoint(self, engine, memory):
+        """The run directory was saved; ``memory`` is the optimizer's ``memory_report``."""
+        pass
+
+    def on_trust_region_restart(self, engine, region):
+        """The optimizer's ``TrustRegion`` collapsed and restarts in the least explored region."""
+        pass
+
+    def on_generation(self, engine, generation, n_individuals, n_front):
+        """An NSGA-II generation of ``n_individuals`` was evaluated; ``n_front`` points are on the Pareto front."""
+        pass
+
+    def on_stop(self, engine):
+        pass
+
+    def on_finish(self, engine):
+        pass
+
+
+class ConsoleSink(ProgressSink):
+    """One line per experiment on stdout."""
+
+    def on_start(self, engine):
+        print(f"▶ {engine.name}: {engine.iteration} of {engine.total_iterations} experiments done")
+
+    def on_result(self, engine, row):
+        values = ", ".join(f"{obj} = {row[obj]:.4g}" for obj in engine.objectives)
+        print(f"✔ Experiment {row['Experiment #']}/{engine.total_iterations}: {values}")
+
+    def on_generation(self, engine, generation, n_individuals, n_front):
+        print(f"🧬 Generation {generation}: {n_individuals} individuals, {n_front} on the Pareto front")
+
+    def on_trust_region_restart(self, engine, region):
+        print(f"🎯 Trust region collapsed; restart {region.n_restarts} in the least explored region.")
+
+    def on_stop(self, engine):
+        print(f"🛑 {engine.name} stopped after {engine.iteration} experiments.")
+
+    def on_finish(self, engine):
+        print(f"✅ {engine.name} complete.")
+
+
+class JSONLinesSink(ProgressSink):
+    """Appends every result row to a JSON Lines file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def on_result(self, engine, row):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(row, default=float) + "\n")
@@ -0,0 +1,55 @@
+# streamlit_sink.py
+# Shows campaign progress in a Streamlit page: experiment status and timer in
+# the sidebar, the steady-state countdown and the memory caption. Pages
+# subclass it to draw their own charts in on_result.
+import streamlit as st
+from core.campaign.sinks import ProgressSink
+
+
+class StreamlitSink(ProgressSink):
+    def __init__(self, memory_placeholder=None):
+        self.experiment_status_placeholder = st.sidebar.empty()
+        self.countdown_placeholder = st.empty()
+        self.timer_placeholder = st.sidebar.empty()
+        self.memory_placeholder = memory_placeholder
+
+    def on_experiment(self, number, total, parameters, elapsed):
+        mins, secs = divmod(int(elapsed), 60)
+
+        self.timer_placeholder.markdown(f"⏱️ **Total Time Running:** {mins:02d}:{secs:02d}")
+
+        html = f"""
+        <div style='background-color:#eef6fb; padding: 10px; border-left: 5px solid #2c91c6;'>
+            <h4 style='margin:0;'>🔎 Experiment {number} of {total}</h4>
+            <p style='margin:5px 0 10px 0;'>⏱️ Elapsed Time: {mins:02d}:{secs:02d}</p>
+            <ul style='padding-left: 20px;'>
+        """
+        for key, val in parameters.items():
+            html += f"<li><strong>{key}</strong>: {val:.2f}</li>"
+        html += "</ul></div>"
+        self.experiment_status_placeholder.markdown(html, unsafe_allow_html=True)
+
+    def on_countdown(self, seconds_left):
+        mm, ss = seconds_left // 60, seconds_left % 60
+        countdown_html = f"""
+        <div style='background-color:#fff3cd; padding: 15px; border-left: 5px solid #ffca28; border-radius: 5px;'>
+            <h4 style='margin:0;'>⏳ Countdown to Reach Steady State</h4>
+            <p style='font-size: 24px; font-weight: bold; color: #856404; margin: 5px 0 0 0;'>{mm:02d}:{ss:02d}</p>
+        </div>
+        """
+        self.countdown_placeholder.markdown(countdown_html, unsafe_allow_html=True)
+
+    def on_checkpoint(self, engine, memory):
+        if self.memory_placeholder is not None:
+            self.memory_placeholder.caption(
+                f"🧠 {memory['n_models']} surrogate(s) kept · {memory['optimizer_bytes'] / 1024:.0f} KB in memory · "
+                f"{memory['checkpoint_bytes'] / 1024:.0f} KB on disk"
+            )
+
+    def on_trust_region_restart(self, engine, region):
+        st.toast(f"🎯 Trust region collapsed; restart {region.n_restarts} in the least explored region.")
+
+    def on_generation(self, engine, generation, n_individuals, n_front):
+        self.experiment_status_placeholder.markdown(
+            f"🧬 **Generation {generation}**: {n_individuals} individuals, {n_front} on the Pareto front"
+        )
@@ -0,0 +1,36 @@
+# ui_helpers.py
+# Sidebar widgets shared by the optimization pages.
+import os
+import streamlit as st
+from core.optimization.warm_start import compatible_experiments
+from core.response_surfaces import SURFACES, NoiseModel
+from core.utils import db_handler
+
+
+def response_surface_sidebar(disabled=False):
+    """Response surface and noise model for simulated measurements; returns ``(name, NoiseModel)``."""
+    surface = st.sidebar.selectbox(
+        "🧬 Response Surface",
+        options=list(SURFACES),
+        disabled=disabled,
+        help="Simulated reactor used in hybrid and full simulation mode.",
+    )
+    st.sidebar.caption(SURFACES[surface].description)
+    with st.sidebar.expander("🎲 Measurement Noise"):
+        std = st.number_input("Noise Std", min_value=0.0, max_value=0.5, value=0.05, step=0.01, disabled=disabled)
+        relative = st.number_input("Relative Noise", min_value=0.0, max_value=1.0, value=0.0, step=0.05, disabled=disabled,
+                                   help="Extra noise proportional to the response")
+        drift = st.number_input("Drift per Hour", min_value=0.0, max_value=1.0, value=0.0, step=0.01, disabled=disabled,
+                                help="Fraction of the response lost per hour of lab time")
+    return surface, NoiseModel(std, relative, drift)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_compatible_experiments(user_email, variables, responses, db_mtime):
+    return compatible_experiments(user_email, variables, responses)
+
+
+def warm_start_candidates(user_email, variables, responses):
+    """``compatible_experiments`` cached until experiments.db changes, so reruns do not reload every saved experiment."""
+    db_mtime = os.path.getmtime(db_handler.DB_NAME) if os.path.exists(db_handler.DB_NAME) else None
+    return _cached_compatible_experiments(user_email, variables, list(responses), db_mtime)
@@ -0,0 +1,82 @@
+# clock.py
+# Clocks for the experiment runner. Real hardware, including the hybrid mode,
+# runs on the wall clock; fully simulated campaigns can run on a virtual lab
+# clock that goes faster than real time, or skips every wait, while still
+# reporting how long the campaign would have taken in the lab.
+import asyncio
+import time
+from datetime import datetime
+
+CLOCK_MODES = ["real", "x10", "x100", "instant"]
+CLOCK_LABELS = {
+    "real": "Real time",
+    "x10": "10× faster",
+    "x100": "100× faster",
+    "instant": "Instant (skip all waits)",
+}
+
+
+class RealClock:
+    """Wall-clock time."""
+
+    virtual = False
+    instant = False
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    async def asleep(self, seconds):
+        """``sleep`` for coroutines."""
+        await asyncio.sleep(seconds)
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+
+class VirtualClock(RealClock):
+    """
+    Lab time that runs ``speedup`` times faster than real time. With
+    ``speedup=None`` every ``sleep`` returns at once and only moves lab time
+    forward.
+    """
+
+    virtual = True
+
+    def __init__(self, speedup=None):
+        self.speedup = speedup
+        self.instant = speedup is None
+        self._real_start = time.time()
+        self._skipped = 0.0
+
+    def time(self):
+        real_elapsed = time.time() - self._real_start
+        if self.instant:
+            return self._real_start + real_elapsed + self._skipped
+        return self._real_start + real_elapsed * self.speedup
+
+    def sleep(self, seconds):
+        if self.instant:
+            self._skipped += seconds
+        else:
+            time.sleep(seconds / self.speedup)
+
+    async def asleep(self, seconds):
+        if self.instant:
+            self._skipped += seconds
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(seconds / self.speedup)
+
+
+def make_clock(mode="real"):
+    """Clock for one of ``CLOCK_MODES``."""
+    if mode == "real":
+        return RealClock()
+    if mode == "instant":
+        return VirtualClock()
+    if mode in CLOCK_MODES:
+        return VirtualClock(speedup=int(mode[1:]))
+    raise ValueError(f"Unknown clock mode: {mode!r}")
@@ -1,29 +1,55 @@
-import time
 import numpy as np
 import csv
-from core.hardware.opc_communication import OPCClient
-from core.objectives import simulate_objectives
-import streamlit as st
+from contextlib import aclosing
+from core.hardware.clock import RealClock
+from core.hardware.opc_communication import AsyncOPCClient, OPCClient
+from core.hardware.settling import SettlingDetector
+from core.objectives import simulate_objectives, simulate_objectives_batch
+from core.response_surfaces import NoiseModel, get_surface
 import matplotlib.pyplot as plt
 import os
-from datetime import datetime
 import numpy as np
 
+# Simulated raw areas are this offset plus the 0-1 response of the surface
+RAW_AREA_OFFSET = 3.0
+# Tags watched concurrently while waiting (watch_signals)
+SIGNALS = {
+    "temperature": "Hitec_OPC_DA20_Server-%3EDIAZOAN%3ACHILLER_01.X1",
+    "water_area": "OpusOPCSvr.HP-CZC3484P17-%3EWater+-+Area",
+    "eda_area": "OpusOPCSvr.HP-CZC3484P17-%3EEDA-AREA",
+}
+
 
 class ExperimentRunner:
-    def __init__(self, opc_client: OPCClient, csv_filename: str, simulation_mode: str = "off"):
+    def __init__(self, opc_client: OPCClient, csv_filename: str, simulation_mode: str = "off", sinks=(), clock=None,
+                 response_surface="linear", noise_model=None):
         self.opc = opc_client
         self.csv_filename = csv_filename
         self.simulation_mode = simulation_mode  # Options: "off", "full", "hybrid"
-        self.experiment_status_placeholder = st.sidebar.empty()
-        self.countdown_placeholder = st.empty()
-        self.timer_placeholder = st.sidebar.empty()
-        self.measurements_plot_placeholder = st.empty()
+        # Every wait and timestamp goes through the clock; simulations may use a virtual one (core/hardware/clock.py)
+        self.clock = clock or RealClock()
+        if self.clock.virtual and simulation_mode != "full":
+            # Hybrid runs still drive the real chiller and pumps
+            raise ValueError("Experiments on real hardware (off and hybrid modes) need the real-time clock")
+        # Simulated measurements come from a registered response surface (core/response_surfaces.py)
+        self.response_surface = get_surface(response_surface)
+        self.noise_model = noise_model or NoiseModel()
+        self.sinks = list(sinks)  # Progress sinks (core/campaign/sinks.py) that display the countdown and status
         self.start_time = None
         self.full_measurement_log = []  # Store all measurements for the full experiment
+        self.signal_log = []  # Samples from watch_signals
+        self.settling_log = []  # Chiller readings and predictions from monitor_temperature
+        self._aopc = None
+
+    @property
+    def aopc(self):
+        """asyncio client sharing the session of ``opc``, created on first use."""
+        if self._aopc is None:
+            self._aopc = AsyncOPCClient(client=self.opc)
+        return self._aopc
 
     def initialize_experiment(self, experiment_number, iterations, parameters):
-        self.start_time = time.time()
+        self.start_time = self.clock.time()
         print(f"🔬 Running Experiment {experiment_number} of {iterations}")
         print(f"🧪 Parameters: {parameters}")
         if self.simulation_mode == "off":
@@ -44,6 +70,7 @@ class ExperimentRunner:
             if water_area > threshold:
                 print("🧼 Cleaning the optical probe due to high water content...")
                 
+                # The order of these actuations matters, so they are written one by one
                 self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4", 0)
                 self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3AV_01_CLOSE", 1)
                 self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3AV_01_OPEN", 1)
@@ -55,7 +82,7 @@ class ExperimentRunner:
                 print("🧪 Cleaning with isopropanol...")
 
                 # Cleaning time
-                time.sleep(30)
+                self.clock.sleep(30)
 
                 # Stop Cleaning 
                 self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_6.W1", 0)
@@ -66,7 +93,7 @@ class ExperimentRunner:
 
                 self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4", 1)
                 print("🚿 Flushing DCM to remove isopropanol...")
-                time.sleep(30)
+                self.clock.sleep(30)
 
                 self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3AV_02_CLOSE", 0)
                 self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3AV_02_OPEN", 0)
@@ -88,9 +115,11 @@ class ExperimentRunner:
         yes_acid, no_acid = self.calculate_pump_flows(acid, total_flow)
 
         if self.simulation_mode in ["off", "hybrid"]:
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4", Vorg)
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP2.W1", round(no_acid, 2))
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP1.W1", round(yes_acid, 2))
+            self.opc.write_many({
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4": Vorg,
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP2.W1": round(no_acid, 2),
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP1.W1": round(yes_acid, 2),
+            })
         else:
             print("🔁 Simulation mode: skipping pump control.")
     
@@ -100,9 +129,11 @@ class ExperimentRunner:
         Vorg = round(value1 * 2, 2)
 
         if self.simulation_mode in ["off", "hybrid"]:
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4", Vorg)
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP2.W1", round(value1, 2))
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP1.W1", round(value1, 2))
+            self.opc.write_many({
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4": Vorg,
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP2.W1": round(value1, 2),
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP1.W1": round(value1, 2),
+            })
         else:
             print("🔁 Simulation mode: skipping pump control.")
 
@@ -126,24 +157,38 @@ class ExperimentRunner:
         flow_react2 = flow_aq / 2
 
         if self.simulation_mode in ["off", "hybrid"]:
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4", round(flow_org, 2))     # Organic
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP2.W1", round(flow_react2, 2))  # Reactant 2
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP1.W1", round(flow_react1, 2))  # Reactant 1
+            self.opc.write_many({
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4": round(flow_org, 2),     # Organic
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP2.W1": round(flow_react2, 2),  # Reactant 2
+                "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP1.W1": round(flow_react1, 2),  # Reactant 1
+            })
         else:
             print("🔁 Simulation mode: skipping pump control.")
             print(f"→ Organic: {flow_org:.2f} mL/min | React1: {flow_react1:.2f} | React2: {flow_react2:.2f}")
 
-    def monitor_temperature(self, target_temp):
-        
+    def monitor_temperature(self, target_temp, tolerance=0.5, lead=60, timeout=3600):
+        """
+        Sets the chiller to ``target_temp`` and waits until a SettlingDetector
+        (core/hardware/settling.py) fitted to the readings says the
+        temperature will stay within ``tolerance`` from ``lead`` seconds on
+        (it keeps settling while the pumps start and the reactor fills),
+        polling at the interval it predicts. Gives up after ``timeout``
+        seconds. Every reading goes to ``settling_log``; returns True if the
+        temperature settled.
+        """
         if self.simulation_mode in ["off", "hybrid"]:
-            print("inside the if statement")
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3ACHILLER_01.ON", 1)
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3ACHILLER_01.W1", target_temp)
-            self.opc.write_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4", 0.2) # Organic
+            self.opc.write_many(self._chiller_setup(target_temp))
 
             print(f"🧊 Waiting for temperature to reach {target_temp}°C...")
 
+            detector = SettlingDetector(target_temp, tolerance, lead=lead)
+            start = self.clock.time()
             while True:
+                elapsed = self.clock.time() - start
+                if elapsed >= timeout:
+                    print(f"⏱️ Temperature did not settle within {timeout:.0f} s. Continuing anyway.")
+                    return False
+
                 current_temp = self.opc.read_value("Hitec_OPC_DA20_Server-%3EDIAZOAN%3ACHILLER_01.X1")
                 print(f"🌡️ Current temperature reading: {current_temp}")
 
@@ -151,28 +196,101 @@ class ExperimentRunner:
                     current_temp = float(current_temp)
                 except (TypeError, ValueError):
                     print("⚠️ Invalid temperature reading. Retrying...")
-                    time.sleep(3)
+                    self.clock.sleep(3)
                     continue
 
-                diff = abs(current_temp - target_temp)
-                print(f"📉 ΔT = {diff:.2f}°C")
+                detector.add(elapsed, current_temp)
+                interval = detector.next_interval()
+                self.settling_log.append({
+                    "Timestamp": self.clock.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "Target": target_temp,
+                    "Elapsed (s)": round(elapsed, 1),
+                    "Temperature": current_temp,
+                    "Predicted Final": detector.model["final"] if detector.model else None,
+                    "Time to Band (s)": detector.time_to_band(),
+                    "Next Poll (s)": interval,
+                })
+                print(f"📉 ΔT = {abs(current_temp - target_temp):.2f}°C, next reading in {interval:.0f} s")
+
+                if detector.settled():
+                    model = detector.model
+                    print(f"✅ Target temperature reached: {current_temp:.2f}°C after {elapsed:.0f} s "
+                          f"(order {model['order']} fit, tau = {model['tau']:.0f} s, final {model['final']:.2f}°C)")
+                    return True
+
+                self.clock.sleep(min(interval, timeout - elapsed))
+        else:
+            print("🌡️ Simulation mode: skipping temperature control.")
+
+    def _chiller_setup(self, target_temp):
+        return {
+            "Hitec_OPC_DA20_Server-%3EDIAZOAN%3ACHILLER_01.ON": 1,
+            "Hitec_OPC_DA20_Server-%3EDIAZOAN%3ACHILLER_01.W1": target_temp,
+            "Hitec_OPC_DA20_Server-%3EDIAZOAN%3APUMP_4": 0.2, # Organic
+        }
 
-                if diff <= 0.5:
-                    print(f"✅ Target temperature reached: {current_temp:.2f}°C")
+    async def watch_signals(self, duration=None, until=None, interval=5, signals=None):
+        """
+        Polls ``signals`` (``{name: item}``, default ``SIGNALS``) concurrently,
+        each every ``interval`` seconds, until ``duration`` seconds have passed
+        or ``until(latest)`` is true for the latest ``{name: value}``. Every
+        sample goes to ``signal_log``; returns the latest values.
+        """
+        signals = signals or SIGNALS
+        names = {item: name for name, item in signals.items()}
+        start = self.clock.time()
+        latest = {}
+        async with aclosing(self.aopc.poll(list(signals.values()), interval, self.clock)) as samples:
+            async for item, value, timestamp in samples:
+                latest[names[item]] = value
+                self.signal_log.append({"Timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"), "Signal": names[item], "Value": value})
+                if until is not None and until(latest):
                     break
+                if duration is not None and self.clock.time() - start >= duration:
+                    break
+        return latest
 
-                time.sleep(5)
-        else:
+    async def monitor_temperature_async(self, target_temp, interval=5, signals=None, tolerance=0.5, lead=60, timeout=3600):
+        """
+        ``monitor_temperature`` as a coroutine that also records the other
+        ``signals`` while waiting. Signals are polled every ``interval``
+        seconds; the SettlingDetector only decides when to stop.
+        """
+        if self.simulation_mode not in ["off", "hybrid"]:
             print("🌡️ Simulation mode: skipping temperature control.")
+            return
+
+        await self.aopc.write_many(self._chiller_setup(target_temp))
+        print(f"🧊 Waiting for temperature to reach {target_temp}°C...")
+
+        detector = SettlingDetector(target_temp, tolerance, lead=lead)
+        start = self.clock.time()
+
+        def settled(latest):
+            if self.signal_log[-1]["Signal"] != "temperature":
+                return False
+            try:
+                detector.add(self.clock.time() - start, float(latest["temperature"]))
+            except (TypeError, ValueError):
+                return False
+            return detector.settled()
+
+        signals = {"temperature": SIGNALS["temperature"], **(signals or SIGNALS)}
+        latest = await self.watch_signals(duration=timeout, until=settled, interval=interval, signals=signals)
+        if not detector.settled():
+            print(f"⏱️ Temperature did not settle within {timeout:.0f} s. Continuing anyway.")
+            return False
+        print(f"✅ Target temperature reached: {float(latest['temperature']):.2f}°C after {self.clock.time() - start:.0f} s")
+        return True
 
     def calculate_rsd(self, measurements):
         return (np.std(measurements) / np.mean(measurements)) * 100 if np.mean(measurements) != 0 else float("inf")
 
-    def _read_measurement(self, res_time=None, ratio=1.0):
+    def _read_measurement(self, parameters):
         if self.simulation_mode == "full":
             return np.random.uniform(70, 100)
         elif self.simulation_mode == "hybrid":
-            return self.synthetic_raw_area(res_time, ratio)
+            return self.synthetic_measurement(parameters)
         else:
             product_area = float(self.opc.read_value("OpusOPCSvr.HP-CZC3484P17-%3EEDA-AREA")) # Change this part for EDA
             #water_area = float(self.opc.read_value("OpusOPCSvr.HP-CZC3484P17-%3EWater+-+Area")) # This is OK
@@ -184,24 +302,23 @@ class ExperimentRunner:
         measurements = []
         all_measurements = []
 
-        res_time = parameters.get("residence_time", 20)
         #ratio = parameters.get("ratio_org_aq", 1.0)
 
         while len(measurements) < 3:
-            val = self._read_measurement(res_time=res_time)
+            val = self._read_measurement(parameters)
             print(f"📏 Measurement {len(measurements)+1} = {val:.2f}")
             measurements.append(val)
             all_measurements.append(val)
             if len(measurements) < 3:
-                time.sleep(28)
+                self.clock.sleep(28)
 
         rsd = self.calculate_rsd(measurements)
         print(f"\n📊 Initial RSD = {rsd:.2f}%")
 
         while rsd >= rsd_threshold and len(measurements) < max_measurements:
             print("⚠️ RSD too high. Taking another measurement...")
-            time.sleep(28)  # Wait before next measurement
-            new_val = self._read_measurement(res_time=res_time)
+            self.clock.sleep(28)  # Wait before next measurement
+            new_val = self._read_measurement(parameters)
             print(f"📏 New Measurement = {new_val:.2f}")
             measurements = measurements[-2:] + [new_val]
             all_measurements.append(new_val)
@@ -209,7 +326,7 @@ class ExperimentRunner:
             rsd = self.calculate_rsd(measurements)
             print(f"📊 Updated RSD = {rsd:.2f}%")
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = self.clock.now().strftime("%Y-%m-%d %H:%M:%S")
         for idx, val in enumerate(all_measurements, 1):
             self.full_measurement_log.append({
                 "Iteration": iteration,
@@ -223,50 +340,62 @@ class ExperimentRunner:
 
     def stop_pumps(self):
         if self.simulation_mode in ["off", "hybrid"]:
-            for pump in ["PUMP1.W1", "PUMP2.W1", "PUMP_4", "PUMP5.W1", "PC_OUT"]:
-                self.opc.write_value(f"Hitec_OPC_DA20_Server-%3EDIAZOAN%3A{pump}", 0)
+            self.opc.write_many({
+                f"Hitec_OPC_DA20_Server-%3EDIAZOAN%3A{pump}": 0
+                for pump in ["PUMP1.W1", "PUMP2.W1", "PUMP_4", "PUMP5.W1", "PC_OUT"]
+            })
             print("🛑 All pumps stopped.")
         else:
             print("🛑 Simulation mode: skipping pump shutdown.")
 
     def countdown(self, residence_time):
+        if self.clock.instant:
+            self.clock.sleep(residence_time * 9)
+            return
         for secs in range(residence_time * 9, 0, -1):
-            mm, ss = secs // 60, secs % 60
-            countdown_html = f"""
-            <div style='background-color:#fff3cd; padding: 15px; border-left: 5px solid #ffca28; border-radius: 5px;'>
-                <h4 style='margin:0;'>⏳ Countdown to Reach Steady State</h4>
-                <p style='font-size: 24px; font-weight: bold; color: #856404; margin: 5px 0 0 0;'>{mm:02d}:{ss:02d}</p>
-            </div>
-            """
-            self.countdown_placeholder.markdown(countdown_html, unsafe_allow_html=True)
-            time.sleep(1)
+            for sink in self.sinks:
+                sink.on_countdown(secs)
+            self.clock.sleep(1)
 
     def display_experiment_info(self, experiment_number, total_iterations, parameters):
-        elapsed = time.time() - self.start_time if self.start_time else 0
-        mins, secs = divmod(int(elapsed), 60)
+        elapsed = self.clock.time() - self.start_time if self.start_time else 0
+        for sink in self.sinks:
+            sink.on_experiment(experiment_number, total_iterations, parameters, elapsed)
 
-        self.timer_placeholder.markdown(f"⏱️ **Total Time Running:** {mins:02d}:{secs:02d}")
-
-        html = f"""
-        <div style='background-color:#eef6fb; padding: 10px; border-left: 5px solid #2c91c6;'>
-            <h4 style='margin:0;'>🔎 Experiment {experiment_number} of {total_iterations}</h4>
-            <p style='margin:5px 0 10px 0;'>⏱️ Elapsed Time: {mins:02d}:{secs:02d}</p>
-            <ul style='padding-left: 20px;'>
+    def synthetic_measurement(self, parameters, noisy=True):
+        """
+        Synthetic raw area at ``parameters`` from the runner's response
+        surface, between 3.0 and 4.0. Noise and drift come from the noise
+        model, with lab time since the campaign started; ``noisy=False``
+        gives the expected value.
         """
-        for key, val in parameters.items():
-            html += f"<li><strong>{key}</strong>: {val:.2f}</li>"
-        html += "</ul></div>"
-        self.experiment_status_placeholder.markdown(html, unsafe_allow_html=True)
+        response = self.response_surface.evaluate(parameters)
+        if noisy:
+            response = self.noise_model.sample(response, elapsed_hours=self._elapsed_hours())
+        return float(RAW_AREA_OFFSET + np.clip(response, 0.0, 1.0))
 
-    def synthetic_raw_area(self, res_time, ratio):
+    def simulate_batch(self, parameters, objectives, directions=None):
         """
-        Generate synthetic raw area based on residence time and ratio_org_aq.
-        Shorter residence time and lower ratio yield higher area.
-        Output constrained between 3.0 and 4.0.
+        Objectives of many full-simulation experiments in one vectorized call.
+        ``parameters`` maps variable names to equal-length arrays. No lab time
+        passes and nothing is logged; returns a DataFrame with one column per
+        objective, minimized objectives negated.
         """
-        base = 4.0 - 0.015 * res_time + 0.3 * (1.5 - ratio) 
-        noise = np.random.normal(0, 0.05)
-        return float(np.clip(base + noise, 3.0, 4.0))
+        if self.simulation_mode != "full":
+            raise ValueError("Batch evaluation is only available in full simulation mode")
+        if self.start_time is None:
+            self.start_time = self.clock.time()
+        n = len(next(iter(parameters.values())))
+        response = np.broadcast_to(self.response_surface.evaluate(parameters), (n,))
+        response = self.noise_model.sample(response, elapsed_hours=self._elapsed_hours())
+        raw_area = RAW_AREA_OFFSET + np.clip(response, 0.0, 1.0)
+        res_time = np.broadcast_to(np.asarray(parameters.get("residence_time", 20), dtype=float), (n,))
+        total_flow = 1.4 / (res_time / 60)  # 1.4 mL reactor
+        return simulate_objectives_batch(raw_area, total_flow / 2, total_flow / 2, res_time, objectives, directions)
+
+    def _elapsed_hours(self):
+        """Lab time since the campaign started."""
+        return (self.clock.time() - self.start_time) / 3600 if self.start_time else 0.0
 
     def simulate_experiment(self, parameters, objectives=None, directions=None):
         if objectives is None:
@@ -281,8 +410,8 @@ class ExperimentRunner:
         if self.simulation_mode in ["off", "hybrid"]: 
             raw_area = self.collect_measurements(parameters=parameters)
         else:
-            raw_area = self.synthetic_raw_area(res_time)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            raw_area = self.synthetic_measurement(parameters)
+            timestamp = self.clock.now().strftime("%Y-%m-%d %H:%M:%S")
             self.full_measurement_log.append({
                 "Iteration": parameters.get("iteration", 0),
                 "Timestamp": timestamp,
@@ -302,6 +431,8 @@ class ExperimentRunner:
         return simulated_result
 
     def run_experiment(self, parameters, experiment_number=None, total_iterations=None, objectives=None, directions=None):
+        if self.start_time is None:
+            self.start_time = self.clock.time()
         if experiment_number is not None and total_iterations is not None:
             print(f"🔬 Running Experiment {experiment_number} of {total_iterations}")
             self.display_experiment_info(experiment_number, total_iterations, parameters)
@@ -315,9 +446,12 @@ class ExperimentRunner:
             self.countdown(int(parameters["residence_time"]))
         else:
             print("🔁 Full simulation mode enabled: skipping temperature and pump setup.")
+            if self.clock.virtual:
+                # Lab time still passes while the reactor reaches steady state
+                self.countdown(int(parameters.get("residence_time", 20)))
 
         if self.simulation_mode in ["full", "hybrid"]:
-            result = self.simulate_experiment(parameters, objectives)
+            result = self.simulate_experiment(parameters, objectives, directions)
             if len(objectives) == 1:
                 result = {objectives[0]: result[objectives[0]]}  # Only return the selected objective
 
@@ -1,18 +1,108 @@
 #opc_communication.py
+import asyncio
 import requests
 import json
+import random
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_plus
+from requests.adapters import HTTPAdapter
+from core.hardware.clock import RealClock
+
+# Connection errors, timeouts and these statuses are retried; other errors are not
+RETRY_STATUSES = {502, 503, 504}
+# Keys that may name the item of a ``data`` entry in a multi-item read response
+ITEM_KEYS = ("ItemID", "Item", "item", "Name")
+
+
+class LatencyStats:
+    """Round-trip times of the last ``window`` calls per operation, with error and retry counts."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, operation, seconds, ok=True, retries=0):
+        self.samples.setdefault(operation, deque(maxlen=self.window)).append(seconds)
+        counts = self.counts.setdefault(operation, {"calls": 0, "errors": 0, "retries": 0})
+        counts["calls"] += 1
+        counts["errors"] += 0 if ok else 1
+        counts["retries"] += retries
+
+    def summary(self):
+        """Per operation: call, error and retry counts and latency percentiles in milliseconds."""
+        report = {}
+        for operation, samples in self.samples.items():
+            ms = [s * 1000 for s in sorted(samples)]
+            report[operation] = {
+                **self.counts[operation],
+                "mean_ms": round(sum(ms) / len(ms), 2),
+                "p50_ms": round(ms[len(ms) // 2], 2),
+                "p95_ms": round(ms[min(len(ms) - 1, int(0.95 * len(ms)))], 2),
+                "max_ms": round(ms[-1], 2),
+            }
+        return report
+
 
 class OPCClient:
-    def __init__(self, server_url):
-        """Initialize OPC Client with the given server URL."""
+    def __init__(self, server_url, connect_timeout=3.05, read_timeout=10.0, retries=3, backoff=0.5, pool_size=10,
+                 bulk=None):
+        """
+        Initialize OPC Client with the given server URL.
+
+        All calls share one keep-alive session with up to ``pool_size``
+        pooled connections. Each call gives up after ``connect_timeout`` /
+        ``read_timeout`` seconds and is retried up to ``retries`` times after
+        connection errors, timeouts and 502/503/504 responses, waiting
+        ``backoff * 2**attempt`` seconds with ±50% jitter in between.
+        Round-trip times are kept in ``latency``.
+
+        ``read_many`` sends one request with repeated ``item`` parameters
+        when the server supports it, and otherwise one concurrent request per
+        item; ``bulk=None`` finds out with the first multi-item read, True or
+        False skips the check. ``write_many`` only sends repeated ``item`` and
+        ``value`` parameters with ``bulk=True``, since a gateway that misreads
+        them would partly actuate the rig; a multi-item write only counts as
+        done when the reply lists every item, otherwise each item is written
+        again on its own.
+        """
         self.server_url = server_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency = LatencyStats()
+        self.pool_size = pool_size
+        self.bulk = bulk
+        self.bulk_write = bulk is True  # Never probed: writes actuate hardware
+
+    def _get(self, operation, url):
+        """GET ``url`` with timeouts and jittered retries, recording the latency of the whole call."""
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                    raise requests.exceptions.HTTPError(f"{response.status_code} from OPC server", response=response)
+                response.raise_for_status()
+                self.latency.record(operation, time.perf_counter() - start, retries=attempt)
+                return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.HTTPError) as e:
+                retryable = not isinstance(e, requests.exceptions.HTTPError) or e.response.status_code in RETRY_STATUSES
+                if not retryable or attempt == self.retries:
+                    self.latency.record(operation, time.perf_counter() - start, ok=False, retries=attempt)
+                    raise
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
 
     def read_value(self, item):
         """Reads a value from the OPC server."""
         try:
-            response = requests.get(f"{self.server_url}/read?item={item}")
-            response.raise_for_status()
+            response = self._get("read", f"{self.server_url}/read?item={item}")
             data = json.loads(response.text)
             return data.get("data", [{}])[0].get("Value", None)
         except requests.exceptions.RequestException as e:
@@ -20,14 +110,88 @@ class OPCClient:
             return None
 
     def write_value(self, item, value):
-        """Writes a value to the OPC server."""
+        """Writes a value to the OPC server. Returns True on success."""
         try:
             value_str = str(round(value,2)).replace(".",",")
-            response = requests.get(f"{self.server_url}/write?item={item}&value={value_str}")
-            response.raise_for_status()
+            self._get("write", f"{self.server_url}/write?item={item}&value={value_str}")
             print(f"Successfully wrote {value_str} to {item}")
+            return True
         except requests.exceptions.RequestException as e:
             print(f"Error writing to OPC: {e}")
+            return False
+
+    def read_many(self, items):
+        """Reads several values; returns ``{item: value}`` with None for failed reads."""
+        items = list(items)
+        if self.bulk is not False and len(items) > 1:
+            values = self._read_bulk(items)
+            if values is not None:
+                return values
+        return dict(zip(items, self._concurrently(self.read_value, [(item,) for item in items])))
+
+    def _read_bulk(self, items):
+        """One multi-item read; None (and no more tries) if the server answers for fewer items."""
+        query = "&".join(f"item={item}" for item in items)
+        try:
+            response = self._get("read_many", f"{self.server_url}/read?{query}")
+            data = json.loads(response.text).get("data", [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if self.bulk:
+                print(f"Error reading from OPC: {e}")
+                return {item: None for item in items}
+            if isinstance(e, requests.exceptions.HTTPError):
+                self.bulk = False  # The server rejects repeated items
+            return None
+        if len(data) != len(items):
+            if self.bulk is None:
+                print("ℹ️ OPC server reads one item per request; using concurrent requests.")
+            self.bulk = False
+            return None
+        self.bulk = True
+        # Match entries to items by name when the server names them (decoded or not), else by position
+        names = {**{unquote_plus(item): item for item in items}, **{item: item for item in items}}
+        by_item = {names[entry[key]]: entry for entry in data for key in ITEM_KEYS if entry.get(key) in names}
+        if len(by_item) == len(items):
+            data = [by_item[item] for item in items]
+        return {item: entry.get("Value", None) for item, entry in zip(items, data)}
+
+    def write_many(self, values):
+        """
+        Writes several ``{item: value}`` pairs as one step; returns
+        ``{item: success}``. The writes may be applied in any order, so only
+        group writes that do not depend on each other.
+        """
+        values = dict(values)
+        if self.bulk_write and len(values) > 1 and self._write_bulk(values):
+            return {item: True for item in values}
+        return dict(zip(values, self._concurrently(self.write_value, list(values.items()))))
+
+    def _write_bulk(self, values):
+        """One multi-item write; True only if the reply lists every item (else no more multi-item writes)."""
+        formatted = {item: str(round(value, 2)).replace(".", ",") for item, value in values.items()}
+        query = "&".join(f"item={item}&value={value}" for item, value in formatted.items())
+        try:
+            response = self._get("write_many", f"{self.server_url}/write?{query}")
+            data = json.loads(response.text).get("data", [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error writing to OPC: {e}. Writing one item per request.")
+            return False
+        # Entries name their item (decoded or not) when the server says; unnamed entries only count by number
+        names = {**{unquote_plus(item): item for item in values}, **{item: item for item in values}}
+        named = {names[entry[key]] for entry in data for key in ITEM_KEYS if entry.get(key) in names}
+        unnamed = [entry for entry in data if not any(key in entry for key in ITEM_KEYS)]
+        if len(named) + len(unnamed) < len(values) or (named and len(named) < len(values)):
+            print("⚠️ OPC server did not confirm every item of a multi-item write; writing one item per request.")
+            self.bulk_write = False
+            return False
+        print(f"Successfully wrote {len(values)} values: {formatted}")
+        return True
+
+    def _concurrently(self, func, calls):
+        if len(calls) == 1:
+            return [func(*calls[0])]
+        with ThreadPoolExecutor(max_workers=min(len(calls), self.pool_size)) as pool:
+            return list(pool.map(lambda args: func(*args), calls))
 
     def check_connection(self, test_item):
         """Checks if the OPC server is reachable."""
@@ -38,3 +202,77 @@ class OPCClient:
         else:
             print("❌ OPC Connection Failed")
             return False
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+
+class AsyncOPCClient:
+    """
+    asyncio front end to ``OPCClient`` for polling several tags at once.
+
+    Tag names, value formatting (comma decimals) and error handling are
+    those of the wrapped client; each call runs in one of
+    ``max_concurrency`` worker threads over its pooled session, so latency
+    statistics are shared as well. A slow tag only delays its own reads.
+    """
+
+    def __init__(self, server_url=None, client=None, max_concurrency=None, **client_kwargs):
+        self.client = client or OPCClient(server_url, **client_kwargs)
+        self.server_url = self.client.server_url
+        self.latency = self.client.latency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency or self.client.pool_size,
+                                            thread_name_prefix="opc")
+
+    async def _call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def read_value(self, item):
+        """Reads a value from the OPC server."""
+        return await self._call(self.client.read_value, item)
+
+    async def write_value(self, item, value):
+        """Writes a value to the OPC server. Returns True on success."""
+        return await self._call(self.client.write_value, item, value)
+
+    async def read_many(self, items):
+        """Reads several values concurrently (in one request if the server supports it)."""
+        items = list(items)
+        if self.client.bulk:
+            return await self._call(self.client.read_many, items)
+        return dict(zip(items, await asyncio.gather(*(self.read_value(item) for item in items))))
+
+    async def write_many(self, values):
+        """Writes several independent ``{item: value}`` pairs; returns ``{item: success}``."""
+        return await self._call(self.client.write_many, values)
+
+    async def poll(self, items, interval, clock=None):
+        """
+        Yields ``(item, value, timestamp)`` for every read, with each tag read
+        every ``interval`` seconds on its own schedule. Runs until the
+        consumer stops iterating.
+        """
+        clock = clock or RealClock()
+        queue = asyncio.Queue()
+
+        async def sample(item):
+            while True:
+                start = clock.time()
+                value = await self.read_value(item)
+                await queue.put((item, value, clock.now()))
+                await clock.asleep(max(0.0, interval - (clock.time() - start)))
+
+        tasks = [asyncio.create_task(sample(item)) for item in items]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        """Stop the worker threads and close the pooled connections."""
+        self._executor.shutdown(wait=False)
+        self.client.close()
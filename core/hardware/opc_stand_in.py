@@ -0,0 +1,310 @@
+# opc_stand_in.py
+# Local stand-in for the OPC/Opus HTTP gateway, so "off" mode and the whole
+# hardware path can run on any machine, e.g.
+#
+#   python -m core.hardware.opc_stand_in --port 57080 --speedup 60 \
+#       --latency 0.02 --error-rate 0.05
+#
+# and point the app or the CLI at http://localhost:57080. It speaks the
+# gateway's protocol (/read?item=... and /write?item=...&value=... with comma
+# decimals) for every tag ExperimentRunner uses, and simulates the reactor
+# behind it in lab time (``speedup`` times faster than real time):
+#
+# - the chiller temperature follows its setpoint as a first-order lag;
+# - pump flows set the residence time and organic/aqueous ratio;
+# - the IR EDA area moves towards the response surface value at the current
+#   conditions with a time constant of one residence time;
+# - water builds up on the IR probe with the aqueous flow and is washed off
+#   by the isopropanol pump (PUMP_6).
+#
+# Latency, 503 errors, dropped connections and stalls can be injected per
+# request.
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+from core.hardware.experimental_run import RAW_AREA_OFFSET
+from core.response_surfaces import SURFACES, get_surface
+
+HITEC = "Hitec_OPC_DA20_Server->DIAZOAN:"
+OPUS = "OpusOPCSvr.HP-CZC3484P17->"
+# Writable tags and their values at start-up
+SETPOINTS = {
+    HITEC + "PUMP_4": 0.0,  # Organic, mL/min
+    HITEC + "PUMP1.W1": 0.0,  # Reactant 1
+    HITEC + "PUMP2.W1": 0.0,  # Reactant 2
+    HITEC + "PUMP5.W1": 0.0,
+    HITEC + "PUMP_6.W1": 0.0,  # Isopropanol for probe cleaning
+    HITEC + "PC_OUT": 0.0,  # Back pressure, bar
+    HITEC + "V_01_CLOSE": 0.0,
+    HITEC + "V_01_OPEN": 0.0,
+    HITEC + "V_02_CLOSE": 0.0,
+    HITEC + "V_02_OPEN": 0.0,
+    HITEC + "CHILLER_01.ON": 0.0,
+    HITEC + "CHILLER_01.W1": 20.0,  # Setpoint, °C
+}
+TEMPERATURE = HITEC + "CHILLER_01.X1"
+EDA_AREA = OPUS + "EDA-AREA"
+WATER_AREA = OPUS + "Water - Area"
+
+
+class ReactorModel:
+    """
+    Tag values of the simulated rig. State is advanced lazily to the current
+    lab time whenever a tag is read or written; thread-safe.
+    """
+
+    def __init__(self, response_surface="linear", speedup=1.0, reactor_volume=1.4, ambient=22.0,
+                 chiller_tau=180.0, ambient_tau=900.0, water_rate=0.02, water_baseline=0.5, cleaning_tau=5.0,
+                 noise=0.01, seed=None, clock=time.monotonic):
+        """
+        ``chiller_tau``/``ambient_tau``/``cleaning_tau`` are time constants in
+        lab seconds; ``water_rate`` is the water area gained per lab minute
+        per mL/min of aqueous flow; ``noise`` is the standard deviation of the
+        IR areas.
+        """
+        self.surface = get_surface(response_surface)
+        self.speedup = speedup
+        self.reactor_volume = reactor_volume
+        self.ambient = ambient
+        self.chiller_tau = chiller_tau
+        self.ambient_tau = ambient_tau
+        self.water_rate = water_rate
+        self.water_baseline = water_baseline
+        self.cleaning_tau = cleaning_tau
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+        self.clock = clock
+        self.setpoints = dict(SETPOINTS)
+        self.temperature = ambient
+        self.eda_area = RAW_AREA_OFFSET
+        self.water_area = water_baseline
+        self.lab_seconds = 0.0
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def tags(self):
+        return [*self.setpoints, TEMPERATURE, EDA_AREA, WATER_AREA]
+
+    def residence_time(self):
+        """Residence time in seconds (as in ExperimentRunner), or None while no pump runs."""
+        flow = self._flow_org() + self._flow_aq()
+        return self.reactor_volume / (flow / 60) if flow > 0 else None
+
+    def read(self, item):
+        """Current value of ``item``; KeyError for unknown tags."""
+        with self._lock:
+            self._advance()
+            if item == TEMPERATURE:
+                return round(self.temperature + self.rng.normal(0.0, 0.05), 2)
+            if item == EDA_AREA:
+                return round(self.eda_area + self.rng.normal(0.0, self.noise), 4)
+            if item == WATER_AREA:
+                return round(max(0.0, self.water_area + self.rng.normal(0.0, self.noise)), 4)
+            return self.setpoints[item]
+
+    def write(self, item, value):
+        """Set a writable tag; KeyError for unknown or read-only tags."""
+        with self._lock:
+            self._advance()
+            if item not in self.setpoints:
+                raise KeyError(item)
+            self.setpoints[item] = float(value)
+
+    def _advance(self):
+        now = self.clock()
+        dt = (now - self._last) * self.speedup
+        self._last = now
+        if dt > 0:
+            self._step(dt)
+
+    def _step(self, dt):
+        """Move the state ``dt`` lab seconds forward (exact for constant setpoints)."""
+        self.lab_seconds += dt
+        if self.setpoints[HITEC + "CHILLER_01.ON"] > 0:
+            target, tau = self.setpoints[HITEC + "CHILLER_01.W1"], self.chiller_tau
+        else:
+            target, tau = self.ambient, self.ambient_tau
+        self.temperature = target + (self.temperature - target) * math.exp(-dt / tau)
+
+        residence_time = self.residence_time()
+        if residence_time is not None:
+            response = self.surface(
+                temperature=self.temperature,
+                residence_time=residence_time,
+                pressure=self.setpoints[HITEC + "PC_OUT"] or None,
+                ratio_org_aq=self._flow_org() / self._flow_aq() if self._flow_aq() > 0 else None,
+            )
+            target = RAW_AREA_OFFSET + float(np.clip(response, 0.0, 1.0))
+            self.eda_area = target + (self.eda_area - target) * math.exp(-dt / residence_time)
+
+        if self.setpoints[HITEC + "PUMP_6.W1"] > 0:
+            excess = self.water_area - self.water_baseline
+            self.water_area = self.water_baseline + excess * math.exp(-dt / self.cleaning_tau)
+        else:
+            self.water_area += self.water_rate * self._flow_aq() * dt / 60
+
+    def _flow_org(self):
+        return self.setpoints[HITEC + "PUMP_4"]
+
+    def _flow_aq(self):
+        return self.setpoints[HITEC + "PUMP1.W1"] + self.setpoints[HITEC + "PUMP2.W1"]
+
+    def state(self):
+        """Every tag value plus the derived residence time and lab time, without noise."""
+        with self._lock:
+            self._advance()
+            return {
+                **self.setpoints,
+                TEMPERATURE: self.temperature,
+                EDA_AREA: self.eda_area,
+                WATER_AREA: self.water_area,
+                "residence_time": self.residence_time(),
+                "lab_seconds": self.lab_seconds,
+            }
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    HTTP front end of a ReactorModel with fault injection. Each request
+    waits ``latency`` ± ``jitter`` seconds, then fails with probability
+    ``error_rate`` (503), ``drop_rate`` (connection closed without a
+    response) or ``stall_rate`` (answers only after ``stall`` seconds, to
+    trip client timeouts). With ``multi_item=False`` only the first of
+    several ``item`` parameters is served, like a gateway without bulk
+    reads and writes.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, model=None, latency=0.0, jitter=0.0, error_rate=0.0, drop_rate=0.0, stall_rate=0.0,
+                 stall=15.0, multi_item=True, seed=None):
+        super().__init__(address, _Handler)
+        self.model = model or ReactorModel(seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.multi_item = multi_item
+        self.rng = np.random.default_rng(seed)
+        self.counts = {"requests": 0, "errors": 0, "drops": 0, "stalls": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _fault(self):
+        """Sleep for the injected latency; returns the fault to inject, if any."""
+        with self._lock:
+            self.counts["requests"] += 1
+            delay = max(0.0, self.latency + self.jitter * self.rng.uniform(-1.0, 1.0))
+            draw = self.rng.uniform()
+            fault = None
+            for name, rate in (("errors", self.error_rate), ("drops", self.drop_rate), ("stalls", self.stall_rate)):
+                if draw < rate:
+                    fault = name
+                    self.counts[name] += 1
+                    break
+                draw -= rate
+        time.sleep(delay + (self.stall if fault == "stalls" else 0.0))
+        return fault
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1  # One write per response, or Nagle's algorithm delays keep-alive replies
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query, keep_blank_values=True)
+        if url.path == "/state":
+            return self._send(200, self.server.model.state())
+        if url.path not in ("/read", "/write") or not query.get("item"):
+            return self._send(404, {"error": f"Unknown request {self.path}"})
+
+        fault = self.server._fault()
+        if fault == "drops":
+            self.close_connection = True
+            return
+        if fault == "errors":
+            return self._send(503, {"error": "Injected fault"})
+
+        items = query["item"] if self.server.multi_item else query["item"][:1]
+        model = self.server.model
+        try:
+            if url.path == "/write":
+                values = query.get("value", [])
+                if len(values) < len(items):
+                    return self._send(400, {"error": "Every item needs a value"})
+                for item, value in zip(items, values):
+                    model.write(item, float(value.replace(",", ".")))
+            data = [{"ItemID": item, "Value": model.read(item)} for item in items]
+        except KeyError as e:
+            return self._send(404, {"error": f"Unknown item {e.args[0]}"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        self._send(200, {"data": data})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host="127.0.0.1", port=0, **kwargs):
+    """Start a StandInServer in a background thread (``port=0``: any free port); returns the server."""
+    server = StandInServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the OPC/Opus HTTP gateway with a simulated reactor")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=57080)
+    parser.add_argument("--surface", choices=list(SURFACES), default="linear", help="response surface behind the EDA area")
+    parser.add_argument("--speedup", type=float, default=1.0, help="lab seconds per real second")
+    parser.add_argument("--noise", type=float, default=0.01, help="standard deviation of the IR areas")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± seconds of uniform latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections closed without a response")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="fraction of requests answered after --stall seconds")
+    parser.add_argument("--stall", type=float, default=15.0)
+    parser.add_argument("--single-item", action="store_true", help="serve one item per request, like a gateway without bulk access")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    model = ReactorModel(args.surface, speedup=args.speedup, noise=args.noise, seed=args.seed)
+    server = StandInServer(
+        (args.host, args.port), model, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        drop_rate=args.drop_rate, stall_rate=args.stall_rate, stall=args.stall, multi_item=not args.single_item,
+        seed=args.seed,
+    )
+    print(f"🔌 OPC stand-in serving {len(model.tags)} tags at {server.url} (lab time ×{args.speedup:g})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"🛑 Stopped after {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
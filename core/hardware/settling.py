@@ -0,0 +1,127 @@
+# settling.py
+# Predictive settling detection for the chiller temperature.
+#
+# The recent trajectory is fitted with a first-order model
+#   T(t) = T_final + A exp(-t / tau)
+# and, once there are enough points, an underdamped second-order model
+#   T(t) = T_final + exp(-t / tau) (B cos(w t) + C sin(w t))
+# that captures overshoot; the better one by BIC is kept. Both are linear in
+# the amplitudes for fixed tau and w, so they are fitted by least squares over
+# a grid of time constants and frequencies. The decaying envelope of the fit
+# tells when the temperature will be inside the tolerance band for good, which
+# sets the next poll interval and decides when it has settled.
+import math
+import numpy as np
+
+TAUS = np.geomspace(2.0, 3600.0, 48)  # Time constants tried, in seconds
+PERIODS = np.geomspace(20.0, 1800.0, 16)  # Oscillation periods tried by the second-order model, in seconds
+
+
+class SettlingDetector:
+    """
+    Decides when a signal has settled within ``tolerance`` of ``target``.
+
+    Feed it readings with ``add(t, value)`` (``t`` in seconds). It has
+    settled once the fitted model's envelope stays inside the band within
+    ``lead`` seconds, with the fitted final value ``margin`` standard errors
+    from the band edge, and the last reading agrees with the model. With
+    ``lead=0`` the last reading must also be inside the band.
+    ``next_interval()`` is half the predicted time to that point, between
+    ``min_interval`` and ``max_interval`` seconds.
+    """
+
+    def __init__(self, target, tolerance=0.5, lead=0.0, window=30, min_points=4, min_interval=1.0, max_interval=15.0,
+                 margin=2.0):
+        self.target = target
+        self.tolerance = tolerance
+        self.lead = lead
+        self.window = window
+        self.min_points = min_points
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.margin = margin
+        self.times = []
+        self.values = []
+        self.model = None
+
+    def add(self, t, value):
+        self.times = (self.times + [float(t)])[-self.window:]
+        self.values = (self.values + [float(value)])[-self.window:]
+        self.model = self._fit() if len(self.times) >= self.min_points else None
+
+    def _fit(self):
+        t = np.asarray(self.times) - self.times[0]
+        y = np.asarray(self.values)
+        n = len(t)
+        decay = np.exp(-t[None, :] / TAUS[:, None])  # (taus, points)
+        bases = [(np.stack([np.ones_like(decay), decay], axis=-1), TAUS, np.zeros_like(TAUS))]
+        if n >= 6:
+            omega = 2 * math.pi / PERIODS
+            phase = omega[None, :, None] * t[None, None, :]  # (1, periods, points)
+            envelope = decay[:, None, :]  # (taus, 1, points)
+            basis = np.stack([np.ones_like(phase * envelope), envelope * np.cos(phase), envelope * np.sin(phase)], axis=-1)
+            grid_tau, grid_omega = np.meshgrid(TAUS, omega, indexing="ij")
+            bases.append((basis.reshape(-1, n, 3), grid_tau.ravel(), grid_omega.ravel()))
+
+        best = None
+        for A, taus, omegas in bases:
+            k = A.shape[-1]
+            # Batched least squares via the normal equations, with a small ridge for flat bases
+            AtA = np.einsum("gni,gnj->gij", A, A) + 1e-9 * np.eye(k)
+            coefs = np.linalg.solve(AtA, np.einsum("gni,n->gi", A, y)[..., None])[..., 0]
+            rss = np.sum((np.einsum("gni,gi->gn", A, coefs) - y) ** 2, axis=1)
+            g = int(np.argmin(rss))
+            n_params = k + (1 if k == 2 else 2)  # Amplitudes plus tau (and w)
+            bic = n * math.log(max(rss[g] / n, 1e-12)) + n_params * math.log(n)
+            if best is None or bic < best["bic"]:
+                rmse = math.sqrt(rss[g] / max(n - n_params, 1))
+                # A slow tau makes the offset and the decay nearly collinear, so the final value is poorly known
+                final_se = rmse * math.sqrt(max(np.linalg.inv(AtA[g])[0, 0], 0.0))
+                best = {
+                    "order": k - 1,
+                    "final": float(coefs[g, 0]),
+                    "final_se": final_se,
+                    "amplitude": float(np.linalg.norm(coefs[g, 1:])),
+                    "coefs": coefs[g],
+                    "tau": float(taus[g]),
+                    "omega": float(omegas[g]),
+                    "bic": bic,
+                    "rmse": rmse,
+                }
+        return best
+
+    def predict(self, t):
+        """Model value at time ``t`` (same clock as ``add``); None before the first fit."""
+        if self.model is None:
+            return None
+        m = self.model
+        s = np.asarray(t, dtype=float) - self.times[0]
+        decay = np.exp(-s / m["tau"])
+        if m["order"] == 1:
+            return m["final"] + m["coefs"][1] * decay
+        return m["final"] + decay * (m["coefs"][1] * np.cos(m["omega"] * s) + m["coefs"][2] * np.sin(m["omega"] * s))
+
+    def time_to_band(self):
+        """Seconds from the last reading until the envelope stays in band: 0 if it already does, inf if never or unknown."""
+        if self.model is None:
+            return math.inf
+        m = self.model
+        slack = self.tolerance - abs(m["final"] - self.target) - self.margin * m["final_se"]
+        if slack <= 0:
+            return math.inf
+        envelope = m["amplitude"] * math.exp(-(self.times[-1] - self.times[0]) / m["tau"])
+        return 0.0 if envelope <= slack else m["tau"] * math.log(envelope / slack)
+
+    def settled(self):
+        if self.model is None or self.time_to_band() > self.lead:
+            return False
+        if self.lead == 0 and abs(self.values[-1] - self.target) > self.tolerance:
+            return False
+        # A reading far off the fit means the trajectory just changed (setpoint, disturbance)
+        return abs(self.values[-1] - float(self.predict(self.times[-1]))) <= 3 * self.model["rmse"] + 1e-9
+
+    def next_interval(self):
+        """Seconds to wait before the next reading."""
+        if self.model is None:
+            return self.min_interval
+        return float(np.clip((self.time_to_band() - self.lead) / 2, self.min_interval, self.max_interval))
@@ -1,4 +1,7 @@
 # Example objective functions for VOL simulation mode
+# Every function works on scalars and on NumPy arrays alike.
+import numpy as np
+import pandas as pd
 
 def normalized_area(raw_area, flow_aq, flow_org):
     """
@@ -40,38 +43,89 @@ def yield_real(raw_area, flow_org, flow_aq):
     """
     return ((flow_org * raw_area) / ((flow_aq/2)*2.00)) * 100   
 
-def space_time_yield(raw_area, flow_org, flow_aq, residence_time, reactor_volume=1.4):
+def space_time_yield(raw_area, flow_org, flow_aq, residence_time, reactor_volume=1.4, yield_value=None):
     """
     Space-time yield (STY): amount of product per reactor volume per time.
     Units: (yield %) / (reactor_volume * residence_time)
+    A precomputed ``yield_value`` can be passed to skip recomputing it.
     """
-    yield_value = yield_real(raw_area, flow_org, flow_aq)
+    if yield_value is None:
+        yield_value = yield_real(raw_area, flow_org, flow_aq)
     return yield_value / (reactor_volume * residence_time)
 
-def simulate_objectives(raw_area, flow_aq, flow_org, residence_time, selected_objectives=None, directions=None):
-    """
-    Compute selected objectives for simulation mode.
-    """
-    norm_area = normalized_area(raw_area, flow_aq, flow_org)
 
+class _Intermediates:
+    """Quantities shared by several objectives, computed on first use only."""
+
+    def __init__(self, raw_area, flow_aq, flow_org, residence_time):
+        self.raw_area = raw_area
+        self.flow_aq = flow_aq
+        self.flow_org = flow_org
+        self.residence_time = residence_time
+        self._cache = {}
+
+    def get(self, name, compute):
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
 
-    all_objectives = {
-        "Yield": yield_real(raw_area, flow_org, flow_aq),
-        "Normalized Area": norm_area,
-        "Throughput": throughput(norm_area, residence_time),
-        "Used Organic": used_organic(flow_org, residence_time),
-        "Solvent Penalty": solvent_penalty(norm_area, flow_org, residence_time),
-        "Extraction Efficiency": extraction_efficiency(norm_area, flow_org),
-        "Space-Time Yield": space_time_yield(raw_area, flow_org, flow_aq, residence_time)  
-    }
+    @property
+    def norm_area(self):
+        return self.get("norm_area", lambda: normalized_area(self.raw_area, self.flow_aq, self.flow_org))
 
-    result = {}
-    selected = selected_objectives if selected_objectives else all_objectives.keys()
+    @property
+    def yield_value(self):
+        return self.get("yield", lambda: yield_real(self.raw_area, self.flow_org, self.flow_aq))
 
+
+OBJECTIVES = {
+    "Yield": lambda c: c.yield_value,
+    "Normalized Area": lambda c: c.norm_area,
+    "Throughput": lambda c: throughput(c.norm_area, c.residence_time, c.flow_org),
+    "Used Organic": lambda c: used_organic(c.flow_org, c.residence_time),
+    "Solvent Penalty": lambda c: solvent_penalty(c.norm_area, c.flow_org, c.residence_time),
+    "Extraction Efficiency": lambda c: extraction_efficiency(c.norm_area, c.flow_org),
+    "Space-Time Yield": lambda c: space_time_yield(c.raw_area, c.flow_org, c.flow_aq, c.residence_time, yield_value=c.yield_value),
+}
+
+
+def simulate_objectives_batch(raw_area, flow_aq, flow_org, residence_time, selected_objectives=None, directions=None, as_frame=True):
+    """
+    Compute the selected objectives for arrays of experiments.
+
+    Inputs are broadcast against each other. Only the requested objectives
+    are computed, and shared intermediates (normalized area, yield) only
+    once. Minimized objectives are negated, as in ``simulate_objectives``.
+    Returns a DataFrame with one column per objective, or a NumPy structured
+    array with ``as_frame=False``.
+    """
+    selected = list(selected_objectives) if selected_objectives else list(OBJECTIVES)
+    unknown = [key for key in selected if key not in OBJECTIVES]
+    if unknown:
+        raise ValueError(f"Unknown objectives: {unknown}")
+
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(a, dtype=float)) for a in (raw_area, flow_aq, flow_org, residence_time)])
+    context = _Intermediates(*arrays)
+    columns = {}
     for key in selected:
-        value = all_objectives.get(key)
+        value = np.broadcast_to(OBJECTIVES[key](context), arrays[0].shape)
         if directions and directions.get(key) == "minimize":
             value = -value
-        result[key] = value
+        columns[key] = value
 
+    if as_frame:
+        return pd.DataFrame(columns)
+    result = np.empty(arrays[0].shape, dtype=[(key, float) for key in selected])
+    for key, value in columns.items():
+        result[key] = value
     return result
+
+def simulate_objectives(raw_area, flow_aq, flow_org, residence_time, selected_objectives=None, directions=None):
+    """
+    Compute selected objectives for simulation mode, for one experiment.
+    Thin wrapper around ``simulate_objectives_batch``.
+    """
+    selected = list(selected_objectives) if selected_objectives else list(OBJECTIVES)
+    known = [key for key in selected if key in OBJECTIVES]
+    batch = simulate_objectives_batch(raw_area, flow_aq, flow_org, residence_time, known, directions, as_frame=False)
+    return {key: float(batch[key][0]) if key in OBJECTIVES else None for key in selected}
@@ -0,0 +1,83 @@
+# acquisition_optimizer.py
+import os
+import time
+import warnings
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from scipy.optimize import fmin_l_bfgs_b
+from scipy.stats import qmc
+from skopt.acquisition import _gaussian_acquisition, gaussian_acquisition_1D
+from skopt.utils import has_gradients
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class MultiStartAcquisitionOptimizer:
+    """
+    Acquisition optimizer for StepBayesianOptimizer.
+
+    A large scrambled-Sobol candidate set is scored in one batched call, then
+    the ``n_starts`` best candidates are refined with L-BFGS on a thread pool.
+    With ``time_budget`` (seconds) the refinement stops when the budget runs
+    out and the best point found so far is returned.
+    """
+
+    def __init__(self, n_candidates=8192, n_starts=8, n_jobs=None, time_budget=None, maxiter=30):
+        self.n_candidates = n_candidates
+        self.n_starts = n_starts
+        self.n_jobs = n_jobs or min(n_starts, os.cpu_count() or 1)
+        self.time_budget = time_budget
+        self.maxiter = maxiter
+
+    def candidates(self, space, rng, bounds=None):
+        """Quasi-random candidates in the transformed space, or in ``bounds`` (e.g. a trust region)."""
+        if space.is_partly_categorical:
+            return space.transform(space.rvs(n_samples=self.n_candidates, random_state=rng))
+        bounds = np.array(space.transformed_bounds if bounds is None else bounds)
+        sobol = qmc.Sobol(d=len(bounds), scramble=True, seed=rng.randint(0, np.iinfo(np.int32).max))
+        m = int(np.ceil(np.log2(self.n_candidates)))
+        return qmc.scale(sobol.random_base2(m), bounds[:, 0], bounds[:, 1])
+
+    def propose(self, model, space, y_opt, acq_func, acq_func_kwargs, rng, bounds=None):
+        """Return the transformed point that minimizes the acquisition, within ``bounds`` if given."""
+        deadline = time.perf_counter() + self.time_budget if self.time_budget else None
+
+        X = self.candidates(space, rng, bounds)
+        values = _gaussian_acquisition(X=X, model=model, y_opt=y_opt, acq_func=acq_func, acq_func_kwargs=acq_func_kwargs)
+        order = np.argsort(values)
+        best_x, best_value = X[order[0]], values[order[0]]
+
+        if not has_gradients(model) or space.is_partly_categorical:
+            return best_x
+
+        bounds = space.transformed_bounds if bounds is None else [tuple(b) for b in bounds]
+        args = (model, y_opt, acq_func, acq_func_kwargs)
+
+        def refine(x0):
+            best = [x0, np.inf]
+
+            def func(x):
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise _OutOfTime
+                value, grad = gaussian_acquisition_1D(x, *args)
+                if value < best[1]:
+                    best[:] = [np.array(x), value]
+                return value, grad
+
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    x, value, _ = fmin_l_bfgs_b(func, x0, bounds=bounds, maxiter=self.maxiter)
+                return x, value
+            except _OutOfTime:
+                return best[0], best[1]
+
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            results = list(pool.map(refine, X[order[: self.n_starts]]))
+
+        for x, value in results:
+            if value < best_value:
+                best_x, best_value = x, value
+        return best_x
@@ -1,29 +1,538 @@
+import copy
+import threading
+import warnings
+import numpy as np
+from scipy.optimize import fmin_l_bfgs_b
+from sklearn.base import clone
 from skopt import Optimizer
+from skopt.acquisition import _gaussian_acquisition, gaussian_acquisition_1D
+from skopt.learning import GaussianProcessRegressor
 from skopt.space import Space
+from skopt.utils import normalize_dimensions
+from core.optimization.gp_fitting import use_parallel_restarts, warm_start_estimator
+from core.optimization.incremental_gp import add_observation, log_marginal_likelihood_per_point
+from core.optimization.model_retention import parse_retention, retain_models
+from core.optimization.sparse_gp import SparseGaussianProcessRegressor, sparse_gp_for_space
+from core.optimization.trust_region import TrustRegion, ard_length_scales
+
+BATCH_STRATEGIES = ["cl_min", "cl_mean", "cl_max", "kriging_believer"]
+UPDATE_MODES = ["refit", "incremental"]
+SPARSE_GP = "SGP"
+
+# Attributes added after the first release; filled in when unpickling old runs
+_STATE_DEFAULTS = {
+    "pending": [],
+    "update_mode": "refit",
+    "refit_every": 5,
+    "lml_tolerance": 0.2,
+    "_since_refit": 0,
+    "_lml_ref": None,
+    "acq_optimizer": None,
+    "model_retention": "all",
+    "_n_fits": 0,
+    "prefetch_tolerance": 1.0,
+    "_prefetch": None,
+    "n_jobs": 1,
+    "trust_region": None,
+}
+
 
 class StepBayesianOptimizer:
-    def __init__(self, variables, base_estimator="GP", acq_func="EI", random_state=42):
+    def __init__(self, variables, base_estimator="GP", acq_func="EI", random_state=42,
+                 update_mode="refit", refit_every=5, lml_tolerance=0.2, acq_optimizer=None,
+                 model_retention="all", prefetch_tolerance=1.0, n_jobs=1, n_initial_points=10, trust_region=False):
+        """
+        ``update_mode="incremental"`` conditions the last fitted GP on each new
+        observation with a rank-one Cholesky update; the hyperparameters are
+        only re-optimized every ``refit_every`` observations or when the
+        per-point log marginal likelihood drops by more than ``lml_tolerance``.
+
+        ``acq_optimizer`` replaces skopt's acquisition search, e.g. with a
+        ``MultiStartAcquisitionOptimizer``.
+
+        ``model_retention`` bounds skopt's list of fitted surrogates; see
+        ``core.optimization.model_retention.parse_retention``.
+
+        ``prefetch_tolerance`` (in predicted standard deviations) decides
+        whether a suggestion computed by ``prefetch`` is still valid once the
+        real result is known.
+
+        ``base_estimator="SGP"`` uses a ``SparseGaussianProcessRegressor`` with
+        100 inducing points, for simulation campaigns with many observations.
+
+        GP hyperparameter searches start from the previous fit. With
+        ``n_jobs != 1`` the random restarts run in ``n_jobs`` processes
+        (``-1`` for all cores) and tree surrogates fit with ``n_jobs``.
+
+        The first ``n_initial_points`` suggestions are random, as in skopt.
+
+        ``trust_region=True`` (or a ``TrustRegion``) switches to TuRBO-style
+        local optimization for spaces with many variables: each fit uses only
+        the observations near the current best point, and the acquisition is
+        optimized inside a box that grows on improvements and shrinks on
+        failures; see ``core.optimization.trust_region``. Prefetching and
+        incremental updates are not used in this mode.
+        """
+        if update_mode not in UPDATE_MODES:
+            raise ValueError(f"Expected update_mode to be one of {UPDATE_MODES}, got {update_mode}")
+        parse_retention(model_retention)
         self.variable_names = [dim.name for dim in variables]
         self.space = Space(variables)
+        dimensions = self.space
+        if isinstance(base_estimator, str) and base_estimator.upper() == SPARSE_GP:
+            base_estimator = sparse_gp_for_space(self.space, random_state=random_state)
+        if isinstance(base_estimator, SparseGaussianProcessRegressor):
+            # skopt only rescales the space to [0, 1] for its own GP class
+            dimensions = Space(normalize_dimensions(self.space.dimensions))
         self._optimizer = Optimizer(
-            dimensions=self.space,
+            dimensions=dimensions,
             base_estimator=base_estimator,
             acq_func=acq_func,
-            random_state=random_state
+            random_state=random_state,
+            n_jobs=n_jobs,
+            n_initial_points=n_initial_points,
         )
+        if n_jobs != 1 and self._optimizer.base_estimator_ is not None:
+            use_parallel_restarts(self._optimizer.base_estimator_, n_jobs)
         self.x_iters = []
         self.y_iters = []
+        self.pending = []
+        self.update_mode = update_mode
+        self.refit_every = refit_every
+        self.lml_tolerance = lml_tolerance
+        self._since_refit = 0
+        self._lml_ref = None
+        self.acq_optimizer = acq_optimizer
+        self.model_retention = model_retention
+        self._n_fits = 0
+        self.prefetch_tolerance = prefetch_tolerance
+        self._prefetch = None
+        self.n_jobs = n_jobs
+        if trust_region and self.space.is_partly_categorical:
+            raise ValueError("Trust-region mode needs numeric variables only")
+        if trust_region is True:
+            trust_region = TrustRegion(len(self.space.dimensions))
+        self.trust_region = trust_region or None
+
+    def __getstate__(self):
+        # A running prefetch thread cannot be pickled; it is simply dropped
+        state = self.__dict__.copy()
+        state["_prefetch"] = None
+        return state
+
+    def __setstate__(self, state):
+        for key, value in _STATE_DEFAULTS.items():
+            state.setdefault(key, copy.copy(value))
+        self.__dict__.update(state)
+
+    def suggest(self, n=None, strategy="cl_min"):
+        """
+        Suggest the next point, or a batch of ``n`` points when ``n`` is given.
+        Batch points stay in ``pending`` until their result is observed.
+        """
+        if n is None:
+            if self.pending:
+                x = self._suggest_batch(1, strategy)[0]
+                self.pending.pop()
+                return x
+            return self._optimizer.ask()
+        if not (isinstance(n, int) and n > 0):
+            raise ValueError(f"n should be int > 0, got {n}")
+        return self._suggest_batch(n, strategy)
+
+    def prefetch(self, x):
+        """
+        Start computing the suggestion that follows ``x`` in a background
+        thread while the experiment at ``x`` runs.
 
-    def suggest(self):
-        return self._optimizer.ask()
+        The thread refits the surrogate on the current data, adds ``x`` as a
+        fantasy observation at its predicted mean and optimizes the
+        acquisition. ``observe`` uses the result when the real value lands
+        within ``prefetch_tolerance`` standard deviations of that prediction,
+        and otherwise falls back to the normal refit.
+        """
+        self._drop_prefetch()
+        opt = self._optimizer
+        if self.trust_region is not None:
+            return
+        if self.pending or not opt.models or not isinstance(opt.models[-1], GaussianProcessRegressor):
+            return
+        if opt.acq_func not in ["EI", "PI", "LCB"]:
+            return
 
-    def observe(self, x, y):
-        self._optimizer.tell(x, y)
+        job = {"x": x, "result": None}
+        args = (job, opt.space.transform(opt.Xi), list(opt.yi), opt.rng.randint(0, np.iinfo(np.int32).max))
+        job["thread"] = threading.Thread(target=self._run_prefetch, args=args, daemon=True)
+        job["thread"].start()
+        self._prefetch = job
+
+    def _drop_prefetch(self):
+        """Wait for a running prefetch and discard it, so the optimizer is not changed under the thread."""
+        job, self._prefetch = self._prefetch, None
+        if job is not None:
+            job["thread"].join()
+
+    def _run_prefetch(self, job, X, y, seed):
+        opt = self._optimizer
+        rng = np.random.RandomState(seed)
+        x_t = opt.space.transform([job["x"]])[0]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = clone(opt.base_estimator_).fit(X, y)
+        mean, std = model.predict(x_t.reshape(1, -1), return_std=True)
+        try:
+            fantasy = add_observation(model, x_t, mean[0])
+        except np.linalg.LinAlgError:
+            return  # observe falls back to the normal refit
+        next_x = self._optimize_acquisition(fantasy, min(np.min(y), mean[0]), rng)
+        job["result"] = {"model": model, "mean": mean[0], "std": std[0], "next_x": next_x}
+
+    def _observe_prefetched(self, x, y):
+        """Use a finished prefetch for ``x`` if the real result confirms it."""
+        job, self._prefetch = self._prefetch, None
+        if job is None:
+            return False
+        job["thread"].join()
+        opt = self._optimizer
+        if opt.space.distance(job["x"], x) > 1e-8:
+            return False
+        result = job["result"]
+        if result is None or abs(y - result["mean"]) > self.prefetch_tolerance * max(result["std"], 1e-12):
+            return False
+
+        opt.tell(x, y, fit=False)
+        opt.models.append(add_observation(result["model"], opt.space.transform([x])[0], y))
+        self._model_added()
+        self._set_next(result["next_x"])
+        self._after_full_fit()
+        return True
+
+    def observe(self, x, y, fit=True):
+        """
+        Record one result. With ``fit=False`` the surrogate is not refitted;
+        the next fitting ``observe``/``observe_many`` call will include it.
+        """
+        self._update_trust_region(y)
+        if not fit:
+            self._drop_prefetch()
+            self._optimizer.tell(x, y, fit=False)
+        elif self._observe_prefetched(x, y):
+            pass
+        elif not self._observe_incremental(x, y):
+            self._tell_and_fit(x, y)
         self.x_iters.append(x)
         self.y_iters.append(y)
+        self._clear_pending(x)
+
+    def observe_many(self, X, Y, fit=True, skip_recorded=False):
+        """
+        Record several results and fit the surrogate once on all of them.
+        With ``skip_recorded=True`` pairs already in the history are ignored,
+        so a resumed optimizer can be handed the full campaign table.
+        """
+        self._drop_prefetch()
+        X, Y = list(X), list(Y)
+        if skip_recorded:
+            X, Y = self._unrecorded(X, Y)
+        if not X:
+            return
+        last = 0
+        if self.trust_region is not None:
+            # Each result counts toward the trust region in order, against the results before it
+            for x, y in zip(X[:-1], Y[:-1]):
+                self._update_trust_region(y)
+                self._optimizer.tell(x, y, fit=False)
+            self._update_trust_region(Y[-1])
+            last = len(X) - 1
+        if fit:
+            self._tell_and_fit(X[last:], Y[last:])
+        else:
+            self._optimizer.tell(X[last:], Y[last:], fit=False)
+        for x, y in zip(X, Y):
+            self.x_iters.append(x)
+            self.y_iters.append(y)
+            self._clear_pending(x)
+
+    def _unrecorded(self, X, Y):
+        space = self._optimizer.space
+        seen = list(zip(self.x_iters, self.y_iters))
+        new_X, new_Y = [], []
+        for x, y in zip(X, Y):
+            for i, (xs, ys) in enumerate(seen):
+                if abs(ys - y) <= 1e-8 and space.distance(xs, x) <= 1e-8:
+                    del seen[i]
+                    break
+            else:
+                new_X.append(x)
+                new_Y.append(y)
+        return new_X, new_Y
+
+    def _tell_and_fit(self, x, y):
+        """Tell one or several points and refit the surrogate hyperparameters."""
+        opt = self._optimizer
+        n_models = len(opt.models)
+        if self.trust_region is not None:
+            opt.tell(x, y, fit=False)
+            if opt._n_initial_points <= 0 and opt.base_estimator_ is not None:
+                self._fit_trust_region()
+        elif self.acq_optimizer is None:
+            opt.tell(x, y)
+        else:
+            # Fit here so skopt does not run its own acquisition search first
+            opt.tell(x, y, fit=False)
+            if opt._n_initial_points <= 0 and opt.base_estimator_ is not None:
+                est = clone(opt.base_estimator_)
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    est.fit(opt.space.transform(opt.Xi), opt.yi)
+                opt.models.append(est)
+                self._propose(est)
+        if len(opt.models) > n_models:
+            self._model_added()
+        self._after_full_fit()
+
+    def _model_added(self):
+        self._n_fits += 1
+        retain_models(self._optimizer.models, self.model_retention, self._n_fits)
+
+    def _after_full_fit(self):
+        self._since_refit = 0
+        if self._optimizer.models:
+            warm_start_estimator(self._optimizer.base_estimator_, self._optimizer.models[-1])
+        if self._can_update_incrementally():
+            self._lml_ref = log_marginal_likelihood_per_point(self._optimizer.models[-1])
+
+    def _can_update_incrementally(self):
+        opt = self._optimizer
+        return (
+            opt.models
+            and self.trust_region is None
+            and isinstance(opt.models[-1], GaussianProcessRegressor)
+            and opt.acq_func in ["EI", "PI", "LCB"]
+        )
+
+    def _observe_incremental(self, x, y):
+        """Try a rank-one update; return False when a full refit is due."""
+        if self.update_mode != "incremental" or not self._can_update_incrementally():
+            return False
+        if self._since_refit + 1 >= self.refit_every:
+            return False
+
+        opt = self._optimizer
+        try:
+            model = add_observation(opt.models[-1], opt.space.transform([x])[0], y)
+        except np.linalg.LinAlgError:
+            return False
+        if self._lml_ref is not None and self._lml_ref - log_marginal_likelihood_per_point(model) > self.lml_tolerance:
+            return False
+
+        opt.tell(x, y, fit=False)
+        opt.models.append(model)
+        self._model_added()
+        self._propose(model)
+        self._since_refit += 1
+        return True
+
+    def _propose(self, model):
+        """
+        Optimize the acquisition on ``model`` and store the result as the
+        skopt optimizer's next point, mirroring what ``Optimizer.tell`` does.
+        """
+        opt = self._optimizer
+        self._set_next(self._optimize_acquisition(model, np.min(opt.yi), opt.rng))
+
+    def _optimize_acquisition(self, model, y_opt, rng, bounds=None):
+        """
+        Return the transformed point minimizing the acquisition on ``model``,
+        within the transformed ``bounds`` (n_dims x 2) when given.
+        """
+        opt = self._optimizer
+        if self.acq_optimizer is not None:
+            acq_func = opt.acq_func if opt.acq_func in ["EI", "PI", "LCB"] else "EI"
+            return self.acq_optimizer.propose(model, opt.space, y_opt, acq_func, opt.acq_func_kwargs, rng, bounds=bounds)
+
+        if bounds is None:
+            X = opt.space.transform(opt.space.rvs(n_samples=opt.n_points, random_state=rng))
+        else:
+            X = rng.uniform(bounds[:, 0], bounds[:, 1], size=(opt.n_points, len(bounds)))
+        values = _gaussian_acquisition(
+            X=X, model=model, y_opt=y_opt, acq_func=opt.acq_func, acq_func_kwargs=opt.acq_func_kwargs
+        )
+        if opt.acq_optimizer == "sampling":
+            next_x = X[np.argmin(values)]
+        else:
+            x0 = X[np.argsort(values)[: opt.n_restarts_optimizer]]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                results = [
+                    fmin_l_bfgs_b(
+                        gaussian_acquisition_1D, x,
+                        args=(model, y_opt, opt.acq_func, opt.acq_func_kwargs),
+                        bounds=opt.space.transformed_bounds if bounds is None else bounds, approx_grad=False, maxiter=20,
+                    )
+                    for x in x0
+                ]
+            next_x = min(results, key=lambda r: r[1])[0]
+        return next_x
+
+    def _update_trust_region(self, y):
+        """
+        Count a model-guided result as a success or failure of the trust
+        region. Restarts are counted in ``trust_region.n_restarts``.
+        """
+        tr, opt = self.trust_region, self._optimizer
+        if tr is None or opt._n_initial_points > 0 or len(opt.yi) <= tr.start:
+            return
+        tr.update(y, min(opt.yi[tr.start:]), len(opt.yi) + 1)
+
+    def _unit_bounds(self):
+        return np.array(self._optimizer.space.transformed_bounds)
+
+    def _fit_trust_region(self):
+        """
+        Fit a GP on the observations inside the trust region (at least
+        ``min_points`` nearest the center) and propose the next point inside it.
+        """
+        opt, tr = self._optimizer, self.trust_region
+        bounds = self._unit_bounds()
+        X = opt.space.transform(opt.Xi)
+        U = (X - bounds[:, 0]) / (bounds[:, 1] - bounds[:, 0])
+        y = np.asarray(opt.yi)
+        region = np.arange(tr.start, len(y))
+        if not len(region):
+            # Fresh region after a restart: start from the point farthest from every observation
+            candidates = opt.rng.uniform(size=(max(1000, 100 * tr.n_dims), tr.n_dims))
+            distance = np.min(np.linalg.norm(candidates[:, None, :] - U[None, :, :], axis=2), axis=1)
+            tr.lower = tr.upper = None
+            tr.local = []
+            self._set_next(bounds[:, 0] + candidates[np.argmax(distance)] * (bounds[:, 1] - bounds[:, 0]))
+            return
+
+        # The box is shaped by the previous fit, so the new GP covers all of it
+        center = U[region[np.argmin(y[region])]]
+        previous = opt.models[-1] if opt.models else None
+        tr.lower, tr.upper = tr.box(center, ard_length_scales(previous, tr.n_dims))
+        local = np.flatnonzero(np.all((U >= tr.lower) & (U <= tr.upper), axis=1))
+        if len(local) < tr.min_points:
+            local = np.argsort(np.linalg.norm(U - center, axis=1))[: tr.min_points]
+
+        est = clone(opt.base_estimator_)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            est.fit(X[local], y[local])
+        opt.models.append(est)
+        tr.local = local.tolist()
+        next_x = self._optimize_acquisition(est, np.min(y[local]), opt.rng, bounds=self._trust_region_bounds())
+        self._set_next(next_x)
+
+    def _trust_region_bounds(self):
+        """The trust region in the transformed space, or None outside trust-region mode."""
+        tr = self.trust_region
+        if tr is None or tr.lower is None:
+            return None
+        bounds = self._unit_bounds()
+        span = bounds[:, 1] - bounds[:, 0]
+        return np.column_stack([bounds[:, 0] + tr.lower * span, bounds[:, 0] + tr.upper * span])
+
+    def _set_next(self, next_x):
+        opt = self._optimizer
+        if not opt.space.is_categorical:
+            bounds = np.array(opt.space.transformed_bounds)
+            next_x = np.clip(next_x, bounds[:, 0], bounds[:, 1])
+        opt.next_xs_ = [next_x]
+        opt._next_x = opt.space.inverse_transform(next_x.reshape((1, -1)))[0]
+        opt.cache_ = {}
+
+    def clear_pending(self):
+        """Forget batch points that will never be run."""
+        self.pending = []
+
+    def _clear_pending(self, x):
+        for i, p in enumerate(self.pending):
+            if self._optimizer.space.distance(p, x) <= 1e-8:
+                del self.pending[i]
+                return
+
+    def _suggest_batch(self, n, strategy):
+        """
+        Constant liar / kriging believer batch selection.
+
+        The surrogate's hyperparameters are fitted once (by the last ``tell``)
+        and held fixed; every pending or newly chosen point is added as a
+        fantasy observation by conditioning that GP, and all picks are scored
+        against one shared candidate set.
+        """
+        if strategy not in BATCH_STRATEGIES:
+            raise ValueError(f"Expected strategy to be one of {BATCH_STRATEGIES}, got {strategy}")
+
+        opt = self._optimizer
+        batch = []
+
+        # Still in the random initial design, or no surrogate to fantasize with
+        if opt._n_initial_points - len(self.pending) > 0 or not opt.models:
+            while len(batch) < n:
+                if opt._n_initial_points - len(self.pending) > 0 and opt._initial_samples is not None:
+                    x = opt._initial_samples[len(opt._initial_samples) - opt._n_initial_points + len(self.pending)]
+                else:
+                    x = opt.space.rvs(random_state=opt.rng)[0]
+                batch.append(x)
+                self.pending.append(x)
+            return batch
+
+        acq_func = opt.acq_func if opt.acq_func in ["EI", "PI", "LCB"] else "EI"
+        tr_bounds = self._trust_region_bounds()
+        if tr_bounds is None:
+            candidates = opt.space.transform(opt.space.rvs(n_samples=opt.n_points, random_state=opt.rng))
+        else:
+            candidates = opt.rng.uniform(tr_bounds[:, 0], tr_bounds[:, 1], size=(opt.n_points, len(tr_bounds)))
+
+        if not self.pending:
+            # The first point is the one skopt already optimized at tell time
+            x = opt.ask()
+            batch.append(x)
+            self.pending.append(x)
+
+        fantasy = opt.models[-1]
+        X_fant = list(opt.space.transform(opt.Xi))
+        y_fant = list(opt.yi)
+        for x in self.pending:
+            fantasy = self._add_fantasy(fantasy, X_fant, y_fant, opt.space.transform([x])[0], strategy)
+
+        while len(batch) < n:
+            values = _gaussian_acquisition(
+                X=candidates,
+                model=fantasy,
+                y_opt=np.min(y_fant),
+                acq_func=acq_func,
+                acq_func_kwargs=opt.acq_func_kwargs,
+            )
+            best = np.argmin(values)
+            x = opt.space.inverse_transform(candidates[best].reshape(1, -1))[0]
+            fantasy = self._add_fantasy(fantasy, X_fant, y_fant, candidates[best], strategy)
+            candidates = np.delete(candidates, best, axis=0)
+            batch.append(x)
+            self.pending.append(x)
+
+        return batch
+
+    def _add_fantasy(self, model, X_fant, y_fant, x_t, strategy):
+        """Condition ``model`` on a lie at transformed point ``x_t``."""
+        if strategy == "kriging_believer":
+            lie = float(model.predict(x_t.reshape(1, -1))[0])
+        else:
+            lie = {"cl_min": np.min, "cl_mean": np.mean, "cl_max": np.max}[strategy](self._optimizer.yi)
+        X_fant.append(x_t)
+        y_fant.append(lie)
+
+        if isinstance(model, GaussianProcessRegressor):
+            try:
+                return add_observation(model, x_t, lie)
+            except np.linalg.LinAlgError:
+                return model  # x_t is numerically a training point already
+        est = clone(model)
+        est.fit(np.array(X_fant), np.array(y_fant))
+        return est
 
     @property
     def skopt_optimizer(self):
         return self._optimizer
-
-
@@ -0,0 +1,346 @@
+# checkpoint.py
+# Compact, versioned optimizer checkpoints.
+#
+# Instead of dill-pickling the whole optimizer (including skopt's list of every
+# fitted surrogate), a checkpoint stores only what is needed to rebuild it: the
+# space definition, the X/y history, the RNG state and the hyperparameters of
+# the last fitted GP. Restoring refits the GP once with those hyperparameters
+# held fixed, so no hyperparameter search runs on load. ProcessOptimizer's
+# Optimizer is the exception: its models are refitted from the history.
+import json
+import os
+import warnings
+import dill as pickle
+import numpy as np
+from sklearn.base import clone
+from skopt.space import Real, Integer, Categorical
+from core.optimization.bayesian_optimization import StepBayesianOptimizer
+from core.optimization.acquisition_optimizer import MultiStartAcquisitionOptimizer
+from core.optimization.ehvi import EHVIOptimizer
+from core.optimization.gp_fitting import gp_hyperparameters, kernel_with_hyperparameters, warm_start_estimator
+from core.optimization.sparse_gp import sparse_gp_for_space
+from core.optimization.trust_region import TrustRegion
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILE = "optimizer.json"
+LEGACY_FILE = "optimizer.pkl"
+
+_ESTIMATOR_NAMES = {
+    "GaussianProcessRegressor": "GP",
+    "RandomForestRegressor": "RF",
+    "ExtraTreesRegressor": "ET",
+    "GradientBoostingQuantileRegressor": "GBRT",
+    "SparseGaussianProcessRegressor": "SGP",
+}
+_ACQ_OPTIMIZERS = {"MultiStartAcquisitionOptimizer": MultiStartAcquisitionOptimizer}
+
+
+def _plain(value):
+    """Convert numpy scalars/arrays to JSON-friendly Python values."""
+    if isinstance(value, np.ndarray):
+        return [_plain(v) for v in value.tolist()]
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _dim_to_dict(dim):
+    if isinstance(dim, Categorical):
+        return {"type": "categorical", "name": dim.name, "categories": _plain(list(dim.categories))}
+    kind = "integer" if isinstance(dim, Integer) else "real"
+    return {"type": kind, "name": dim.name, "low": _plain(dim.low), "high": _plain(dim.high),
+            "prior": dim.prior, "base": _plain(dim.base)}
+
+
+def _dim_from_dict(d):
+    if d["type"] == "categorical":
+        return Categorical(d["categories"], name=d["name"])
+    cls = Integer if d["type"] == "integer" else Real
+    return cls(d["low"], d["high"], prior=d["prior"], base=d["base"], name=d["name"])
+
+
+def _rng_to_dict(rng):
+    name, keys, pos, has_gauss, cached = rng.get_state()
+    return {"keys": keys.tolist(), "pos": int(pos), "has_gauss": int(has_gauss), "cached_gaussian": float(cached)}
+
+
+def _rng_from_dict(rng, d):
+    rng.set_state(("MT19937", np.array(d["keys"], dtype=np.uint32), d["pos"], d["has_gauss"], d["cached_gaussian"]))
+
+
+def _refit_with_hyperparameters(base_estimator, theta, X, y):
+    est = clone(base_estimator)
+    if theta is not None:
+        est.set_params(kernel=kernel_with_hyperparameters(est, theta), optimizer=None)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        est.fit(X, y)
+    return est
+
+
+def checkpoint(optimizer):
+    """Return a JSON-serializable checkpoint of a StepBayesianOptimizer, EHVIOptimizer or ProcessOptimizer Optimizer."""
+    if isinstance(optimizer, StepBayesianOptimizer):
+        return _checkpoint_step(optimizer)
+    if isinstance(optimizer, EHVIOptimizer):
+        return _checkpoint_ehvi(optimizer)
+    if type(optimizer).__module__.startswith("ProcessOptimizer"):
+        return _checkpoint_process_optimizer(optimizer)
+    raise TypeError(f"No checkpoint format for {type(optimizer).__name__}")
+
+
+def _checkpoint_step(optimizer):
+    opt = optimizer.skopt_optimizer
+    estimator = _ESTIMATOR_NAMES.get(type(opt.base_estimator_).__name__)
+    if estimator is None:
+        raise TypeError(f"No checkpoint format for estimator {type(opt.base_estimator_).__name__}")
+    acq = optimizer.acq_optimizer
+    return {
+        "format": "StepBayesianOptimizer",
+        "version": CHECKPOINT_VERSION,
+        "space": [_dim_to_dict(dim) for dim in optimizer.space.dimensions],
+        "base_estimator": estimator,
+        "n_inducing": getattr(opt.base_estimator_, "n_inducing", None),
+        "acq_func": opt.acq_func,
+        "acq_optimizer": None if acq is None else {"class": type(acq).__name__, "params": vars(acq)},
+        "update_mode": optimizer.update_mode,
+        "refit_every": optimizer.refit_every,
+        "lml_tolerance": optimizer.lml_tolerance,
+        "model_retention": optimizer.model_retention,
+        "prefetch_tolerance": optimizer.prefetch_tolerance,
+        "n_jobs": optimizer.n_jobs,
+        "n_fits": optimizer._n_fits,
+        "since_refit": optimizer._since_refit,
+        "lml_ref": optimizer._lml_ref,
+        "n_initial_points": opt.n_initial_points_,
+        "n_initial_points_remaining": opt._n_initial_points,
+        "x_iters": _plain(optimizer.x_iters),
+        "y_iters": _plain(optimizer.y_iters),
+        "Xi": _plain(opt.Xi),
+        "yi": _plain(opt.yi),
+        "pending": _plain(optimizer.pending),
+        "rng": _rng_to_dict(opt.rng),
+        "hyperparameters": gp_hyperparameters(opt.models[-1]) if opt.models else None,
+        "has_model": bool(opt.models),
+        "next_x": _plain(opt._next_x) if hasattr(opt, "_next_x") else None,
+        "gains": _plain(opt.gains_) if hasattr(opt, "gains_") else None,
+        "trust_region": None if optimizer.trust_region is None else optimizer.trust_region.to_dict(),
+    }
+
+
+def _checkpoint_process_optimizer(optimizer):
+    # Older ProcessOptimizer versions do not keep the seed they were created with
+    random_state = getattr(optimizer, "random_state", None)
+    dims = []
+    for dim in optimizer.space.dimensions:
+        if isinstance(dim, Categorical):
+            dims.append({"type": "categorical", "categories": _plain(list(dim.categories))})
+        else:
+            dims.append({"type": type(dim).__name__.lower(), "low": _plain(dim.low), "high": _plain(dim.high)})
+    return {
+        "format": "ProcessOptimizer",
+        "version": CHECKPOINT_VERSION,
+        "dimensions": dims,
+        "n_initial_points": optimizer.n_initial_points_,
+        "n_objectives": optimizer.n_objectives,
+        "random_state": _plain(random_state) if isinstance(random_state, (int, np.integer)) else None,
+        "acq_func": optimizer.acq_func,
+        "Xi": _plain(optimizer.Xi),
+        "yi": _plain(optimizer.yi),
+        "next_x": _plain(optimizer._next_x) if hasattr(optimizer, "_next_x") else None,
+        "rng": _rng_to_dict(optimizer.rng),
+    }
+
+
+def _checkpoint_ehvi(optimizer):
+    return {
+        "format": "EHVIOptimizer",
+        "version": CHECKPOINT_VERSION,
+        "space": [_dim_to_dict(dim) for dim in optimizer.space.dimensions],
+        "n_initial_points": optimizer.n_initial_points_,
+        "n_objectives": optimizer.n_objectives,
+        "random_state": _plain(optimizer.random_state) if isinstance(optimizer.random_state, (int, np.integer)) else None,
+        "n_samples": optimizer.n_samples,
+        "n_candidates": optimizer.n_candidates,
+        "Xi": _plain(optimizer.Xi),
+        "yi": _plain(optimizer.yi),
+        "pending": _plain(optimizer.pending),
+        "hyperparameters": [gp_hyperparameters(model) for model in optimizer.models[-1]] if optimizer.models else None,
+        "rng": _rng_to_dict(optimizer.rng),
+    }
+
+
+def restore(state):
+    """Rebuild an optimizer from a checkpoint dict."""
+    if state.get("version", 0) > CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint version {state['version']} is newer than supported ({CHECKPOINT_VERSION})")
+    if state["format"] == "StepBayesianOptimizer":
+        return _restore_step(state)
+    if state["format"] == "EHVIOptimizer":
+        return _restore_ehvi(state)
+    if state["format"] == "ProcessOptimizer":
+        return _restore_process_optimizer(state)
+    raise ValueError(f"Unknown checkpoint format: {state['format']}")
+
+
+def _restore_step(state):
+    acq = state["acq_optimizer"]
+    variables = [_dim_from_dict(d) for d in state["space"]]
+    base_estimator = state["base_estimator"]
+    if base_estimator == "SGP" and state.get("n_inducing"):
+        base_estimator = sparse_gp_for_space(variables, n_inducing=state["n_inducing"])
+    optimizer = StepBayesianOptimizer(
+        variables,
+        base_estimator=base_estimator,
+        acq_func=state["acq_func"],
+        update_mode=state["update_mode"],
+        refit_every=state["refit_every"],
+        lml_tolerance=state["lml_tolerance"],
+        acq_optimizer=None if acq is None else _ACQ_OPTIMIZERS[acq["class"]](**acq["params"]),
+        model_retention=state.get("model_retention", "all"),
+        prefetch_tolerance=state.get("prefetch_tolerance", 1.0),
+        n_jobs=state.get("n_jobs", 1),
+        n_initial_points=state.get("n_initial_points", 10),
+        trust_region=TrustRegion.from_dict(state["trust_region"]) if state.get("trust_region") else False,
+    )
+    optimizer.x_iters = state["x_iters"]
+    optimizer.y_iters = state["y_iters"]
+    optimizer.pending = state["pending"]
+    optimizer._since_refit = state["since_refit"]
+    optimizer._lml_ref = state["lml_ref"]
+    optimizer._n_fits = state.get("n_fits", 0)
+
+    opt = optimizer.skopt_optimizer
+    opt.Xi = state["Xi"]
+    opt.yi = state["yi"]
+    opt._n_initial_points = state["n_initial_points_remaining"]
+    if state["gains"] is not None:
+        opt.gains_ = np.array(state["gains"])
+    if state["has_model"]:
+        X, y = opt.space.transform(opt.Xi), np.asarray(opt.yi)
+        if optimizer.trust_region is not None and optimizer.trust_region.local:
+            # The last model was a local GP on the trust region's points
+            X, y = X[optimizer.trust_region.local], y[optimizer.trust_region.local]
+        model = _refit_with_hyperparameters(opt.base_estimator_, state["hyperparameters"], X, y)
+        opt.models = [model]
+        warm_start_estimator(opt.base_estimator_, model)
+    if state["next_x"] is not None:
+        opt._next_x = state["next_x"]
+        opt.next_xs_ = [opt.space.transform([state["next_x"]])[0]]
+    _rng_from_dict(opt.rng, state["rng"])
+    return optimizer
+
+
+def _restore_ehvi(state):
+    optimizer = EHVIOptimizer(
+        [_dim_from_dict(d) for d in state["space"]],
+        n_initial_points=state["n_initial_points"],
+        n_objectives=state["n_objectives"],
+        random_state=state["random_state"],
+        n_samples=state["n_samples"],
+        n_candidates=state["n_candidates"],
+    )
+    optimizer.Xi = state["Xi"]
+    optimizer.yi = state["yi"]
+    optimizer.pending = state["pending"]
+    optimizer._n_initial_points = state["n_initial_points"] - len(state["Xi"])
+    if state["hyperparameters"] is not None:
+        X = optimizer.space.transform(optimizer.Xi)
+        Y = np.asarray(optimizer.yi)
+        optimizer.models = [[
+            _refit_with_hyperparameters(optimizer.base_estimator_, theta, X, Y[:, i])
+            for i, theta in enumerate(state["hyperparameters"])
+        ]]
+    _rng_from_dict(optimizer.rng, state["rng"])
+    return optimizer
+
+
+def _restore_process_optimizer(state):
+    """
+    ProcessOptimizer's fitted models are not restored: telling the history
+    refits them, hyperparameter search included. The saved next point is
+    put back, so the first suggestion after loading is the one the saved
+    optimizer would have made; later ones can differ slightly.
+    """
+    from ProcessOptimizer import Optimizer
+
+    dims = []
+    for d in state["dimensions"]:
+        dims.append(d["categories"] if d["type"] == "categorical" else (d["low"], d["high"]))
+    kwargs = {"random_state": state["random_state"]} if state["random_state"] is not None else {}
+    optimizer = Optimizer(
+        dimensions=dims,
+        n_initial_points=state["n_initial_points"],
+        n_objectives=state["n_objectives"],
+        acq_func=state["acq_func"],
+        **kwargs,
+    )
+    if state["Xi"]:
+        optimizer.tell(state["Xi"], state["yi"])
+    if state.get("next_x") is not None and optimizer.models:
+        optimizer._next_x = state["next_x"]
+    _rng_from_dict(optimizer.rng, state["rng"])
+    return optimizer
+
+
+def save_optimizer(optimizer, run_path):
+    """
+    Write the optimizer to ``run_path`` as a compact checkpoint, falling back
+    to a dill pickle for optimizers without a checkpoint format.
+    """
+    try:
+        state = checkpoint(optimizer)
+    except TypeError:
+        with open(os.path.join(run_path, LEGACY_FILE), "wb") as f:
+            pickle.dump(optimizer, f)
+        _remove(os.path.join(run_path, CHECKPOINT_FILE))
+        return os.path.join(run_path, LEGACY_FILE)
+
+    path = os.path.join(run_path, CHECKPOINT_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_optimizer(run_path):
+    """
+    Load an optimizer saved by ``save_optimizer``. Runs saved before the
+    checkpoint format existed only have a dill ``optimizer.pkl``.
+    """
+    path = os.path.join(run_path, CHECKPOINT_FILE)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return restore(json.load(f))
+    with open(os.path.join(run_path, LEGACY_FILE), "rb") as f:
+        optimizer = pickle.load(f)
+    if type(optimizer).__name__ == "StepBayesianOptimizer" and type(optimizer) is not StepBayesianOptimizer:
+        optimizer = _rebuild_step(optimizer)
+    return optimizer
+
+
+def _rebuild_step(stale):
+    """
+    dill stored the class of some old runs by value, so unpickling gives the
+    class as it was then, without the attributes or methods added since.
+    Rebuild a current StepBayesianOptimizer and replay its history.
+    """
+    opt = stale._optimizer
+    optimizer = StepBayesianOptimizer(
+        list(stale.space.dimensions),
+        base_estimator=_ESTIMATOR_NAMES.get(type(opt.base_estimator_).__name__, "GP"),
+        acq_func=opt.acq_func,
+        n_initial_points=opt.n_initial_points_,
+    )
+    if stale.x_iters:
+        optimizer.observe_many([list(x) for x in stale.x_iters], [float(y) for y in stale.y_iters])
+    optimizer.skopt_optimizer.rng.set_state(opt.rng.get_state())
+    return optimizer
+
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
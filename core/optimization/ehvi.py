@@ -0,0 +1,215 @@
+# ehvi.py
+# Expected hypervolume improvement (EHVI) for multi-objective campaigns.
+#
+# One GP per objective. EHVI is estimated by Monte Carlo over many candidate
+# points at once: the region the current front does not dominate is split
+# into boxes once per suggestion, and every posterior sample of every
+# candidate is scored against those same boxes. Batches (q > 1) are built
+# greedily, conditioning the GPs on the predicted mean of each chosen point.
+import warnings
+import numpy as np
+from scipy.stats import norm, qmc
+from sklearn.base import clone
+from sklearn.utils import check_random_state
+from skopt.space import Space
+from skopt.utils import cook_estimator, normalize_dimensions
+from core.optimization.acquisition_optimizer import MultiStartAcquisitionOptimizer
+from core.optimization.gp_fitting import warm_start_estimator
+from core.optimization.hypervolume import reference_point
+from core.optimization.incremental_gp import add_observation
+from core.optimization.pareto import non_dominated_mask
+
+_MAX_CHUNK_ELEMENTS = 4_000_000
+
+
+def box_decomposition(front, ref):
+    """
+    Split the region below ``ref`` that ``front`` does not dominate into
+    disjoint boxes. Returns ``(lower, upper)``, each (n_boxes x n_objectives);
+    lower bounds may be -inf.
+
+    The grid is built from the front's coordinates in every objective but the
+    first; along the first objective each grid cell is one box reaching up to
+    the best front point that dominates the cell in the other objectives.
+    """
+    ref = np.asarray(ref, dtype=float)
+    m = len(ref)
+    front = np.asarray(front, dtype=float).reshape(-1, m)
+    front = front[np.all(front < ref, axis=1)]
+    if len(front):
+        front = front[non_dominated_mask(front)]
+    if m == 1:
+        upper = front.min(axis=0) if len(front) else ref
+        return np.full((1, 1), -np.inf), upper.reshape(1, 1)
+
+    lowers, uppers = [], []
+    for d in range(1, m):
+        edges = np.unique(front[:, d]) if len(front) else np.empty(0)
+        lowers.append(np.append(-np.inf, edges))
+        uppers.append(np.append(edges, ref[d]))
+    grid = np.meshgrid(*[np.arange(len(e)) for e in lowers], indexing="ij")
+    cells = np.stack([g.ravel() for g in grid], axis=1)
+    lower_rest = np.column_stack([lowers[d][cells[:, d]] for d in range(m - 1)])
+    upper_rest = np.column_stack([uppers[d][cells[:, d]] for d in range(m - 1)])
+
+    if len(front):
+        covers = np.all(front[None, :, 1:] <= lower_rest[:, None, :], axis=2)
+        upper_first = np.min(np.where(covers, front[None, :, 0], ref[0]), axis=1)
+    else:
+        upper_first = np.full(len(cells), ref[0])
+    lower = np.column_stack([np.full(len(cells), -np.inf), lower_rest])
+    upper = np.column_stack([upper_first, upper_rest])
+    return lower, upper
+
+
+def hypervolume_improvement(Y, lower, upper):
+    """Hypervolume improvement of every row of ``Y`` (..., n_objectives) over the boxes."""
+    widths = np.clip(upper - np.maximum(Y[..., None, :], lower), 0.0, None)
+    return widths.prod(axis=-1).sum(axis=-1)
+
+
+def expected_hypervolume_improvement(mean, std, lower, upper, base_samples):
+    """
+    Monte Carlo EHVI for candidates with independent Gaussian posteriors
+    ``mean``/``std`` (n_candidates x n_objectives). ``base_samples``
+    (n_samples x n_objectives) are standard normal draws shared by all
+    candidates, so differences between candidates are not sampling noise.
+    """
+    n_samples, m = base_samples.shape
+    chunk = max(1, _MAX_CHUNK_ELEMENTS // (n_samples * len(lower) * m))
+    ehvi = np.empty(len(mean))
+    for start in range(0, len(mean), chunk):
+        stop = start + chunk
+        Y = mean[None, start:stop] + std[None, start:stop] * base_samples[:, None, :]
+        ehvi[start:stop] = hypervolume_improvement(Y, lower, upper).mean(axis=0)
+    return ehvi
+
+
+class EHVIOptimizer:
+    """
+    Multi-objective Bayesian optimizer with the ask/tell interface of
+    ProcessOptimizer's ``Optimizer``, so the multi-objective page can use
+    either. Minimizes every objective.
+
+    ``ask(n_points=q)`` returns a batch and keeps it in ``pending`` until the
+    results are told; pending points are treated as already observed at
+    their predicted mean when choosing new ones.
+    """
+
+    def __init__(self, dimensions, n_initial_points=5, n_objectives=2, random_state=None,
+                 n_samples=128, n_candidates=1024):
+        self.space = Space(normalize_dimensions(Space(dimensions).dimensions))
+        self.n_objectives = n_objectives
+        self.n_initial_points_ = n_initial_points
+        self._n_initial_points = n_initial_points
+        self.random_state = random_state
+        self.rng = check_random_state(random_state)
+        self.base_estimator_ = cook_estimator("GP", space=self.space, random_state=self.rng.randint(0, np.iinfo(np.int32).max))
+        self.n_samples = n_samples
+        self.n_candidates = n_candidates
+        self.Xi = []
+        self.yi = []
+        self.models = []
+        self.pending = []
+
+    def ask(self, n_points=None):
+        """Suggest one point, or a batch of ``n_points`` that is kept in ``pending``."""
+        if n_points is None:
+            return self._ask_batch(1)[0]
+        batch = self._ask_batch(n_points)
+        self.pending.extend(batch)
+        return batch
+
+    def tell(self, x, y, fit=True):
+        """Record one result, or several when ``x`` is a list of points."""
+        if len(x) and np.ndim(x[0]) > 0:
+            X, Y = list(x), list(y)
+        else:
+            X, Y = [x], [y]
+        for x_, y_ in zip(X, Y):
+            if len(y_) != self.n_objectives:
+                raise ValueError(f"Expected {self.n_objectives} objective values, got {len(y_)}")
+            self.Xi.append(list(x_))
+            self.yi.append([float(v) for v in y_])
+            self._clear_pending(x_)
+        self._n_initial_points -= len(X)
+        if fit and self._n_initial_points <= 0:
+            self._fit()
+
+    def _clear_pending(self, x):
+        for i, p in enumerate(self.pending):
+            if np.allclose(np.asarray(p, dtype=float), np.asarray(x, dtype=float)):
+                del self.pending[i]
+                return
+
+    def _fit(self):
+        X = self.space.transform(self.Xi)
+        Y = np.asarray(self.yi)
+        previous = self.models[-1] if self.models else [None] * self.n_objectives
+        models = []
+        for i in range(self.n_objectives):
+            est = clone(self.base_estimator_)
+            if previous[i] is not None:
+                warm_start_estimator(est, previous[i])
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                est.fit(X, Y[:, i])
+            models.append(est)
+        self.models.append(models)
+
+    def _ask_batch(self, q):
+        if self._n_initial_points - len(self.pending) > 0 or not self.models:
+            return self.space.rvs(n_samples=q, random_state=self.rng)
+
+        models = list(self.models[-1])
+        Y_front = [list(y) for y in self.yi]
+        ref = reference_point(self.yi)
+        for x in self.pending:
+            models, mean = self._fantasize(models, self.space.transform([x])[0])
+            Y_front.append(mean)
+
+        sobol = qmc.Sobol(d=self.n_objectives, scramble=True, seed=self.rng.randint(0, np.iinfo(np.int32).max))
+        base_samples = norm.ppf(np.clip(sobol.random(self.n_samples), 1e-9, 1 - 1e-9))
+
+        batch = []
+        for _ in range(q):
+            lower, upper = box_decomposition(Y_front, ref)
+            X_cand = self._candidates()
+            mean, std = self._predict(models, X_cand)
+            ehvi = expected_hypervolume_improvement(mean, std, lower, upper, base_samples)
+            # Without any expected improvement, explore where the models are least certain
+            best = np.argmax(ehvi) if ehvi.max() > 0 else np.argmax(std.sum(axis=1))
+            x_t = X_cand[best]
+            batch.append(self.space.inverse_transform(x_t.reshape(1, -1))[0])
+            models, mean_best = self._fantasize(models, x_t)
+            Y_front.append(mean_best)
+        return batch
+
+    def _candidates(self):
+        """Quasi-random candidates plus perturbations of the current Pareto set."""
+        X = MultiStartAcquisitionOptimizer(n_candidates=self.n_candidates).candidates(self.space, self.rng)
+        if self.space.is_partly_categorical:
+            return X
+        X_obs = self.space.transform(self.Xi)
+        pareto_set = X_obs[non_dominated_mask(np.asarray(self.yi))]
+        local = np.repeat(pareto_set, max(1, self.n_candidates // (4 * len(pareto_set))), axis=0)
+        local = local + self.rng.normal(scale=0.05, size=local.shape)
+        bounds = np.array(self.space.transformed_bounds)
+        return np.vstack([X, np.clip(local, bounds[:, 0], bounds[:, 1])])
+
+    @staticmethod
+    def _predict(models, X):
+        with warnings.catch_warnings():
+            # Fantasy points can drive predicted variances slightly below zero
+            warnings.simplefilter("ignore")
+            results = [model.predict(X, return_std=True) for model in models]
+        return np.column_stack([r[0] for r in results]), np.column_stack([r[1] for r in results])
+
+    @staticmethod
+    def _fantasize(models, x_t):
+        """Condition every objective's GP on its predicted mean at ``x_t``."""
+        mean = [float(model.predict(x_t.reshape(1, -1))[0]) for model in models]
+        try:
+            return [add_observation(model, x_t, m) for model, m in zip(models, mean)], mean
+        except np.linalg.LinAlgError:
+            return models, mean  # x_t is numerically a training point already
@@ -0,0 +1,106 @@
+# gp_fitting.py
+# Faster surrogate refits: GP hyperparameter searches start from the previous
+# fit's hyperparameters and the random restarts run in a process pool.
+import zlib
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy.optimize import fmin_l_bfgs_b
+from sklearn.base import clone
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import Sum
+from skopt.learning.gaussian_process.kernels import WhiteKernel
+
+
+def _lbfgs(obj_func, theta0, bounds):
+    theta, value, _ = fmin_l_bfgs_b(obj_func, theta0, bounds=bounds)
+    return theta, value
+
+
+class ParallelRestarts:
+    """
+    Hyperparameter optimizer for ``GaussianProcessRegressor(optimizer=...)``.
+
+    Runs L-BFGS from the kernel's current theta and from ``n_restarts``
+    log-uniform random starts, spread over ``n_jobs`` worker processes, and
+    keeps the best optimum. The random starts are seeded from
+    ``random_state`` and the initial theta, so they differ between refits
+    but are reproducible.
+    """
+
+    def __init__(self, n_restarts=2, n_jobs=-1, random_state=None):
+        self.n_restarts = n_restarts
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def __call__(self, obj_func, initial_theta, bounds):
+        seed = zlib.crc32(np.asarray(initial_theta, dtype=float).tobytes())
+        if self.random_state is not None:
+            seed ^= int(self.random_state)
+        rng = np.random.RandomState(seed)
+        starts = [initial_theta] + [rng.uniform(bounds[:, 0], bounds[:, 1]) for _ in range(self.n_restarts)]
+        n_jobs = min(effective_n_jobs(self.n_jobs), len(starts))
+        if n_jobs == 1:
+            results = [_lbfgs(obj_func, theta0, bounds) for theta0 in starts]
+        else:
+            results = Parallel(n_jobs=n_jobs)(delayed(_lbfgs)(obj_func, theta0, bounds) for theta0 in starts)
+        return min(results, key=lambda result: result[1])
+
+
+def use_parallel_restarts(estimator, n_jobs=-1):
+    """
+    Make ``estimator`` fit with ``n_jobs`` workers: GPs get a ``ParallelRestarts``
+    hyperparameter optimizer, tree ensembles get ``n_jobs``.
+    """
+    if isinstance(estimator, GaussianProcessRegressor):
+        if not isinstance(estimator.optimizer, ParallelRestarts):
+            estimator.set_params(
+                optimizer=ParallelRestarts(estimator.n_restarts_optimizer, n_jobs, estimator.random_state),
+                n_restarts_optimizer=0,
+            )
+    elif "n_jobs" in estimator.get_params():
+        # RF/ET and skopt's GradientBoostingQuantileRegressor
+        estimator.set_params(n_jobs=n_jobs)
+    return estimator
+
+
+def _has_white_kernel(kernel):
+    return isinstance(kernel, WhiteKernel) or (
+        isinstance(kernel, Sum) and (_has_white_kernel(kernel.k1) or _has_white_kernel(kernel.k2))
+    )
+
+
+def gp_hyperparameters(model):
+    """Kernel theta of a fitted GP, with its noise level put back in place of the zeroed WhiteKernel."""
+    if not isinstance(model, GaussianProcessRegressor):
+        return None
+    with np.errstate(divide="ignore"):
+        theta = model.kernel_.theta.copy()
+    if getattr(model, "noise_", None):
+        theta[-1] = np.log(model.noise_)
+    return theta.tolist()
+
+
+def kernel_with_hyperparameters(estimator, theta):
+    """
+    A copy of the estimator's kernel (with the WhiteKernel skopt adds for
+    ``noise="gaussian"``) set to ``theta``, clipped to the kernel bounds.
+    """
+    kernel = clone(estimator.kernel)
+    if getattr(estimator, "noise", None) == "gaussian" and not _has_white_kernel(kernel):
+        kernel = kernel + WhiteKernel()
+    bounds = kernel.bounds
+    kernel.theta = np.clip(np.asarray(theta, dtype=float), bounds[:, 0], bounds[:, 1])
+    return kernel
+
+
+def warm_start_estimator(estimator, model):
+    """
+    Start the next hyperparameter search of ``estimator`` from the
+    hyperparameters of the fitted ``model``. Does nothing for non-GP models.
+    """
+    theta = gp_hyperparameters(model)
+    if theta is None or not isinstance(estimator, GaussianProcessRegressor):
+        return
+    kernel = kernel_with_hyperparameters(estimator, theta)
+    if len(kernel.theta) == len(theta):
+        estimator.set_params(kernel=kernel)
@@ -0,0 +1,135 @@
+# hypervolume.py
+# Hypervolume indicator of a Pareto front, as a convergence metric for
+# multi-objective campaigns. Like pareto.py, everything minimizes: the
+# hypervolume is the volume dominated by the front and bounded by the
+# reference point.
+import numpy as np
+from core.optimization.pareto import ParetoArchive, non_dominated_mask
+
+EXACT_MAX_OBJECTIVES = 4
+MC_SAMPLES = 200_000
+
+
+def reference_point(Y, margin=0.1):
+    """
+    A reference point slightly worse than every point of ``Y``: the worst
+    value of each objective plus ``margin`` times its range.
+    """
+    Y = np.asarray(Y, dtype=float)
+    worst, best = Y.max(axis=0), Y.min(axis=0)
+    span = np.where(worst > best, worst - best, np.maximum(np.abs(worst), 1.0))
+    return worst + margin * span
+
+
+def _hv_2d(front, ref):
+    # Sweep along the first objective; the front is then descending in the second
+    front = front[np.argsort(front[:, 0])]
+    widths = np.diff(np.append(front[:, 0], ref[0]))
+    return float(np.sum(widths * (ref[1] - np.minimum.accumulate(front[:, 1]))))
+
+
+def _hv_slices(front, ref):
+    # Slice along the last objective and sum (m-1)-dimensional volumes
+    if front.shape[1] == 2:
+        return _hv_2d(front, ref)
+    front = front[np.argsort(front[:, -1])]
+    heights = np.diff(np.append(front[:, -1], ref[-1]))
+    volume = 0.0
+    for i in range(len(front)):
+        if heights[i] > 0:
+            sub = front[: i + 1, :-1]
+            volume += heights[i] * _hv_slices(sub[non_dominated_mask(sub)], ref[:-1])
+    return volume
+
+
+def _hv_monte_carlo(front, ref, n_samples, rng, chunk=20_000):
+    lower = front.min(axis=0)
+    box = float(np.prod(ref - lower))
+    dominated = 0
+    for start in range(0, n_samples, chunk):
+        samples = rng.uniform(lower, ref, size=(min(chunk, n_samples - start), len(ref)))
+        # A sample counts if any front point is <= it in every objective
+        dominated += np.count_nonzero(np.any(np.all(front[None, :, :] <= samples[:, None, :], axis=2), axis=1))
+    return box * dominated / n_samples
+
+
+def hypervolume(Y, ref, n_samples=MC_SAMPLES, random_state=0):
+    """
+    Hypervolume dominated by the points ``Y`` (n_points x n_objectives) up
+    to ``ref``. Exact for up to four objectives (a sweep in 2-D, slicing
+    above); Monte Carlo with ``n_samples`` samples for more. Points that are
+    not better than ``ref`` in every objective contribute nothing.
+    """
+    ref = np.asarray(ref, dtype=float)
+    Y = np.asarray(Y, dtype=float).reshape(-1, len(ref))
+    Y = Y[np.all(Y < ref, axis=1)]
+    if not len(Y):
+        return 0.0
+    if len(ref) == 1:
+        return float(ref[0] - Y.min())
+    front = Y[non_dominated_mask(Y)]
+    if len(ref) <= EXACT_MAX_OBJECTIVES:
+        return _hv_slices(front, ref)
+    return _hv_monte_carlo(front, ref, n_samples, np.random.default_rng(random_state))
+
+
+def hypervolume_contribution(y, front, ref):
+    """
+    Hypervolume gained by adding ``y`` to ``front``: the box between ``y``
+    and ``ref`` minus the part of it the front already dominates.
+    """
+    y, ref = np.asarray(y, dtype=float), np.asarray(ref, dtype=float)
+    if not np.all(y < ref):
+        return 0.0
+    front = np.asarray(front, dtype=float).reshape(-1, len(ref))
+    return float(np.prod(ref - y)) - hypervolume(np.maximum(front, y), ref)
+
+
+class HypervolumeTracker:
+    """
+    Hypervolume of a campaign, updated after every observation.
+
+    Keeps a Pareto archive of the points inside the reference box and adds
+    each new point's exclusive contribution, so an update only touches the
+    current front. With more than four objectives the Monte Carlo estimate
+    is recomputed instead. ``history`` holds the value after each ``add``.
+    """
+
+    def __init__(self, ref_point):
+        self.ref_point = np.asarray(ref_point, dtype=float)
+        self.archive = ParetoArchive(len(self.ref_point))
+        self.value = 0.0
+        self.history = []
+
+    @classmethod
+    def from_initial_design(cls, Y, n_initial, margin=0.1):
+        """
+        Tracker whose reference point comes from the first ``n_initial`` rows
+        of ``Y`` (the initial design), replayed over every row of ``Y``.
+        """
+        Y = np.asarray(Y, dtype=float)
+        tracker = cls(reference_point(Y[:n_initial], margin))
+        for y in Y:
+            tracker.add(y)
+        return tracker
+
+    def add(self, y):
+        """Record one observation and return the updated hypervolume."""
+        y = np.asarray(y, dtype=float)
+        if np.all(y < self.ref_point):
+            if len(self.ref_point) <= EXACT_MAX_OBJECTIVES:
+                gain = hypervolume_contribution(y, self.archive.points, self.ref_point)
+                if self.archive.add(y):
+                    self.value += gain
+            elif self.archive.add(y):
+                self.value = hypervolume(self.archive.points, self.ref_point)
+        self.history.append(self.value)
+        return self.value
+
+
+def hypervolume_history(Y, ref):
+    """Hypervolume after each row of ``Y``, in order."""
+    tracker = HypervolumeTracker(ref)
+    for y in np.asarray(Y, dtype=float):
+        tracker.add(y)
+    return tracker.history
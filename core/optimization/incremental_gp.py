@@ -0,0 +1,65 @@
+import copy
+import numpy as np
+from scipy.linalg import solve_triangular, cho_solve
+
+
+def add_observation(gp, x, y):
+    """
+    Return a copy of a fitted skopt GaussianProcessRegressor conditioned on one
+    more observation, keeping kernel hyperparameters and y normalization fixed.
+
+    The Cholesky factor is extended by one row (O(n²)) instead of being
+    recomputed (O(n³)). ``x`` is a point in the transformed space. Raises
+    ``np.linalg.LinAlgError`` when the extended kernel matrix is not
+    numerically positive definite, e.g. for a repeated point without noise.
+    """
+    x = np.asarray(x, dtype=float).reshape(1, -1)
+    noise = (gp.noise_ or 0.0) + np.atleast_1d(gp.alpha)[0]
+
+    k = gp.kernel_(gp.X_train_, x)[:, 0]
+    c = gp.kernel_.diag(x)[0] + noise
+    L = gp.L_
+    l = solve_triangular(L, k, lower=True)
+    pivot = c - l @ l
+    if not pivot > 1e-12:
+        raise np.linalg.LinAlgError(f"Cholesky update failed, pivot {pivot:.3g}")
+    d = np.sqrt(pivot)
+
+    n = L.shape[0]
+    L_new = np.zeros((n + 1, n + 1))
+    L_new[:n, :n] = L
+    L_new[n, :n] = l
+    L_new[n, n] = d
+
+    y_norm = (y - gp.y_train_mean_) / gp.y_train_std_
+
+    new = copy.copy(gp)
+    new.X_train_ = np.vstack([gp.X_train_, x])
+    new.y_train_ = np.append(gp.y_train_, y_norm)
+    new.L_ = L_new
+    new.alpha_ = cho_solve((L_new, True), new.y_train_)
+    new.K_inv_ = _extend_inverse(gp.K_inv_, k, c)
+    return new
+
+
+def _extend_inverse(K_inv, k, c):
+    """Block-inverse update of K⁻¹ when one row/column is appended."""
+    v = K_inv @ k
+    s = 1.0 / (c - k @ v)
+    n = K_inv.shape[0]
+    out = np.empty((n + 1, n + 1))
+    out[:n, :n] = K_inv + s * np.outer(v, v)
+    out[:n, n] = -s * v
+    out[n, :n] = -s * v
+    out[n, n] = s
+    return out
+
+
+def log_marginal_likelihood_per_point(gp):
+    """
+    Log marginal likelihood of the training data under the current (fixed)
+    hyperparameters, divided by the number of observations.
+    """
+    n = len(gp.y_train_)
+    lml = -0.5 * gp.y_train_ @ gp.alpha_ - np.log(np.diag(gp.L_)).sum() - 0.5 * n * np.log(2 * np.pi)
+    return lml / n
@@ -0,0 +1,62 @@
+# model_retention.py
+# skopt and ProcessOptimizer keep every fitted surrogate in `optimizer.models`.
+# Only the latest one is ever used, so long campaigns can prune the history.
+import os
+import dill as pickle
+
+RETENTION_OPTIONS = ["none", "last:5", "every:10", "all"]
+RETENTION_LABELS = {
+    "none": "Current model only",
+    "last:5": "Last 5 models",
+    "every:10": "Every 10th model",
+    "all": "All models",
+}
+
+
+def parse_retention(policy):
+    """
+    Parse a retention policy string into (kind, k):
+
+    - ``"all"``: keep every model (skopt's default)
+    - ``"none"``: keep only the current model
+    - ``"last:k"``: keep the k most recent models
+    - ``"every:m"``: keep every m-th model plus the current one
+    """
+    kind, _, arg = policy.partition(":")
+    if kind in ("all", "none") and not arg:
+        return kind, None
+    if kind in ("last", "every") and arg.isdigit() and int(arg) >= 1:
+        return kind, int(arg)
+    raise ValueError(f"Invalid model retention policy: {policy!r}")
+
+
+def retain_models(models, policy, n_fits):
+    """
+    Prune ``models`` in place right after the ``n_fits``-th model was appended.
+    The latest model is always kept.
+    """
+    kind, k = parse_retention(policy)
+    if kind == "none":
+        del models[:-1]
+    elif kind == "last":
+        del models[:-k]
+    elif kind == "every" and len(models) >= 2 and (n_fits - 1) % k != 0:
+        del models[-2]
+
+
+def memory_report(optimizer, checkpoint_path=None):
+    """
+    Approximate memory held by an optimizer: the number of stored surrogate
+    models, their pickled size, the size of the whole optimizer and, if
+    given, the size of its saved checkpoint file.
+    """
+    opt = getattr(optimizer, "skopt_optimizer", optimizer)
+    report = {
+        "n_observations": len(opt.Xi),
+        "n_models": len(opt.models),
+        "models_bytes": len(pickle.dumps(opt.models)),
+        "optimizer_bytes": len(pickle.dumps(optimizer)),
+    }
+    if checkpoint_path is not None:
+        report["checkpoint_bytes"] = os.path.getsize(checkpoint_path)
+    return report
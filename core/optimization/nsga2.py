@@ -0,0 +1,140 @@
+# nsga2.py
+# NSGA-II for cheap, simulated multi-objective campaigns.
+#
+# Whole generations are asked for and told at once, so the caller can
+# evaluate a population in one vectorized call. Variables are evolved in the
+# unit cube with simulated binary crossover (SBX) and polynomial mutation;
+# survivors are chosen by Pareto rank, then crowding distance.
+import numpy as np
+from sklearn.utils import check_random_state
+from core.optimization.pareto import non_dominated_sort
+
+
+def crowding_distance(Y):
+    """
+    Crowding distance of every row of ``Y`` within its own set: the sum over
+    objectives of the normalized gap between its neighbours. Boundary points
+    get infinity so they are always kept.
+    """
+    Y = np.asarray(Y, dtype=float)
+    n, m = Y.shape
+    distance = np.zeros(n)
+    if n <= 2:
+        return np.full(n, np.inf)
+    for j in range(m):
+        order = np.argsort(Y[:, j], kind="stable")
+        values = Y[order, j]
+        span = values[-1] - values[0]
+        distance[order[[0, -1]]] = np.inf
+        if span > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+
+def environmental_selection(Y, k):
+    """
+    Indices of the ``k`` best rows of ``Y`` (lowest front first, most
+    isolated first within a front), with the rank and crowding distance of
+    every row.
+    """
+    ranks = non_dominated_sort(Y)
+    crowding = np.zeros(len(Y))
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        crowding[members] = crowding_distance(np.asarray(Y)[members])
+    order = np.lexsort((-crowding, ranks))
+    return order[:k], ranks, crowding
+
+
+class NSGA2Optimizer:
+    """
+    Elitist NSGA-II with a generation-wise ask/tell interface. Minimizes
+    every objective.
+
+    ``ask()`` returns the next ``population_size`` points (the random initial
+    population first, offspring afterwards); ``tell(X, Y)`` merges them with
+    the current population and keeps the best ``population_size``. The
+    initial population plays the role of the initial design
+    (``n_initial_points_``).
+    """
+
+    def __init__(self, dimensions, population_size=40, n_objectives=2, random_state=None,
+                 crossover_prob=0.9, crossover_eta=15.0, mutation_eta=20.0):
+        self.bounds = np.asarray(dimensions, dtype=float)
+        self.population_size = population_size
+        self.n_objectives = n_objectives
+        self.n_initial_points_ = population_size
+        self.random_state = random_state
+        self.rng = check_random_state(random_state)
+        self.crossover_prob = crossover_prob
+        self.crossover_eta = crossover_eta
+        self.mutation_eta = mutation_eta
+        self.population = np.empty((0, len(self.bounds)))
+        self.population_y = np.empty((0, n_objectives))
+        self.ranks = np.empty(0, dtype=int)
+        self.crowding = np.empty(0)
+        self.generation = 0
+        self.Xi = []
+        self.yi = []
+        self.models = []  # No surrogate; the attribute keeps memory_report working
+
+    def ask(self):
+        """The next generation, as a (population_size x n_dimensions) array."""
+        if not len(self.population):
+            U = self.rng.uniform(size=(self.population_size, len(self.bounds)))
+        else:
+            parents = self._normalize(self.population)
+            p1 = parents[self._tournament(self.population_size)]
+            p2 = parents[self._tournament(self.population_size)]
+            U = self._mutate(self._crossover(p1, p2))
+        return self._denormalize(U)
+
+    def tell(self, X, Y):
+        """Record a generation and select the survivors from it and the current population."""
+        X = np.asarray(X, dtype=float).reshape(-1, len(self.bounds))
+        Y = np.asarray(Y, dtype=float).reshape(-1, self.n_objectives)
+        self.Xi.extend(X.tolist())
+        self.yi.extend(Y.tolist())
+        X_all = np.vstack([self.population, X])
+        Y_all = np.vstack([self.population_y, Y])
+        keep, ranks, crowding = environmental_selection(Y_all, self.population_size)
+        self.population, self.population_y = X_all[keep], Y_all[keep]
+        self.ranks, self.crowding = ranks[keep], crowding[keep]
+        self.generation += 1
+
+    def pareto_set(self):
+        """Points and objective values of the first front of the current population."""
+        front = self.ranks == 0
+        return self.population[front], self.population_y[front]
+
+    def _tournament(self, n):
+        """Binary tournament on (rank, crowding distance); returns population indices."""
+        a = self.rng.randint(len(self.population), size=n)
+        b = self.rng.randint(len(self.population), size=n)
+        a_wins = (self.ranks[a] < self.ranks[b]) | ((self.ranks[a] == self.ranks[b]) & (self.crowding[a] >= self.crowding[b]))
+        return np.where(a_wins, a, b)
+
+    def _crossover(self, p1, p2):
+        """Simulated binary crossover; returns one child per parent pair."""
+        eta = self.crossover_eta
+        u = self.rng.uniform(size=p1.shape)
+        beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta + 1)), (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+        # Either child of the pair, chosen at random per variable
+        sign = np.where(self.rng.uniform(size=p1.shape) < 0.5, 1.0, -1.0)
+        child = 0.5 * ((p1 + p2) + sign * beta * (p1 - p2))
+        crossed = self.rng.uniform(size=(len(p1), 1)) < self.crossover_prob
+        return np.clip(np.where(crossed, child, p1), 0.0, 1.0)
+
+    def _mutate(self, U):
+        """Polynomial mutation of each variable with probability 1 / n_dimensions."""
+        eta = self.mutation_eta
+        u = self.rng.uniform(size=U.shape)
+        delta = np.where(u < 0.5, (2 * u) ** (1 / (eta + 1)) - 1, 1 - (2 * (1 - u)) ** (1 / (eta + 1)))
+        mutated = self.rng.uniform(size=U.shape) < 1.0 / U.shape[1]
+        return np.clip(U + mutated * delta, 0.0, 1.0)
+
+    def _normalize(self, X):
+        return (X - self.bounds[:, 0]) / (self.bounds[:, 1] - self.bounds[:, 0])
+
+    def _denormalize(self, U):
+        return self.bounds[:, 0] + U * (self.bounds[:, 1] - self.bounds[:, 0])
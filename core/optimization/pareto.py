@@ -0,0 +1,104 @@
+# pareto.py
+# Pareto fronts for any number of objectives. Every function here minimizes,
+# like the optimizers: pass -values for "higher is better" results.
+import numpy as np
+
+
+def dominates(a, b):
+    """True if ``a`` is no worse than ``b`` in every objective and better in one."""
+    a, b = np.asarray(a), np.asarray(b)
+    return bool(np.all(a <= b) and np.any(a < b))
+
+
+def non_dominated_mask(Y):
+    """
+    Boolean mask of the non-dominated rows of ``Y`` (n_points x n_objectives).
+    Duplicated points are all kept. Costs O(n · front size) vectorized row
+    comparisons instead of the O(n²) pairwise loop.
+    """
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim != 2:
+        raise ValueError(f"Expected a 2-D array of objective values, got shape {Y.shape}")
+    remaining = np.arange(len(Y))
+    i = 0
+    while i < len(remaining):
+        y = Y[remaining[i]]
+        candidates = Y[remaining]
+        # Keep points not dominated by y (y itself and its duplicates included)
+        keep = np.any(candidates < y, axis=1) | np.all(candidates == y, axis=1)
+        remaining = remaining[keep]
+        i = np.count_nonzero(keep[:i]) + 1
+    mask = np.zeros(len(Y), dtype=bool)
+    mask[remaining] = True
+    return mask
+
+
+def pareto_front(Y):
+    """Indices of the non-dominated rows of ``Y``."""
+    return np.flatnonzero(non_dominated_mask(Y))
+
+
+def non_dominated_sort(Y):
+    """
+    Front rank of every row of ``Y``: 0 for the Pareto front, 1 for the front
+    left after removing it, and so on.
+    """
+    Y = np.asarray(Y, dtype=float)
+    ranks = np.full(len(Y), -1)
+    remaining = np.arange(len(Y))
+    rank = 0
+    while len(remaining):
+        mask = non_dominated_mask(Y[remaining])
+        ranks[remaining[mask]] = rank
+        remaining = remaining[~mask]
+        rank += 1
+    return ranks
+
+
+class ParetoArchive:
+    """
+    Incrementally maintained Pareto front.
+
+    ``add`` compares the new point with the current front only, so each
+    update costs O(front size) instead of re-sorting the whole history.
+    ``indices`` holds the labels (e.g. experiment numbers) of the front.
+    """
+
+    def __init__(self, n_objectives):
+        self.n_objectives = n_objectives
+        self.points = np.empty((0, n_objectives))
+        self.indices = []
+        self.n_seen = 0
+
+    @classmethod
+    def from_points(cls, Y, indices=None):
+        """Build an archive from a whole history (n_points x n_objectives) at once."""
+        Y = np.asarray(Y, dtype=float)
+        mask = non_dominated_mask(Y)
+        archive = cls(Y.shape[1])
+        labels = list(range(len(Y))) if indices is None else list(indices)
+        archive.points = Y[mask]
+        archive.indices = [label for label, keep in zip(labels, mask) if keep]
+        archive.n_seen = len(Y)
+        return archive
+
+    def add(self, y, index=None):
+        """
+        Offer one point to the archive. Returns True if it joined the front;
+        front members it dominates are dropped.
+        """
+        y = np.asarray(y, dtype=float).reshape(self.n_objectives)
+        index = self.n_seen if index is None else index
+        self.n_seen += 1
+        if len(self.points):
+            if np.any(np.all(self.points <= y, axis=1) & np.any(self.points < y, axis=1)):
+                return False
+            keep = ~(np.all(y <= self.points, axis=1) & np.any(y < self.points, axis=1))
+            self.points = self.points[keep]
+            self.indices = [label for label, k in zip(self.indices, keep) if k]
+        self.points = np.vstack([self.points, y])
+        self.indices.append(index)
+        return True
+
+    def __len__(self):
+        return len(self.indices)
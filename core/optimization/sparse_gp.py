@@ -0,0 +1,126 @@
+# sparse_gp.py
+# Sparse Gaussian process surrogate for long simulation campaigns.
+#
+# The exact GP costs O(n^3) per fit. This regressor picks m inducing points
+# from the data, learns the kernel hyperparameters on those m points only and
+# conditions on all n observations through the inducing points (the DTC /
+# projected-process approximation). Fit costs O(n·m²) plus an O(m³)
+# hyperparameter search, and prediction costs O(m²) per point.
+import warnings
+import numpy as np
+from scipy.linalg import cho_solve, cholesky, solve_triangular
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from skopt.learning import GaussianProcessRegressor
+from skopt.utils import cook_estimator
+
+_JITTER = 1e-8
+_MIN_NOISE = 1e-6
+
+
+def farthest_point_subset(X, y, m):
+    """
+    Indices of ``m`` rows of ``X`` that cover the data: start at the best
+    observation and repeatedly add the point farthest from those chosen.
+    """
+    n = len(X)
+    if n <= m:
+        return np.arange(n)
+    chosen = [int(np.argmin(y))]
+    dist = np.sum((X - X[chosen[0]]) ** 2, axis=1)
+    for _ in range(m - 1):
+        i = int(np.argmax(dist))
+        chosen.append(i)
+        dist = np.minimum(dist, np.sum((X - X[i]) ** 2, axis=1))
+    return np.array(chosen)
+
+
+class SparseGaussianProcessRegressor(RegressorMixin, BaseEstimator):
+    """
+    Inducing-point GP with the skopt regressor interface: ``predict`` accepts
+    ``return_std``, ``return_mean_grad`` and ``return_std_grad``, so it works
+    with skopt's acquisition functions and L-BFGS search.
+
+    With ``n <= n_inducing`` observations the result equals the exact GP.
+    Like skopt's GP, the predicted std excludes the observation noise.
+    """
+
+    def __init__(self, kernel=None, n_inducing=100, normalize_y=True, n_restarts_optimizer=2, random_state=None):
+        self.kernel = kernel
+        self.n_inducing = n_inducing
+        self.normalize_y = normalize_y
+        self.n_restarts_optimizer = n_restarts_optimizer
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float).ravel()
+        if self.normalize_y:
+            self.y_train_mean_ = np.mean(y)
+            self.y_train_std_ = np.std(y) or 1.0
+        else:
+            self.y_train_mean_, self.y_train_std_ = 0.0, 1.0
+        y_n = (y - self.y_train_mean_) / self.y_train_std_
+
+        # Hyperparameters from an exact GP on the inducing subset only
+        idx = farthest_point_subset(X, y_n, self.n_inducing)
+        gp = GaussianProcessRegressor(
+            kernel=clone(self.kernel),
+            normalize_y=False,
+            noise="gaussian",
+            n_restarts_optimizer=self.n_restarts_optimizer,
+            random_state=self.random_state,
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            gp.fit(X[idx], y_n[idx])
+        self.kernel_ = gp.kernel_
+        self.noise_ = max(float(gp.noise_), _MIN_NOISE)
+        self.Z_ = X[idx]
+
+        # DTC posterior: Sigma = (Kmm + Kmn Knm / noise)^-1
+        m = len(idx)
+        Kmm = self.kernel_(self.Z_) + _JITTER * np.eye(m)
+        Lm = cholesky(Kmm, lower=True)
+        A = solve_triangular(Lm, self.kernel_(self.Z_, X), lower=True) / np.sqrt(self.noise_)
+        LB = cholesky(np.eye(m) + A @ A.T, lower=True)
+        c = solve_triangular(LB, A @ y_n, lower=True) / np.sqrt(self.noise_)
+
+        Lm_inv = solve_triangular(Lm, np.eye(m), lower=True)
+        self.alpha_ = Lm_inv.T @ solve_triangular(LB.T, c, lower=False)
+        # var(x) = k(x, x) - k_m(x)^T M k_m(x) with M = Kmm^-1 - Sigma
+        B_inv = cho_solve((LB, True), np.eye(m))
+        self.M_ = Lm_inv.T @ (np.eye(m) - B_inv) @ Lm_inv
+        self.X_train_ = X
+        self.y_train_ = y
+        return self
+
+    def predict(self, X, return_std=False, return_cov=False, return_mean_grad=False, return_std_grad=False):
+        if return_cov:
+            raise ValueError("SparseGaussianProcessRegressor does not return the covariance")
+        if (return_mean_grad or return_std_grad) and np.shape(X)[0] != 1:
+            raise ValueError("Gradients are only available for a single point")
+        X = np.asarray(X, dtype=float)
+        K_trans = self.kernel_(X, self.Z_)
+        y_mean = K_trans @ self.alpha_ * self.y_train_std_ + self.y_train_mean_
+        if not (return_std or return_mean_grad or return_std_grad):
+            return y_mean
+
+        KM = K_trans @ self.M_
+        y_var = np.clip(self.kernel_.diag(X) - np.sum(KM * K_trans, axis=1), 0.0, None)
+        y_std = np.sqrt(y_var) * self.y_train_std_
+        result = [y_mean, y_std] if return_std else [y_mean]
+
+        if return_mean_grad:
+            grad = self.kernel_.gradient_x(X[0], self.Z_)
+            result.append(grad.T @ self.alpha_ * self.y_train_std_)
+            if return_std_grad:
+                std = max(y_std[0], 1e-12)
+                var_grad = -2.0 * grad.T @ KM[0] * self.y_train_std_ ** 2
+                result.append(var_grad / (2.0 * std))
+        return tuple(result)
+
+
+def sparse_gp_for_space(space, n_inducing=100, random_state=None):
+    """A sparse GP with the same kernel skopt builds for ``base_estimator="GP"``."""
+    gp = cook_estimator("GP", space=space)
+    return SparseGaussianProcessRegressor(kernel=gp.kernel, n_inducing=n_inducing, random_state=random_state)
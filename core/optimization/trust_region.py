@@ -0,0 +1,104 @@
+# trust_region.py
+# TuRBO-style trust regions for StepBayesianOptimizer (Eriksson et al., 2019).
+#
+# In trust-region mode the surrogate is a local GP fitted only on the
+# observations inside a box around the best point of the current region,
+# and the acquisition is optimized inside that box. The box doubles after
+# ``success_tolerance`` improvements in a row and halves after
+# ``failure_tolerance`` failures in a row. Once it is smaller than
+# ``length_min`` the region restarts at full size in the least explored part
+# of the space. Side lengths are in the unit cube, stretched per dimension by
+# the local GP's length scales.
+import numpy as np
+
+
+def ard_length_scales(model, n_dims):
+    """Per-dimension length scales of a fitted GP; ones for isotropic kernels and other models."""
+    kernel = getattr(model, "kernel_", None)
+    if kernel is not None:
+        for key, value in kernel.get_params().items():
+            if key.endswith("length_scale") and np.ndim(value) == 1 and len(value) == n_dims:
+                return np.asarray(value, dtype=float)
+    return np.ones(n_dims)
+
+
+class TrustRegion:
+    """
+    Size and success/failure counters of one trust region.
+
+    ``start`` is the index of the first observation made in the current
+    region; ``lower``/``upper`` (unit cube) and ``local`` (observation
+    indices the local GP was fitted on) describe the last fit.
+    """
+
+    def __init__(self, n_dims, length_init=0.8, length_min=0.5 ** 7, length_max=1.6,
+                 success_tolerance=3, failure_tolerance=None, min_points=None):
+        self.n_dims = n_dims
+        self.length_init = length_init
+        self.length_min = length_min
+        self.length_max = length_max
+        self.success_tolerance = success_tolerance
+        self.failure_tolerance = failure_tolerance or max(4, n_dims)
+        self.min_points = min_points or 4 * n_dims
+        self.length = length_init
+        self.successes = 0
+        self.failures = 0
+        self.n_restarts = 0
+        self.start = 0
+        self.lower = None
+        self.upper = None
+        self.local = []
+
+    def box(self, center, length_scales=None):
+        """Lower and upper corners of the region around ``center``, clipped to the unit cube."""
+        # Length scales at the kernel bounds (irrelevant dimensions) would stretch the box over the whole range
+        weights = np.ones(self.n_dims) if length_scales is None else np.clip(length_scales, 0.005, 2.0)
+        # Same volume as a cube of side ``length``, longer along slowly varying dimensions
+        weights = weights / np.prod(weights) ** (1.0 / self.n_dims)
+        half = self.length * weights / 2
+        return np.clip(center - half, 0.0, 1.0), np.clip(center + half, 0.0, 1.0)
+
+    def update(self, y, y_best, n_observations):
+        """
+        Count the result ``y`` (minimized) against the region's best
+        ``y_best`` and resize. Returns True when the region restarted; the
+        next of the ``n_observations`` then starts the new region.
+        """
+        if y < y_best - 1e-3 * abs(y_best):
+            self.successes += 1
+            self.failures = 0
+        else:
+            self.failures += 1
+            self.successes = 0
+
+        if self.successes >= self.success_tolerance:
+            self.length = min(2.0 * self.length, self.length_max)
+            self.successes = 0
+        elif self.failures >= self.failure_tolerance:
+            self.length /= 2.0
+            self.failures = 0
+
+        if self.length < self.length_min:
+            self.length = self.length_init
+            self.successes = self.failures = 0
+            self.n_restarts += 1
+            self.start = n_observations
+            return True
+        return False
+
+    def to_dict(self):
+        state = dict(vars(self))
+        for key in ("lower", "upper"):
+            if state[key] is not None:
+                state[key] = np.asarray(state[key]).tolist()
+        state["local"] = [int(i) for i in state["local"]]
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        region = cls(state["n_dims"])
+        vars(region).update(state)
+        for key in ("lower", "upper"):
+            if state[key] is not None:
+                setattr(region, key, np.asarray(state[key], dtype=float))
+        return region
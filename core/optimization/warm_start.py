@@ -0,0 +1,100 @@
+# warm_start.py
+# Seed a new campaign with the results of earlier campaigns stored in experiments.db
+import pandas as pd
+from core.utils import db_handler
+
+
+def _in_bounds(value, var):
+    """Check one value against a stored variable tuple (continuous or categorical)."""
+    name, val1, val2, *rest = var
+    if rest[1:] and rest[1] == "categorical":
+        return value in val1
+    try:
+        return val1 <= float(value) <= val2
+    except (TypeError, ValueError):
+        return False
+
+
+def compatible_experiments(user_email, variables, responses):
+    """
+    List the user's saved experiments whose results contain every variable
+    name and every response column needed by the new campaign.
+    """
+    names = [name for name, *_ in variables]
+    compatible = []
+    for exp_id, exp_name, timestamp in db_handler.list_experiments(user_email):
+        exp = db_handler.load_experiment(exp_id)
+        if exp is None:
+            continue
+        columns = set(exp["df_results"].columns)
+        if all(col in columns for col in names + list(responses)):
+            compatible.append((exp_id, exp_name, timestamp))
+    return compatible
+
+
+def load_warm_start_data(exp_ids, variables, responses, directions=None):
+    """
+    Collect (X, Y) from stored experiments, mapped onto the new variable order.
+
+    Rows with missing values or with any variable outside the new bounds are
+    dropped. ``Y`` holds one value per row for a single response, or a list
+    per row when several responses are given. Values are returned in the
+    "higher is better" sign of the new campaign's ``directions`` (maximize
+    when missing): stored results were negated with the directions saved in
+    the source experiment's settings, so a response whose direction differs
+    is flipped back. Experiments saved without directions are taken as is.
+    """
+    names = [name for name, *_ in variables]
+    responses = list(responses)
+    directions = directions or {}
+    frames = []
+    for exp_id in exp_ids:
+        exp = db_handler.load_experiment(exp_id)
+        if exp is None:
+            continue
+        frame = exp["df_results"][names + responses].copy()
+        source = (exp.get("settings") or {}).get("directions")
+        if source is not None:
+            for col in responses:
+                if source.get(col, "maximize") != directions.get(col, "maximize"):
+                    frame[col] = -pd.to_numeric(frame[col], errors="coerce")
+        frames.append(frame)
+    if not frames:
+        return [], []
+
+    df = pd.concat(frames, ignore_index=True).dropna()
+    for col in responses:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna()
+
+    mask = df.apply(lambda row: all(_in_bounds(row[var[0]], var) for var in variables), axis=1)
+    df = df[mask] if len(df) else df
+
+    X = df[names].values.tolist()
+    if len(responses) == 1:
+        Y = df[responses[0]].astype(float).tolist()
+    else:
+        Y = df[responses].astype(float).values.tolist()
+    return X, Y
+
+
+def warm_start(optimizer, X, Y):
+    """
+    Load prior results into an optimizer with a single bulk tell, negating
+    them because every optimizer in VOL minimizes.
+
+    Works with StepBayesianOptimizer and ProcessOptimizer's Optimizer.
+    Returns the number of points loaded.
+    """
+    if not X:
+        return 0
+    if isinstance(Y[0], list):
+        Y_min = [[-v for v in y] for y in Y]
+    else:
+        Y_min = [-y for y in Y]
+
+    if hasattr(optimizer, "observe_many"):
+        optimizer.observe_many(X, Y_min)
+    else:
+        optimizer.tell(X, Y_min)
+    return len(X)
@@ -0,0 +1,119 @@
+# response_surfaces.py
+# Synthetic reactor responses for simulation mode and the classroom.
+#
+# Every surface maps the reactor variables (temperature in °C, residence
+# time in min, pressure in bar, organic/aqueous ratio) to a response between
+# 0 and 1, e.g. a yield fraction, and accepts NumPy arrays of any broadcast
+# shape, so thousands of conditions are evaluated in one call. Variables a
+# campaign does not optimize stay at their DEFAULTS. Measurements add noise
+# from a NoiseModel on top.
+import numpy as np
+
+VARIABLES = ["temperature", "residence_time", "pressure", "ratio_org_aq"]
+DEFAULTS = {"temperature": 20.0, "residence_time": 20.0, "pressure": 2.0, "ratio_org_aq": 1.0}
+BOUNDS = {"temperature": (0.0, 60.0), "residence_time": (5.0, 60.0), "pressure": (1.0, 10.0), "ratio_org_aq": (0.5, 3.0)}
+R_GAS = 8.314e-3  # kJ/(mol K)
+
+SURFACES = {}
+
+
+class ResponseSurface:
+    """A registered response function with its description and variable bounds."""
+
+    def __init__(self, name, func, description, bounds=None):
+        self.name = name
+        self.func = func
+        self.description = description
+        self.bounds = {**BOUNDS, **(bounds or {})}
+
+    def __call__(self, temperature=None, residence_time=None, pressure=None, ratio_org_aq=None):
+        """Noise-free response; unspecified variables take their default value."""
+        given = {"temperature": temperature, "residence_time": residence_time, "pressure": pressure, "ratio_org_aq": ratio_org_aq}
+        values = [np.asarray(DEFAULTS[k] if v is None else v, dtype=float) for k, v in given.items()]
+        return self.func(*np.broadcast_arrays(*values))
+
+    def evaluate(self, params):
+        """Response for a dict (or DataFrame) of variables; other keys are ignored."""
+        return self(**{k: params[k] for k in VARIABLES if k in params})
+
+
+def register_surface(name, description, bounds=None):
+    """Decorator adding ``func(temperature, residence_time, pressure, ratio_org_aq)`` to SURFACES."""
+    def decorator(func):
+        SURFACES[name] = ResponseSurface(name, func, description, bounds)
+        return func
+    return decorator
+
+
+def get_surface(name):
+    if name not in SURFACES:
+        raise ValueError(f"Unknown response surface {name!r}; expected one of {list(SURFACES)}")
+    return SURFACES[name]
+
+
+class NoiseModel:
+    """
+    Measurement noise: a standard deviation of ``std`` plus ``relative`` times
+    the response (heteroscedastic), and a drift that scales the response by
+    ``1 - drift_per_hour * elapsed hours`` (e.g. catalyst ageing or probe
+    fouling). Noisy responses are clipped to [0, 1].
+    """
+
+    def __init__(self, std=0.05, relative=0.0, drift_per_hour=0.0):
+        self.std = std
+        self.relative = relative
+        self.drift_per_hour = drift_per_hour
+
+    def sample(self, response, rng=None, elapsed_hours=0.0):
+        rng = np.random if rng is None else rng
+        response = np.asarray(response, dtype=float) * max(0.0, 1.0 - self.drift_per_hour * elapsed_hours)
+        scale = self.std + self.relative * np.abs(response)
+        noise = rng.normal(0.0, 1.0, size=response.shape) * scale if np.any(scale) else 0.0
+        return np.clip(response + noise, 0.0, 1.0)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _arrhenius(k_ref, ea, temperature, t_ref=20.0):
+    """Rate constant at ``temperature`` (°C) from its value at ``t_ref`` and the activation energy (kJ/mol)."""
+    return k_ref * np.exp(-ea / R_GAS * (1.0 / (temperature + 273.15) - 1.0 / (t_ref + 273.15)))
+
+
+def _extracted_fraction(ratio_org_aq, partition=3.0):
+    """Fraction of product extracted into the organic phase."""
+    return partition * ratio_org_aq / (1.0 + partition * ratio_org_aq)
+
+
+@register_surface("linear", "Original VOL response: falls linearly with residence time and ratio; ignores temperature and pressure.")
+def linear(temperature, residence_time, pressure, ratio_org_aq):
+    return 1.0 - 0.015 * residence_time + 0.3 * (1.5 - ratio_org_aq)
+
+
+@register_surface("consecutive_kinetics", "A → B → C in series with Arrhenius rates: B peaks at an intermediate temperature and residence time; pressure keeps gas dissolved and the ratio controls extraction.")
+def consecutive_kinetics(temperature, residence_time, pressure, ratio_org_aq):
+    k1 = _arrhenius(0.1, 50.0, temperature)
+    k2 = _arrhenius(0.01, 90.0, temperature)
+    # Formation and decay of the intermediate; the k1 == k2 limit is k t e^(-k t)
+    same = np.isclose(k1, k2)
+    dk = np.where(same, 1.0, k2 - k1)
+    y_b = np.where(
+        same,
+        k1 * residence_time * np.exp(-k1 * residence_time),
+        k1 / dk * (np.exp(-k1 * residence_time) - np.exp(-k2 * residence_time)),
+    )
+    dissolved = pressure / (pressure + 0.5)
+    return y_b * dissolved * _extracted_fraction(ratio_org_aq)
+
+
+@register_surface("classroom", "Smooth single peak at 70 °C and 30 min, as in the BO classroom.",
+                  bounds={"temperature": (30.0, 110.0), "residence_time": (10.0, 60.0)})
+def classroom(temperature, residence_time, pressure, ratio_org_aq):
+    return np.exp(-((temperature - 70.0) ** 2) / 100.0) * np.exp(-((residence_time - 30.0) ** 2) / 200.0)
+
+
+@register_surface("multimodal", "A broad local optimum at low temperature and a narrow global one at high temperature and short residence time.")
+def multimodal(temperature, residence_time, pressure, ratio_org_aq):
+    broad = 0.6 * np.exp(-((temperature - 15.0) ** 2) / 200.0 - ((residence_time - 40.0) ** 2) / 300.0)
+    narrow = 0.95 * np.exp(-((temperature - 45.0) ** 2) / 20.0 - ((residence_time - 10.0) ** 2) / 15.0)
+    return (broad + narrow) * (1.0 - 0.1 * (ratio_org_aq - 1.0) ** 2) * (0.9 + 0.1 * pressure / (pressure + 1.0))
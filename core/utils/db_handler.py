@@ -2,6 +2,7 @@
 import sqlite3
 import json
 import pandas as pd
+from io import StringIO
 from datetime import datetime
 
 DB_NAME = "experiments.db"
@@ -89,7 +90,7 @@ def load_experiment(exp_id):
             "timestamp": timestamp,
             "notes": notes,
             "variables": json.loads(var_json),
-            "df_results": pd.read_json(res_json, orient="records"),
+            "df_results": pd.read_json(StringIO(res_json), orient="records"),
             "best_result": best_result,
             "settings": json.loads(settings_json) if settings_json else None
         }
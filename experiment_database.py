@@ -1,8 +1,10 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import altair as alt
 from core.utils import db_handler
 from core.utils.generate_report import generate_report
+from core.optimization.hypervolume import hypervolume_history, reference_point
 import plotly.express as px
 from sklearn.preprocessing import LabelEncoder
 
@@ -112,6 +114,45 @@ else:
                 else:
                     st.altair_chart(base_chart, use_container_width=True)
 
+        # --- Hypervolume history and comparison with other campaigns ---
+        if settings and settings.get("hypervolume_history"):
+            st.markdown("### 📈 Hypervolume")
+            objectives = settings["objectives"]
+            same_objectives = [
+                exp for exp in experiments
+                if exp[0] != selected_id[0] and (db_handler.load_experiment(exp[0])["settings"] or {}).get("objectives") == objectives
+            ]
+            compare_with = st.multiselect(
+                "Compare with campaigns on the same objectives",
+                same_objectives,
+                format_func=lambda x: f"{x[1]} ({x[2]})",
+                help="Hypervolumes are recomputed with one reference point shared by all selected campaigns."
+            )
+            if compare_with:
+                # Stored results are "higher is better"; the hypervolume minimizes
+                campaigns = {exp_data["name"]: -exp_data["df_results"][objectives].astype(float).values}
+                for exp in compare_with:
+                    other = db_handler.load_experiment(exp[0])
+                    campaigns[f"{other['name']} ({exp[2]})"] = -other["df_results"][objectives].astype(float).values
+                ref = reference_point(np.vstack(list(campaigns.values())))
+                hv_rows = [
+                    {"Campaign": name, "Experiment #": i + 1, "Hypervolume": hv}
+                    for name, Y in campaigns.items()
+                    for i, hv in enumerate(hypervolume_history(Y, ref))
+                ]
+            else:
+                hv_rows = [
+                    {"Campaign": exp_data["name"], "Experiment #": i + 1, "Hypervolume": hv}
+                    for i, hv in enumerate(settings["hypervolume_history"])
+                ]
+            hv_chart = alt.Chart(pd.DataFrame(hv_rows)).mark_line(point=True).encode(
+                x=alt.X("Experiment #:Q"),
+                y=alt.Y("Hypervolume:Q"),
+                color="Campaign:N",
+                tooltip=["Campaign", "Experiment #", "Hypervolume"]
+            )
+            st.altair_chart(hv_chart, use_container_width=True)
+
         # Generate and show charts
         if "Response" in df_results.columns:
             response_name = "Response"
@@ -62,6 +62,7 @@ PAGES = {
     "📚 Experiment DataBase": "experiment_database.py",
     "🔍 Preview Saved Run": "preview_run.py",
     "🎓 Bayesian Optimization Classroom": "BO_classroom.py",
+    "🏁 Strategy Comparison": "Strategy_Comparison.py",
     "❓ FAQ – Help & Guidance": "faq.py"
 }
 
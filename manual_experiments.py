@@ -3,13 +3,14 @@ import pandas as pd
 import altair as alt
 from datetime import datetime
 from core.optimization.bayesian_optimization import StepBayesianOptimizer
+from core.optimization.acquisition_optimizer import MultiStartAcquisitionOptimizer
 import plotly.express as px
 from skopt.space import Real, Categorical
 from sklearn.preprocessing import LabelEncoder
 from core.utils import db_handler
 import os
 import json
-import dill as pickle  
+from core.optimization.checkpoint import load_optimizer, save_optimizer
 
 SAVE_DIR = "resumable_manual_runs"
 os.makedirs(SAVE_DIR, exist_ok=True)
@@ -22,8 +23,7 @@ resume_file = st.sidebar.selectbox(
 )
 if resume_file != "None" and st.sidebar.button("Load Previous Manual Campaign"):
     run_path = os.path.join(SAVE_DIR, resume_file)
-    with open(os.path.join(run_path, "optimizer.pkl"), "rb") as f:
-        st.session_state.manual_optimizer = pickle.load(f)
+    st.session_state.manual_optimizer = load_optimizer(run_path)
     df = pd.read_csv(os.path.join(run_path, "manual_data.csv"))
     with open(os.path.join(run_path, "metadata.json"), "r") as f:
         metadata = json.load(f)
@@ -42,12 +42,11 @@ if resume_file != "None" and st.sidebar.button("Load Previous Manual Campaign"):
     # Use the restored response variable
     response = st.session_state.response
 
-    # Re-observe all previous data points in the optimizer
+    # Observe the saved points the restored optimizer does not already hold, fitting once
     if st.session_state.manual_optimizer is not None:
-        for row in st.session_state.manual_data:
-            x = [row[name] for name, *_ in st.session_state.manual_variables]
-            y_val = row[response]
-            st.session_state.manual_optimizer.observe(x, -y_val)
+        X = [[row[name] for name, *_ in st.session_state.manual_variables] for row in st.session_state.manual_data]
+        Y = [-row[response] for row in st.session_state.manual_data]
+        st.session_state.manual_optimizer.observe_many(X, Y, skip_recorded=True)
 
     st.success(f"Loaded campaign: {resume_file}")
 
@@ -189,8 +188,7 @@ os.makedirs(run_path, exist_ok=True)
 # Add a "Save Campaign" button in the sidebar
 if st.sidebar.button("💾 Save Campaign"):
     # Save optimizer
-    with open(os.path.join(run_path, "optimizer.pkl"), "wb") as f:
-        pickle.dump(st.session_state.manual_optimizer, f)
+    save_optimizer(st.session_state.manual_optimizer, run_path)
     # Save data
     df = pd.DataFrame(st.session_state.manual_data)
     df.to_csv(os.path.join(run_path, "manual_data.csv"), index=False)
@@ -271,14 +269,14 @@ if st.button("🚀 Suggest Initial Experiments"):
             else:
                 opt_vars.append(Categorical(val1, name=name))
 
-        optimizer = StepBayesianOptimizer(opt_vars)
+        optimizer = StepBayesianOptimizer(opt_vars, acq_optimizer=MultiStartAcquisitionOptimizer(time_budget=0.2), n_jobs=-1)
         st.session_state.manual_optimizer = optimizer
         st.session_state.manual_data = []
         st.session_state.manual_initialized = True
         st.session_state.iteration = 0
         st.session_state.initial_results_submitted = False
         st.session_state.next_suggestion_cached = None
-        st.session_state.suggestions = [optimizer.suggest() for _ in range(n_init)]
+        st.session_state.suggestions = optimizer.suggest(n_init)
         st.success("Initial experiments suggested successfully!")
     st.session_state.manual_optimizer = optimizer
     st.success("Optimizer initialized with mixed variable types!")
@@ -307,6 +305,7 @@ if st.session_state.manual_initialized and st.session_state.suggestions and not
 # --- Process initial results AFTER submission ---
 if st.session_state.submitted_initial:
     valid_rows = 0
+    X_init, Y_init = [], []
     for _, row in st.session_state.edited_initial_df.iterrows():
         value = row.get(f"{response}")
         if value is None or str(value).strip() == "":
@@ -315,7 +314,8 @@ if st.session_state.submitted_initial:
         try:
             y_val = float(value)
             x = [row[name] for name, *_ in st.session_state.manual_variables]
-            st.session_state.manual_optimizer.observe(x, -y_val)
+            X_init.append(x)
+            Y_init.append(-y_val)
             row_data = row.to_dict()
             row_data[response] = y_val
             row_data["Timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -325,6 +325,8 @@ if st.session_state.submitted_initial:
             st.error(f"Invalid number format: {value}")
             st.stop()
 
+    st.session_state.manual_optimizer.observe_many(X_init, Y_init)
+
     if valid_rows < len(st.session_state.edited_initial_df):
         st.warning(f"Only {valid_rows} of {len(st.session_state.edited_initial_df)} experiments had valid results. Please complete all entries.")
         st.stop()
@@ -380,11 +382,10 @@ if st.session_state.recalc_needed:
                 opt_vars.append(Real(val1, val2, name=name))
             else:
                 opt_vars.append(Categorical(val1, name=name))
-        optimizer = StepBayesianOptimizer(opt_vars)
-        for row in st.session_state.manual_data:
-            x = [row[name] for name, *_ in st.session_state.manual_variables]
-            y_val = row[st.session_state.response]
-            optimizer.observe(x, -y_val)
+        optimizer = StepBayesianOptimizer(opt_vars, acq_optimizer=MultiStartAcquisitionOptimizer(time_budget=0.2), n_jobs=-1)
+        X = [[row[name] for name, *_ in st.session_state.manual_variables] for row in st.session_state.manual_data]
+        Y = [-row[st.session_state.response] for row in st.session_state.manual_data]
+        optimizer.observe_many(X, Y)
         st.session_state.manual_optimizer = optimizer
         st.session_state.iteration = len(st.session_state.manual_data)
     st.session_state.recalc_needed = False
@@ -445,6 +446,7 @@ if st.session_state.iteration >= total_iters:
             "initial_experiments": n_init,
             "total_iterations": total_iters,
             "objective": response,
+            "directions": {response: "maximize"},
             "method": "Manual Bayesian Optimization"
         }
 
@@ -0,0 +1,53 @@
+import time
+import numpy as np
+import pytest
+from skopt.space import Real
+from core.optimization.bayesian_optimization import StepBayesianOptimizer
+
+DIMENSIONS = [Real(0.0, 1.0, name="x0"), Real(0.0, 1.0, name="x1")]
+
+
+def objective(x):
+    return (x[0] - 0.3) ** 2 + (x[1] - 0.6) ** 2
+
+
+def fitted_optimizer(n=6, **kwargs):
+    optimizer = StepBayesianOptimizer(DIMENSIONS, n_initial_points=n, random_state=0, n_jobs=1, **kwargs)
+    X = np.random.RandomState(0).uniform(size=(n, 2)).tolist()
+    optimizer.observe_many(X, [objective(x) for x in X])
+    return optimizer
+
+
+@pytest.mark.parametrize("observe", [
+    lambda optimizer, x: optimizer.observe(x, objective(x), fit=False),
+    lambda optimizer, x: optimizer.observe_many([x], [objective(x)]),
+])
+def test_running_prefetch_is_joined_before_observing(observe, monkeypatch):
+    optimizer = fitted_optimizer()
+    run_prefetch = optimizer._run_prefetch
+
+    def slow_prefetch(*args):
+        time.sleep(0.3)
+        run_prefetch(*args)
+
+    monkeypatch.setattr(optimizer, "_run_prefetch", slow_prefetch)
+    optimizer.prefetch(optimizer.suggest())
+    job = optimizer._prefetch
+    assert job is not None and job["thread"].is_alive()
+    observe(optimizer, [0.5, 0.5])
+    assert not job["thread"].is_alive()
+    assert optimizer._prefetch is None
+
+
+def test_observe_many_updates_the_trust_region_per_result():
+    X = np.random.RandomState(1).uniform(size=(12, 2)).tolist()
+    Y = [objective(x) for x in X]
+    one_by_one, batched = fitted_optimizer(trust_region=True), fitted_optimizer(trust_region=True)
+    for x, y in zip(X, Y):
+        one_by_one.observe(x, y, fit=False)
+    batched.observe_many(X, Y)
+    expected, actual = one_by_one.trust_region, batched.trust_region
+    assert expected.successes or expected.failures or expected.n_restarts
+    assert (actual.successes, actual.failures, actual.length, actual.n_restarts, actual.start) == \
+        (expected.successes, expected.failures, expected.length, expected.n_restarts, expected.start)
+    assert batched.y_iters == one_by_one.y_iters
@@ -0,0 +1,46 @@
+import contextlib
+import io
+from core.campaign.engine import NSGA2Campaign, SingleObjectiveCampaign, multi_objective_optimizer, single_objective_optimizer
+from core.campaign.sinks import ProgressSink
+from core.hardware.clock import VirtualClock
+from core.hardware.experimental_run import ExperimentRunner
+from core.optimization.trust_region import TrustRegion
+
+VARIABLES = [("temperature", 20.0, 40.0), ("residence_time", 10.0, 20.0), ("pressure", 2.0, 4.0)]
+
+
+class RecordingSink(ProgressSink):
+    def __init__(self):
+        self.restarts = []
+        self.generations = []
+
+    def on_trust_region_restart(self, engine, region):
+        self.restarts.append(region.n_restarts)
+
+    def on_generation(self, engine, generation, n_individuals, n_front):
+        self.generations.append((generation, n_individuals, n_front))
+
+
+def test_trust_region_restarts_are_reported_to_sinks():
+    # A region this small collapses after its first failure
+    region = TrustRegion(3, length_init=0.01, length_min=0.009, failure_tolerance=1, min_points=3)
+    optimizer = single_objective_optimizer(VARIABLES, n_jobs=1, n_initial_points=3, trust_region=region)
+    runner = ExperimentRunner(None, "experiment_log.csv", simulation_mode="full", clock=VirtualClock())
+    sink = RecordingSink()
+    campaign = SingleObjectiveCampaign(optimizer, runner, VARIABLES, ["Normalized Area"], 8, sinks=[sink])
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        campaign.run()
+    assert sink.restarts and sink.restarts == list(range(1, region.n_restarts + 1))
+    assert "Trust region" not in out.getvalue()
+
+
+def test_nsga2_generations_are_reported_to_sinks():
+    optimizer = multi_objective_optimizer(VARIABLES, 2, backend="nsga2", random_state=0, population_size=10)
+    runner = ExperimentRunner(None, "experiment_log.csv", simulation_mode="full", clock=VirtualClock())
+    sink = RecordingSink()
+    campaign = NSGA2Campaign(optimizer, runner, VARIABLES, ["Normalized Area", "Throughput"], 30, sinks=[sink])
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        campaign.run()
+    assert [(generation, n) for generation, n, _ in sink.generations] == [(1, 10), (2, 10), (3, 10)]
+    assert all(1 <= n_front <= 30 for *_, n_front in sink.generations)
+    assert "Generation" not in out.getvalue()
@@ -0,0 +1,59 @@
+import glob
+import os
+import shutil
+import numpy as np
+import pytest
+from core.campaign.engine import multi_objective_optimizer, single_objective_optimizer
+from core.optimization.bayesian_optimization import StepBayesianOptimizer
+from core.optimization.checkpoint import LEGACY_FILE, load_optimizer, save_optimizer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VARIABLES = [("a", 0.0, 1.0), ("b", 0.0, 1.0)]
+PICKLES = sorted(glob.glob(os.path.join(ROOT, "resumable_runs", "**", "*.pkl"), recursive=True))
+
+
+@pytest.mark.parametrize("path", PICKLES, ids=lambda path: os.path.relpath(path, ROOT))
+def test_legacy_pickles_load_as_current_optimizer(path, tmp_path):
+    if os.path.basename(path) != LEGACY_FILE:
+        shutil.copy(path, tmp_path / LEGACY_FILE)
+        path = tmp_path / LEGACY_FILE
+    optimizer = load_optimizer(os.path.dirname(path))
+    assert type(optimizer) is StepBayesianOptimizer
+    assert optimizer.pending == []
+    assert len(optimizer.x_iters) == len(optimizer.y_iters) == len(optimizer.skopt_optimizer.Xi)
+    assert len(optimizer.suggest()) == len(optimizer.variable_names)
+
+
+
+def _objectives(x, rng):
+    return [float(x[0] ** 2 + rng.normal(0, 0.01)), float((x[1] - 1) ** 2)]
+
+
+@pytest.mark.parametrize("trust_region", [False, True])
+def test_step_optimizer_round_trip(trust_region, tmp_path):
+    optimizer = single_objective_optimizer(VARIABLES, n_initial_points=4, n_jobs=1, random_state=0, trust_region=trust_region)
+    rng = np.random.default_rng(0)
+    for _ in range(8):
+        x = optimizer.suggest()
+        optimizer.observe(x, _objectives(x, rng)[0])
+    save_optimizer(optimizer, tmp_path)
+    restored = load_optimizer(tmp_path)
+    assert restored.x_iters == optimizer.x_iters and restored.y_iters == optimizer.y_iters
+    assert restored.skopt_optimizer.Xi == optimizer.skopt_optimizer.Xi
+    assert restored.skopt_optimizer.yi == optimizer.skopt_optimizer.yi
+    np.testing.assert_allclose(restored.suggest(), optimizer.suggest())
+    np.testing.assert_allclose(restored.suggest(2), optimizer.suggest(2))
+
+
+@pytest.mark.parametrize("backend", ["ehvi", "processoptimizer"])
+def test_multi_objective_optimizer_round_trip(backend, tmp_path):
+    optimizer = multi_objective_optimizer(VARIABLES, 2, 4, backend=backend, random_state=0)
+    rng = np.random.default_rng(0)
+    for _ in range(8):
+        x = optimizer.ask()
+        optimizer.tell(x, _objectives(x, rng))
+    save_optimizer(optimizer, tmp_path)
+    restored = load_optimizer(tmp_path)
+    assert type(restored) is type(optimizer)
+    assert restored.Xi == optimizer.Xi and restored.yi == optimizer.yi
+    np.testing.assert_allclose(restored.ask(), optimizer.ask())
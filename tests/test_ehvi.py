@@ -0,0 +1,12 @@
+import numpy as np
+from core.optimization.ehvi import EHVIOptimizer
+
+
+def test_tell_accepts_numpy_points():
+    optimizer = EHVIOptimizer([(0.0, 1.0), (0.0, 1.0)], n_initial_points=3, random_state=0)
+    optimizer.tell(np.array([0.2, 0.4]), np.array([1.0, 2.0]))
+    optimizer.tell(np.array([[0.5, 0.5], [0.9, 0.1]]), np.array([[0.5, 1.5], [2.0, 0.1]]))
+    assert optimizer.Xi == [[0.2, 0.4], [0.5, 0.5], [0.9, 0.1]]
+    assert optimizer.yi == [[1.0, 2.0], [0.5, 1.5], [2.0, 0.1]]
+    assert optimizer.models
+    assert len(optimizer.ask()) == 2
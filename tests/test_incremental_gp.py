@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from sklearn.base import clone
+from skopt.learning import GaussianProcessRegressor
+from skopt.learning.gaussian_process.kernels import ConstantKernel, Matern
+from core.optimization import bayesian_optimization
+from core.optimization.incremental_gp import add_observation
+from tests.test_bayesian_optimization import fitted_optimizer, objective
+
+RNG = np.random.RandomState(0)
+X = RNG.uniform(size=(12, 2))
+Y = np.sin(3 * X[:, 0]) + X[:, 1]
+
+
+def fixed_gp(noise=1e-2):
+    """A GP whose hyperparameters are not refitted, so a full fit and a rank-one update must agree."""
+    kernel = ConstantKernel(1.0) * Matern(length_scale=[0.5, 0.5], nu=2.5)
+    return GaussianProcessRegressor(kernel=kernel, optimizer=None, noise=noise, normalize_y=False)
+
+
+def test_add_observation_matches_full_refit():
+    gp = fixed_gp().fit(X[:-1], Y[:-1])
+    updated = add_observation(gp, X[-1], Y[-1])
+    refit = clone(gp).fit(X, Y)
+    X_test = np.random.RandomState(1).uniform(size=(50, 2))
+    mean, std = updated.predict(X_test, return_std=True)
+    refit_mean, refit_std = refit.predict(X_test, return_std=True)
+    np.testing.assert_allclose(mean, refit_mean, rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(std, refit_std, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(updated.L_, refit.L_, atol=1e-10)
+
+
+def test_repeated_point_without_noise_fails_the_update():
+    gp = fixed_gp(noise=None).set_params(alpha=0.0).fit(X[:-1], Y[:-1])
+    with pytest.raises(np.linalg.LinAlgError):
+        add_observation(gp, X[0], Y[0])
+
+
+def test_failed_update_falls_back_to_full_refit(monkeypatch):
+    optimizer = fitted_optimizer(update_mode="incremental", refit_every=10)
+    x = optimizer.suggest()
+    optimizer.observe(x, objective(x))
+    assert optimizer._since_refit == 1
+    n_fits = optimizer._n_fits
+
+    def failing_update(gp, x, y):
+        raise np.linalg.LinAlgError("Cholesky update failed")
+
+    monkeypatch.setattr(bayesian_optimization, "add_observation", failing_update)
+    x = optimizer.suggest()
+    optimizer.observe(x, objective(x))
+    opt = optimizer.skopt_optimizer
+    assert optimizer._since_refit == 0 and optimizer._n_fits == n_fits + 1
+    assert len(opt.models[-1].X_train_) == len(opt.Xi)
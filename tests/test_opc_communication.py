@@ -0,0 +1,53 @@
+import pytest
+from core.hardware.opc_communication import OPCClient
+from core.hardware.opc_stand_in import HITEC, serve
+
+PUMPS = ["PUMP1.W1", "PUMP2.W1", "PUMP_4"]
+ITEMS = [f"Hitec_OPC_DA20_Server-%3EDIAZOAN%3A{pump}" for pump in PUMPS]
+
+
+def test_write_many_sends_one_request_per_item_by_default():
+    server = serve()
+    try:
+        client = OPCClient(server.url)
+        assert client.write_many({item: 1.5 for item in ITEMS}) == {item: True for item in ITEMS}
+        assert client.bulk_write is False
+        assert "write_many" not in client.latency.counts
+        assert all(server.model.state()[HITEC + pump] == 1.5 for pump in PUMPS)
+    finally:
+        server.shutdown()
+
+
+@pytest.mark.parametrize("multi_item", [True, False])
+def test_write_many_applies_every_item(multi_item):
+    server = serve(multi_item=multi_item)
+    try:
+        client = OPCClient(server.url, backoff=0.01, bulk=True)
+        assert client.write_many({item: 1.5 for item in ITEMS}) == {item: True for item in ITEMS}
+        assert client.bulk_write is multi_item
+        state = server.model.state()
+        assert all(state[HITEC + pump] == 1.5 for pump in PUMPS)
+        # Once a multi-item write went unconfirmed, every item gets its own request
+        client.write_many({item: 0 for item in ITEMS})
+        assert all(server.model.state()[HITEC + pump] == 0 for pump in PUMPS)
+    finally:
+        server.shutdown()
+
+
+def test_write_many_falls_back_when_reply_misses_items():
+    server = serve()
+    try:
+        client = OPCClient(server.url, bulk=True)
+        get = client._get
+
+        def first_pair_only(operation, url):
+            if operation == "write_many":  # A gateway that applies and confirms only the first pair
+                url = url.split("&item=")[0]
+            return get(operation, url)
+
+        client._get = first_pair_only
+        assert client.write_many({item: 2.0 for item in ITEMS}) == {item: True for item in ITEMS}
+        assert client.bulk_write is False
+        assert all(server.model.state()[HITEC + pump] == 2.0 for pump in PUMPS)
+    finally:
+        server.shutdown()
@@ -0,0 +1,88 @@
+import itertools
+import numpy as np
+import pytest
+from core.optimization.hypervolume import _hv_monte_carlo, hypervolume
+from core.optimization.pareto import ParetoArchive, dominates, non_dominated_mask, non_dominated_sort
+
+
+def brute_force_mask(Y):
+    return np.array([not any(dominates(other, y) for other in Y) for y in Y])
+
+
+def brute_force_hypervolume(Y, ref):
+    """Inclusion-exclusion over the boxes between each point and ``ref``."""
+    volume = 0.0
+    for k in range(1, len(Y) + 1):
+        for subset in itertools.combinations(Y, k):
+            corner = np.max(subset, axis=0)
+            volume += (-1) ** (k + 1) * np.prod(np.clip(ref - corner, 0.0, None))
+    return volume
+
+
+def random_points(n, m, seed):
+    # Integer grid values, so ties and duplicated points are common
+    return np.random.default_rng(seed).integers(0, 6, size=(n, m)).astype(float)
+
+
+@pytest.mark.parametrize("m", [2, 3, 4, 5])
+@pytest.mark.parametrize("seed", range(5))
+def test_non_dominated_mask_matches_brute_force(m, seed):
+    Y = random_points(40, m, seed)
+    np.testing.assert_array_equal(non_dominated_mask(Y), brute_force_mask(Y))
+
+
+@pytest.mark.parametrize("m", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(5))
+def test_pareto_archive_matches_brute_force(m, seed):
+    Y = random_points(40, m, seed)
+    archive = ParetoArchive(m)
+    for i, y in enumerate(Y):
+        archive.add(y, index=i)
+    expected = np.flatnonzero(brute_force_mask(Y)).tolist()
+    assert sorted(archive.indices) == expected
+    assert sorted(ParetoArchive.from_points(Y).indices) == expected
+    np.testing.assert_array_equal(archive.points, Y[archive.indices])
+
+
+def test_non_dominated_sort_ranks_successive_fronts():
+    Y = random_points(40, 3, 0)
+    ranks = non_dominated_sort(Y)
+    remaining = np.arange(len(Y))
+    for rank in range(ranks.max() + 1):
+        front = remaining[brute_force_mask(Y[remaining])]
+        assert sorted(np.flatnonzero(ranks == rank)) == sorted(front)
+        remaining = np.setdiff1d(remaining, front)
+    assert not len(remaining)
+
+
+@pytest.mark.parametrize("Y, ref, expected", [
+    ([[1, 2], [2, 1]], [3, 3], 3.0),
+    ([[1, 1], [2, 2]], [3, 3], 4.0),
+    ([[1, 1, 1]], [2, 3, 4], 6.0),
+    ([[0, 0, 0.5], [0, 0.5, 0]], [1, 1, 1], 0.75),
+    ([[0, 0, 0, 0.5], [0.5, 0, 0, 0]], [1, 1, 1, 1], 0.75),
+    ([[0.5, 0.5, 0.5, 0.5]], [1, 1, 1, 1], 0.0625),
+    ([[4, 0], [0, 4]], [3, 3], 0.0),
+])
+def test_hypervolume_exact_small_cases(Y, ref, expected):
+    assert hypervolume(Y, ref) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("m", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(3))
+def test_hypervolume_matches_inclusion_exclusion(m, seed):
+    Y = np.random.default_rng(seed).uniform(size=(8, m))
+    ref = np.full(m, 1.1)
+    assert hypervolume(Y, ref) == pytest.approx(brute_force_hypervolume(Y, ref), rel=1e-9)
+
+
+@pytest.mark.parametrize("m", [3, 4, 5])
+def test_monte_carlo_hypervolume_is_close_to_exact(m):
+    Y = np.random.default_rng(m).uniform(size=(8, m))
+    ref = np.full(m, 1.1)
+    front = Y[non_dominated_mask(Y)]
+    exact = brute_force_hypervolume(front, ref)
+    estimate = _hv_monte_carlo(front, ref, 200_000, np.random.default_rng(0))
+    assert estimate == pytest.approx(exact, rel=0.02)
+    if m > 4:
+        assert hypervolume(Y, ref) == pytest.approx(exact, rel=0.02)
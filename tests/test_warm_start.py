@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+from core.optimization.warm_start import load_warm_start_data
+from core.utils import db_handler
+
+VARIABLES = [("x", 0.0, 1.0, None, "continuous")]
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_handler, "DB_NAME", str(tmp_path / "experiments.db"))
+    db_handler.init_db()
+
+
+def save(directions):
+    # Result tables are "higher is better": minimized objectives are stored negated
+    raw = pd.DataFrame({"x": [0.2, 0.8], "Yield": [0.9, 0.4], "Cost": [3.0, 1.0]})
+    df = raw.copy()
+    for col, direction in (directions or {}).items():
+        if direction == "minimize":
+            df[col] = -df[col]
+    settings = None if directions is None else {"directions": directions}
+    db_handler.save_experiment("a@b.c", "run", "", VARIABLES, df, None, settings)
+    return db_handler.list_experiments("a@b.c")[0][0]
+
+
+def test_matching_directions_are_taken_as_stored(database):
+    exp_id = save({"Yield": "maximize", "Cost": "minimize"})
+    _, Y = load_warm_start_data([exp_id], VARIABLES, ["Yield", "Cost"], {"Yield": "maximize", "Cost": "minimize"})
+    assert Y == [[0.9, -3.0], [0.4, -1.0]]
+
+
+def test_changed_direction_is_resigned(database):
+    exp_id = save({"Yield": "maximize", "Cost": "minimize"})
+    _, Y = load_warm_start_data([exp_id], VARIABLES, ["Yield", "Cost"], {"Yield": "minimize", "Cost": "maximize"})
+    assert Y == [[-0.9, 3.0], [-0.4, 1.0]]
+
+
+def test_experiments_without_directions_are_taken_as_stored(database):
+    exp_id = save(None)
+    _, Y = load_warm_start_data([exp_id], VARIABLES, ["Yield"], {"Yield": "minimize"})
+    assert Y == [0.9, 0.4]